@@ -0,0 +1,59 @@
+# app/core/boot.py
+"""
+Boot mode and startup probe state.
+
+FAST_BOOT=true keeps importing app.main free of network round-trips:
+  - no Base.metadata.create_all (run `python -m app.scripts.create_schema`
+    as a deploy/migration step instead)
+  - no database probe in app.db and no Redis ping in RedisClient at import
+  - connectivity is checked by async startup probes in the lifespan, whose
+    results are served at /health/boot
+
+`python -m app.scripts.import_report` reports per-module import cost.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+FAST_BOOT = os.getenv("FAST_BOOT", "false").lower() == "true"
+STARTUP_PROBE_TIMEOUT = float(os.getenv("STARTUP_PROBE_TIMEOUT", "10"))  # seconds
+
+# Filled in by app.main
+boot_timings: Dict[str, float] = {}
+probe_results: Dict[str, Dict[str, Any]] = {}
+
+
+async def run_probe(name: str, check: Callable[[], Any], timeout: float = STARTUP_PROBE_TIMEOUT) -> Dict[str, Any]:
+    """Run a blocking connectivity check in a thread, bounded by timeout"""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(asyncio.to_thread(check), timeout=timeout)
+        ok = result is not False
+        error = None if ok else "check failed"
+    except asyncio.TimeoutError:
+        ok, error = False, f"timed out after {timeout}s"
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+
+    probe_results[name] = {
+        "ok": ok,
+        "error": error,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if ok:
+        logger.info(f"✅ Startup probe '{name}' passed ({probe_results[name]['duration_ms']} ms)")
+    else:
+        logger.warning(f"⚠️  Startup probe '{name}' failed: {error}")
+    return probe_results[name]
+
+
+def report() -> Dict[str, Any]:
+    return {
+        "fast_boot": FAST_BOOT,
+        "timings_ms": {k: round(v * 1000, 1) for k, v in boot_timings.items()},
+        "probes": probe_results,
+    }
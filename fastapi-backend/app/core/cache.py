@@ -0,0 +1,568 @@
+# app/core/cache.py
+"""
+Two-tier cache: a per-worker in-process LRU in front of Redis.
+
+Services declare typed namespaces instead of hand-rolling keys, TTLs,
+serialization and invalidation:
+
+    CALENDAR_HOURS = cache.namespace(
+        "bizcal:{calendar_id}:hours", ttl=600, local_ttl=60, tags=("bizcal:{calendar_id}",),
+    )
+    CALENDAR_HOURS.set(calendar_id, value=hours)
+    CALENDAR_HOURS.get(calendar_id)
+    cache.invalidate_tags(f"bizcal:{calendar_id}")   # every key tagged with it
+
+Key parts are passed positionally in the order they appear in the key
+template. Values are stored serialized in both tiers, so a caller mutating
+what it read cannot corrupt the cache. A local hit costs no Redis round
+trip; a Redis hit refills the local tier. The local tier is bounded by
+entry count and bytes (CACHE_LOCAL_MAX_ENTRIES / CACHE_LOCAL_MAX_BYTES)
+and an entry lives at most local_ttl seconds. This worker's own copy is
+updated or dropped immediately on a write; other workers drop theirs
+when the write's invalidation arrives over the cache bus (see
+app/core/cache_bus.py), and local_ttl only bounds staleness while the
+bus is down. Namespaces without local_ttl are Redis-only.
+
+Tags are Redis sets of keys ("cachetag:<tag>"), e.g. "survey:<id>" or
+"org:<id>"; invalidating a tag is one atomic read-and-drop of the set and
+one pipelined UNLINK of its keys, never a walk of the keyspace. Like the
+services before it, every operation degrades to a miss or a no-op when
+Redis is unavailable.
+
+Misses are coalesced so an expired hot key costs one recompute, not one
+per concurrent request:
+
+    THEME_LIST.get_or_load(org_id, active, loader=lambda: load_rows(db))
+    cache.coalesce(key, load, lookup)   # when the value spans several keys
+
+Within a process one caller per key runs the loader and the others wait
+for its result (which they share, so treat it as read-only). Across
+workers the loader runs under a short Redis lock ("cachelock:<key>");
+callers that find the lock taken poll the cache until the holder has
+filled it, and load themselves only if it does not within
+CACHE_LOCK_WAIT_MS. A namespace declared with stale_ttl keeps values in
+Redis that much longer than ttl: during that window get_or_load serves
+the stale value to everyone except the one caller that wins the lock and
+reloads it (stale-while-revalidate). Plain get() returns such values
+too, so a stale_ttl namespace is up to ttl + stale_ttl old.
+"""
+import os
+import string
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import json_codec
+from .cache_bus import cache_bus
+from .redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY = "cachetag:{tag}"
+BUS_NAMESPACE = "cache"
+LOCK_KEY = "cachelock:{key}"
+
+# DEL the lock only if this caller still holds it
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _encode(blob: Any) -> bytes:
+    return blob.encode("utf-8") if isinstance(blob, str) else blob
+
+
+class LocalLRU:
+    """Thread-safe LRU of serialized values with per-entry expiry"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[bytes, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, blob: bytes, ttl: float, tags: Sequence[str] = ()) -> None:
+        if len(blob) > self.max_bytes // 10:
+            return  # one entry may not flush a tenth of the cache
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (blob, time.monotonic() + ttl, tuple(tags))
+            self._bytes += len(blob)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._remove(key)
+
+    def delete_tags(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._data:
+                        self._remove(key)
+                self._tags.pop(tag, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        blob, _, tags = self._data.pop(key)
+        self._bytes -= len(blob)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time in this process; concurrent callers share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def busy(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class CacheNamespace:
+    """One key template with its TTLs, tags and codec"""
+
+    def __init__(self, owner: "TwoTierCache", template: str, ttl: int, local_ttl: float = 0,
+                 tags: Sequence[str] = (), stale_ttl: int = 0,
+                 serialize: Callable[[Any], Any] = json_codec.dumpb,
+                 deserialize: Callable[[bytes], Any] = json_codec.loads):
+        self.owner = owner
+        self.template = template
+        self.fields = [f for _, f, _, _ in string.Formatter().parse(template) if f]
+        self.ttl = ttl
+        self.local_ttl = local_ttl if owner.local_enabled else 0
+        self.tags = tuple(tags)
+        self.stale_ttl = stale_ttl
+        self.serialize = serialize
+        self.deserialize = deserialize
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.errors = 0
+
+    # ------------------------------- keys ------------------------------
+
+    def _parts(self, parts: Sequence[Any]) -> Dict[str, Any]:
+        if len(parts) != len(self.fields):
+            raise TypeError(f"{self.template} takes {len(self.fields)} key parts, got {len(parts)}")
+        return dict(zip(self.fields, parts))
+
+    def key(self, *parts: Any) -> str:
+        return self.template.format(**self._parts(parts))
+
+    def _tags_for(self, parts: Sequence[Any], extra: Iterable[str]) -> List[str]:
+        mapping = self._parts(parts)
+        return [t.format(**mapping) for t in self.tags] + list(extra)
+
+    # ------------------------------- reads -----------------------------
+
+    def _decode(self, blob: bytes) -> Any:
+        try:
+            return self.deserialize(blob)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[cache] undecodable value in {self.template}: {e}")
+            return None
+
+    def _lookup(self, parts: Sequence[Any], fresh: bool = False) -> Tuple[Optional[Any], bool]:
+        """(value or None, whether it is past ttl and within stale_ttl)"""
+        key = self.key(*parts)
+        if self.local_ttl and not fresh:
+            blob = self.owner.local.get(key)
+            if blob is not None:
+                self.local_hits += 1
+                return self._decode(blob), False
+        try:
+            if not redis_client.available():
+                self.misses += 1
+                return None, False
+            if self.stale_ttl:
+                pipe = redis_client.client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                blob, pttl = pipe.execute()
+            else:
+                blob, pttl = redis_client.client.get(key), -1
+        except Exception:
+            self.errors += 1
+            return None, False
+        if blob is None:
+            self.misses += 1
+            return None, False
+        self.redis_hits += 1
+        stale = 0 <= pttl < self.stale_ttl * 1000
+        if stale:
+            self.stale_hits += 1
+        elif self.local_ttl:
+            self.owner.local.set(key, blob, self.local_ttl, self._tags_for(parts, ()))
+        return self._decode(blob), stale
+
+    def get(self, *parts: Any, fresh: bool = False) -> Optional[Any]:
+        """Cached value or None; fresh=True skips the local tier (read-modify-write)"""
+        return self._lookup(parts, fresh)[0]
+
+    def get_or_load(self, *parts: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Cached value, else loader()'s result (cached unless None). Concurrent
+        misses for the key share one loader call; see the module docstring.
+        """
+        value, stale = self._lookup(parts)
+        if value is not None and not stale:
+            return value
+        key = self.key(*parts)
+
+        def load():
+            loaded = loader()
+            if loaded is not None:
+                self.set(*parts, value=loaded, broadcast=False)
+            return loaded
+
+        if value is not None:
+            refreshed = self.owner.revalidate(key, load)
+            return value if refreshed is None else refreshed
+        return self.owner.coalesce(key, load, lookup=lambda: self.get(*parts))
+
+    def get_many(self, parts_list: Sequence[Sequence[Any]]) -> List[Optional[Any]]:
+        """Values in order (None for misses); local hits first, then one batched MGET"""
+        keys = [self.key(*parts) for parts in parts_list]
+        out: List[Optional[Any]] = [None] * len(keys)
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            blob = self.owner.local.get(key) if self.local_ttl else None
+            if blob is None:
+                missing.append(i)
+            else:
+                self.local_hits += 1
+                out[i] = self._decode(blob)
+        if not missing:
+            return out
+        try:
+            if not redis_client.available():
+                self.misses += len(missing)
+                return out
+            blobs = redis_client.get_many([keys[i] for i in missing])
+        except Exception:
+            self.errors += 1
+            return out
+        for i, blob in zip(missing, blobs):
+            if blob is None:
+                self.misses += 1
+                continue
+            self.redis_hits += 1
+            if self.local_ttl:
+                self.owner.local.set(keys[i], blob, self.local_ttl, self._tags_for(parts_list[i], ()))
+            out[i] = self._decode(blob)
+        return out
+
+    # ------------------------------ writes -----------------------------
+
+    def set(self, *parts: Any, value: Any, tags: Iterable[str] = (), ttl: Optional[int] = None,
+            broadcast: bool = True) -> bool:
+        """
+        Write both tiers. Other workers drop their local copy unless
+        broadcast=False (a fill after a miss, which replaces nothing).
+        """
+        key = self.key(*parts)
+        ttl = ttl or self.ttl
+        redis_ttl = ttl + self.stale_ttl
+        all_tags = self._tags_for(parts, tags)
+        blob = _encode(self.serialize(value))
+        if self.local_ttl:
+            self.owner.local.set(key, blob, min(self.local_ttl, ttl), all_tags)
+        try:
+            if not redis_client.available():
+                return False
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.setex(key, redis_ttl, blob)
+            for tag in all_tags:
+                tag_key = TAG_KEY.format(tag=tag)
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, self.owner.max_ttl)
+            if self.local_ttl and broadcast:
+                cache_bus.publish_to(pipe, BUS_NAMESPACE, keys=[key])
+            pipe.execute()
+            return True
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[cache] set {key} failed: {e}")
+            return False
+
+    def delete(self, *parts: Any) -> None:
+        self.owner.delete_keys(self.key(*parts))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl": self.ttl,
+            "local_ttl": self.local_ttl,
+            "stale_ttl": self.stale_ttl,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "errors": self.errors,
+        }
+
+
+class TwoTierCache:
+    """Registry of namespaces sharing one local LRU"""
+
+    def __init__(self):
+        self.local_enabled = os.getenv("CACHE_LOCAL_ENABLED", "true").lower() == "true"
+        self.local = LocalLRU(
+            max_entries=int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024))),
+        )
+        self.lock_ttl_ms = int(os.getenv("CACHE_LOCK_TTL_MS", "10000"))
+        self.lock_wait_ms = int(os.getenv("CACHE_LOCK_WAIT_MS", "3000"))
+        self.namespaces: Dict[str, CacheNamespace] = {}
+        self.max_ttl = 0  # tag sets outlive every key they reference
+        self.flight = SingleFlight()
+        self._release_script = None
+
+        self.lock_waits = 0       # served by another worker's load
+        self.lock_timeouts = 0    # waited CACHE_LOCK_WAIT_MS, then loaded anyway
+        self.revalidations = 0
+
+        if self.local_enabled:
+            cache_bus.register(BUS_NAMESPACE, evict=self._evict_local, clear=self.local.clear)
+
+    def _evict_local(self, keys: Sequence[str], tags: Sequence[str]) -> None:
+        """Apply another worker's invalidation to the local tier"""
+        if keys:
+            self.local.delete(*keys)
+        if tags:
+            self.local.delete_tags(*tags)
+
+    def namespace(self, template: str, ttl: int, local_ttl: float = 0, tags: Sequence[str] = (),
+                  stale_ttl: int = 0,
+                  serialize: Callable[[Any], Any] = json_codec.dumpb,
+                  deserialize: Callable[[bytes], Any] = json_codec.loads) -> CacheNamespace:
+        if template in self.namespaces:
+            raise ValueError(f"cache namespace {template!r} is already declared")
+        ns = CacheNamespace(self, template, ttl, local_ttl, tags, stale_ttl, serialize, deserialize)
+        self.namespaces[template] = ns
+        self.max_ttl = max(self.max_ttl, ttl + stale_ttl)
+        return ns
+
+    # ----------------------------- single flight -----------------------------
+
+    def _try_lock(self, key: str) -> Tuple[bool, Optional[str]]:
+        """(held by someone else, our token); no token when Redis is unavailable"""
+        try:
+            if not redis_client.available():
+                return False, None
+            token = os.urandom(8).hex()
+            if redis_client.client.set(LOCK_KEY.format(key=key), token, nx=True, px=self.lock_ttl_ms):
+                return False, token
+            return True, None
+        except Exception:
+            return False, None
+
+    def _unlock(self, key: str, token: Optional[str]) -> None:
+        if token is None:
+            return
+        try:
+            if self._release_script is None:
+                self._release_script = redis_client.client.register_script(_RELEASE_LOCK_LUA)
+            self._release_script(keys=[LOCK_KEY.format(key=key)], args=[token])
+        except Exception:
+            pass  # expires after lock_ttl_ms
+
+    def _lock_held(self, key: str) -> bool:
+        try:
+            return bool(redis_client.client.exists(LOCK_KEY.format(key=key)))
+        except Exception:
+            return False
+
+    def _await_fill(self, key: str, lookup: Callable[[], Any]) -> Optional[Any]:
+        """Poll lookup() while another worker holds the key's lock"""
+        deadline = time.monotonic() + self.lock_wait_ms / 1000
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = lookup()
+            if value is not None:
+                return value
+            if not self._lock_held(key):
+                return lookup()  # holder finished (or failed) between our two reads
+            delay = min(delay * 2, 0.2)
+        return None
+
+    def _load_locked(self, key: str, load: Callable[[], Any], lookup: Optional[Callable[[], Any]]) -> Any:
+        held, token = self._try_lock(key)
+        if held:
+            value = self._await_fill(key, lookup) if lookup is not None else None
+            if value is not None:
+                self.lock_waits += 1
+                return value
+            self.lock_timeouts += 1
+            return load()
+        try:
+            if token is not None and lookup is not None:
+                value = lookup()  # filled by the previous holder while we missed
+                if value is not None:
+                    return value
+            return load()
+        finally:
+            self._unlock(key, token)
+
+    def coalesce(self, key: str, load: Callable[[], Any], lookup: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run load() for a cache miss on key at most once at a time: per
+        process via single flight, across workers via a Redis lock. load()
+        must fill the cache itself; lookup() reads it back (None on miss)
+        for callers that found another worker loading.
+        """
+        return self.flight.do(key, lambda: self._load_locked(key, load, lookup))
+
+    def revalidate(self, key: str, load: Callable[[], Any]) -> Optional[Any]:
+        """Reload a stale value unless someone already is; None means serve the stale one"""
+        if self.flight.busy(key):
+            return None
+        held, token = self._try_lock(key)
+        if held:
+            return None
+        self.revalidations += 1
+        try:
+            return self.flight.do(key, load)
+        finally:
+            self._unlock(key, token)
+
+    def delete_keys(self, *keys: str) -> None:
+        if not keys:
+            return
+        self.local.delete(*keys)
+        try:
+            if not redis_client.available(): return
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.unlink(*keys)
+            if self.local_enabled:
+                cache_bus.publish_to(pipe, BUS_NAMESPACE, keys=keys)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[cache] delete {keys} failed: {e}")
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key tagged with any of `tags`; returns Redis keys deleted"""
+        if not tags:
+            return 0
+        self.local.delete_tags(*tags)
+        try:
+            if not redis_client.available(): return 0
+            # read and drop the tag sets atomically: a key tagged after this
+            # lands in a fresh set instead of being lost between the two
+            pipe = redis_client.client.pipeline(transaction=True)
+            for tag in tags:
+                pipe.smembers(TAG_KEY.format(tag=tag))
+            pipe.unlink(*(TAG_KEY.format(tag=tag) for tag in tags))
+            members = set().union(*pipe.execute()[:-1])
+            deleted = redis_client.unlink_keys(list(members))
+            # only now: a worker evicting earlier could re-cache the old values
+            if self.local_enabled:
+                cache_bus.publish(BUS_NAMESPACE, tags=tags)
+            return deleted
+        except Exception as e:
+            logger.warning(f"[cache] invalidate tags {tags} failed: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local_enabled": self.local_enabled,
+            "local": self.local.stats(),
+            "single_flight": {
+                "leaders": self.flight.leaders,
+                "followers": self.flight.followers,
+                "lock_waits": self.lock_waits,
+                "lock_timeouts": self.lock_timeouts,
+                "revalidations": self.revalidations,
+            },
+            "namespaces": {t: ns.stats() for t, ns in self.namespaces.items()},
+        }
+
+
+cache = TwoTierCache()
@@ -0,0 +1,200 @@
+# app/core/cache_bus.py
+"""
+Cross-worker invalidation bus for in-process caches.
+
+Every worker keeps its own in-memory copies (e.g. the two-tier cache's
+local LRU), so a write on one worker would leave the
+others serving the old value until it expires. Writers publish a compact
+message on one Redis pub/sub channel (CACHE_BUS_CHANNEL) naming a
+namespace plus the keys and/or tags to drop:
+
+    {"w": "<worker>", "n": "cache", "k": ["survey:42"], "t": ["org:7"]}
+
+and every worker runs a subscriber thread that hands it to the evict
+callback registered for that namespace:
+
+    cache_bus.register("cache", evict=self._evict_local, clear=self.local.clear)
+    cache_bus.publish("cache", tags=[f"survey:{survey_id}"])
+    cache_bus.publish_to(pipe, "cache", keys=keys)   # in the write's own pipeline
+
+A worker ignores its own messages, since it evicted before publishing.
+Pub/sub is at-most-once: a worker that is disconnected misses whatever
+was published meanwhile, so after every (re)subscribe it clears all
+registered caches, and entries still carry their own TTL as a backstop.
+Publishing degrades to a no-op when Redis is unavailable, like every
+other cache write.
+"""
+import os
+import socket
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from . import json_codec
+from .redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+Evict = Callable[[Sequence[str], Sequence[str]], None]
+
+
+class InvalidationBus:
+    """Publishes invalidations and applies other workers' ones locally"""
+
+    def __init__(self):
+        self.enabled = os.getenv("CACHE_BUS_ENABLED", "true").lower() == "true"
+        self.channel = os.getenv("CACHE_BUS_CHANNEL", "cache:invalidate")
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._handlers: Dict[str, Tuple[Evict, Optional[Callable[[], None]]]] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.subscribed = False
+
+        self.published = 0
+        self.received = 0
+        self.applied = 0
+        self.unknown = 0
+        self.errors = 0
+        self.resyncs = 0
+
+    def register(self, namespace: str, evict: Evict, clear: Optional[Callable[[], None]] = None) -> None:
+        """evict(keys, tags) applies a message; clear() drops everything after a resubscribe"""
+        self._handlers[namespace] = (evict, clear)
+
+    # ------------------------------ publish ----------------------------
+
+    def _message(self, namespace: str, keys: Iterable[Any], tags: Iterable[Any]) -> Optional[bytes]:
+        message: Dict[str, Any] = {"w": self.worker_id, "n": namespace}
+        keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+        tags = list(tags)
+        if keys:
+            message["k"] = keys
+        if tags:
+            message["t"] = tags
+        if not keys and not tags:
+            return None
+        return json_codec.dumpb(message)
+
+    def publish_to(self, pipe, namespace: str, keys: Iterable[Any] = (), tags: Iterable[Any] = ()) -> None:
+        """Queue the PUBLISH on a pipeline the caller executes with its write"""
+        if not self.enabled:
+            return
+        message = self._message(namespace, keys, tags)
+        if message is not None:
+            pipe.publish(self.channel, message)
+            self.published += 1
+
+    def publish(self, namespace: str, keys: Iterable[Any] = (), tags: Iterable[Any] = ()) -> None:
+        if not self.enabled:
+            return
+        message = self._message(namespace, keys, tags)
+        if message is None:
+            return
+        try:
+            if not redis_client.available():
+                return
+            redis_client.client.publish(self.channel, message)
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[cache_bus] publish to {namespace} failed: {e}")
+
+    # ------------------------------ receive ----------------------------
+
+    def _apply(self, data: bytes) -> None:
+        self.received += 1
+        try:
+            message = json_codec.loads(data)
+        except Exception:
+            self.errors += 1
+            return
+        if message.get("w") == self.worker_id:
+            return
+        handler = self._handlers.get(message.get("n"))
+        if handler is None:
+            self.unknown += 1
+            return
+        try:
+            handler[0](message.get("k", ()), message.get("t", ()))
+            self.applied += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[cache_bus] evict in {message.get('n')} failed: {e}")
+
+    def _clear_all(self) -> None:
+        for namespace, (_, clear) in self._handlers.items():
+            if clear is None:
+                continue
+            try:
+                clear()
+            except Exception as e:
+                logger.warning(f"[cache_bus] clear of {namespace} failed: {e}")
+
+    # ----------------------------- lifecycle ---------------------------
+
+    def start(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        # the id is taken per worker process, after any fork
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="CacheInvalidationBus")
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run_loop(self) -> None:
+        delay = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                if redis_client.available():
+                    pubsub = redis_client.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.channel)
+                    # anything published before this point was missed
+                    self._clear_all()
+                    self.resyncs += 1
+                    self.subscribed = True
+                    delay = 0.5
+                    while not self._stop.is_set():
+                        message = pubsub.get_message(timeout=1.0)
+                        if message is not None and message.get("type") == "message":
+                            self._apply(message["data"])
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"[cache_bus] subscriber error, resubscribing in {delay:.1f}s: {e}")
+            finally:
+                self.subscribed = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stop.wait(delay)
+            delay = min(delay * 2, 30.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "channel": self.channel,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "subscribed": self.subscribed,
+            "namespaces": sorted(self._handlers),
+            "published": self.published,
+            "received": self.received,
+            "applied": self.applied,
+            "unknown": self.unknown,
+            "errors": self.errors,
+            "resyncs": self.resyncs,
+        }
+
+
+cache_bus = InvalidationBus()
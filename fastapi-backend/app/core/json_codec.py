@@ -0,0 +1,101 @@
+# app/core/json_codec.py
+"""
+Shared JSON codec for middleware, Redis caches and HTTP responses.
+
+Uses orjson when installed (JSON_CODEC=orjson|stdlib forces a backend) and
+applies the same type handling on both backends:
+
+    datetime / date / time  -> ISO 8601 string
+    UUID                    -> canonical string
+    Enum                    -> its value
+    Decimal                 -> string (no precision loss)
+    set / frozenset         -> list
+    Pydantic models         -> model_dump()
+    ORM / plain objects     -> public attributes (no leading underscore)
+    anything else           -> str(obj)
+"""
+import os
+import json
+import uuid
+import datetime as dt
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Union
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json module
+    orjson = None
+
+JSON_CODEC = os.getenv("JSON_CODEC", "orjson" if orjson else "stdlib").lower()
+if JSON_CODEC != "orjson" or orjson is None:
+    JSON_CODEC = "stdlib"
+
+# Both backends raise a subclass of this on malformed input
+JSONDecodeError = json.JSONDecodeError
+
+
+def default(o: Any) -> Any:
+    """Fallback for types the backend cannot encode natively"""
+    if isinstance(o, (dt.datetime, dt.date, dt.time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, "model_dump"):
+        return o.model_dump()
+    if hasattr(o, "__dict__"):
+        # remove SQLAlchemy state if present
+        return {k: v for k, v in o.__dict__.items() if not k.startswith("_")}
+    return str(o)
+
+
+_encoder = json.JSONEncoder(default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return _encoder.encode(obj)
+
+
+def _stdlib_dumpb(obj: Any) -> bytes:
+    return _encoder.encode(obj).encode("utf-8")
+
+
+def _stdlib_loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def _orjson_dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+
+    def _orjson_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode("utf-8")
+
+    _orjson_loads = orjson.loads
+
+
+BACKENDS = {"stdlib": (_stdlib_dumps, _stdlib_dumpb, _stdlib_loads)}
+if orjson is not None:
+    BACKENDS["orjson"] = (_orjson_dumps, _orjson_dumpb, _orjson_loads)
+
+# dumps -> str, dumpb -> UTF-8 bytes, loads accepts str or bytes
+dumps, dumpb, loads = BACKENDS[JSON_CODEC]
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered through the shared codec (app default)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumpb(content)
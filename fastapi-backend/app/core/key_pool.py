@@ -0,0 +1,276 @@
+# app/core/key_pool.py
+import os
+import time
+import uuid
+import base64
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionKey:
+    """AES session key registered on the key server under key_id"""
+    key_id: str
+    aes_key: bytes
+    encrypted_key: str
+    fetched_at: float = field(default_factory=time.monotonic)
+    activated_at: Optional[float] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.monotonic()) - self.fetched_at
+
+
+class SessionKeyPool:
+    """
+    Rotating pool of pre-fetched session keys for response encryption.
+
+    The frontend resolves `key_id` against the key server to decrypt a
+    response, so every key must be issued by the key server; we just fetch
+    them ahead of time instead of once per GET. One key is active at a time
+    and is reused (with a fresh IV per response) until the rotation interval
+    elapses. Keys are never used past their TTL, which must stay below the
+    key server's KEY_STORE_TTL. A background task keeps the pool topped up
+    through a single pooled HTTP client, in one POST /get-keys call per
+    refill.
+    """
+
+    def __init__(self):
+        self.key_server_url = os.getenv(
+            "KEY_SERVER_URL", "https://surveyarcdocker.onrender.com"
+        ).rstrip("/")
+        self.pool_size = int(os.getenv("KEY_POOL_SIZE", "4"))
+        self.rotation_interval = float(os.getenv("KEY_ROTATION_INTERVAL", "300"))  # seconds
+        self.ttl = float(os.getenv("KEY_TTL", "900"))  # seconds
+        self.refill_interval = float(os.getenv("KEY_REFILL_INTERVAL", "30"))  # seconds
+        self.request_timeout = float(os.getenv("KEY_SERVER_TIMEOUT", "10.0"))
+        self.max_connections = int(os.getenv("KEY_SERVER_MAX_CONNECTIONS", "10"))
+
+        if self.ttl <= self.rotation_interval:
+            logger.warning(
+                "KEY_TTL (%ss) should exceed KEY_ROTATION_INTERVAL (%ss); clamping TTL",
+                self.ttl, self.rotation_interval,
+            )
+            self.ttl = self.rotation_interval * 2
+
+        self._active: Optional[SessionKey] = None
+        self._ready: Deque[SessionKey] = deque()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._fetch_lock: Optional[asyncio.Lock] = None
+        self._batch_supported = True
+
+        self.fetched = 0
+        self.fetch_errors = 0
+        self.rotations = 0
+        self.sync_fetches = 0
+
+    # ---------------------------- lifecycle ----------------------------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.request_timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._fetch_lock is None:
+            self._fetch_lock = asyncio.Lock()
+        return self._fetch_lock
+
+    async def start(self) -> bool:
+        """Prefill the pool and start the background refill task"""
+        self._wakeup = asyncio.Event()
+        try:
+            await self._refill()
+        except Exception as e:
+            logger.warning(f"⚠️  Key pool prefill failed: {e}")
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_loop(), name="SessionKeyPoolRefill")
+        return bool(self._ready)
+
+    async def stop(self) -> None:
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._refill_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._active = None
+        self._ready.clear()
+
+    # ----------------------------- fetching ----------------------------
+
+    async def _fetch_key(self) -> SessionKey:
+        key_id = f"sess_{uuid.uuid4().hex}"
+        try:
+            res = await self._get_client().get(f"{self.key_server_url}/get-key/{key_id}")
+            if res.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"Key server returned {res.status_code}", request=res.request, response=res
+                )
+            key_data = res.json()
+            if "encrypted_key" not in key_data or "aes_key_b64" not in key_data:
+                raise ValueError(f"Invalid key data from server: {list(key_data.keys())}")
+        except Exception:
+            self.fetch_errors += 1
+            raise
+
+        self.fetched += 1
+        return SessionKey(
+            key_id=key_id,
+            aes_key=base64.b64decode(key_data["aes_key_b64"]),
+            encrypted_key=key_data["encrypted_key"],
+        )
+
+    async def _fetch_batch(self, count: int) -> List[SessionKey]:
+        """Fetch `count` keys in one POST /get-keys call"""
+        try:
+            res = await self._get_client().post(
+                f"{self.key_server_url}/get-keys", json={"count": count, "prefix": "sess_"}
+            )
+            if res.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"Key server returned {res.status_code}", request=res.request, response=res
+                )
+            keys = [
+                SessionKey(
+                    key_id=k["key_id"],
+                    aes_key=base64.b64decode(k["aes_key_b64"]),
+                    encrypted_key=k["encrypted_key"],
+                )
+                for k in res.json()["keys"]
+            ]
+        except Exception:
+            self.fetch_errors += 1
+            raise
+
+        self.fetched += len(keys)
+        return keys
+
+    async def _refill(self) -> None:
+        self._evict_expired()
+        missing = self.pool_size - len(self._ready)
+        if missing <= 0:
+            return
+
+        if self._batch_supported:
+            try:
+                self._ready.extend(await self._fetch_batch(missing))
+                return
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405):
+                    raise
+                # Older key server without the batch endpoint
+                logger.info("[SessionKeyPool] Batch endpoint unavailable, fetching keys one by one")
+                self._batch_supported = False
+
+        results = await asyncio.gather(
+            *(self._fetch_key() for _ in range(missing)), return_exceptions=True
+        )
+        for r in results:
+            if isinstance(r, SessionKey):
+                self._ready.append(r)
+            else:
+                logger.warning(f"[SessionKeyPool] Key fetch failed: {type(r).__name__}: {r}")
+
+    async def _refill_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[SessionKeyPool] Refill failed: {e}")
+
+    # ----------------------------- rotation ----------------------------
+
+    def _usable(self, key: SessionKey, now: float) -> bool:
+        # A pooled key must still have a full rotation window left before TTL
+        return key.age(now) + self.rotation_interval <= self.ttl
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        while self._ready and not self._usable(self._ready[0], now):
+            self._ready.popleft()
+
+    def _active_valid(self, now: float) -> bool:
+        key = self._active
+        if key is None or key.activated_at is None:
+            return False
+        return now - key.activated_at < self.rotation_interval and key.age(now) < self.ttl
+
+    def _rotate(self, now: float) -> Optional[SessionKey]:
+        self._evict_expired()
+        if not self._ready:
+            return None
+        key = self._ready.popleft()
+        key.activated_at = now
+        self._active = key
+        self.rotations += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return key
+
+    async def current(self) -> SessionKey:
+        """Return the active session key, rotating or fetching if needed"""
+        now = time.monotonic()
+        if self._active_valid(now):
+            return self._active
+
+        key = self._rotate(now)
+        if key is not None:
+            return key
+
+        # Pool ran dry (cold start or key server outage): fetch inline once
+        async with self._get_lock():
+            now = time.monotonic()
+            if self._active_valid(now):
+                return self._active
+            self.sync_fetches += 1
+            self._ready.append(await self._fetch_key())
+            return self._rotate(time.monotonic())
+
+    def active_key_id(self) -> Optional[str]:
+        """key_id of the active key, without rotating or fetching"""
+        return self._active.key_id if self._active_valid(time.monotonic()) else None
+
+    def stats(self) -> dict:
+        return {
+            "key_server_url": self.key_server_url,
+            "pool_size": self.pool_size,
+            "ready_keys": len(self._ready),
+            "active_key_id": self.active_key_id(),
+            "rotation_interval": self.rotation_interval,
+            "ttl": self.ttl,
+            "fetched": self.fetched,
+            "fetch_errors": self.fetch_errors,
+            "rotations": self.rotations,
+            "sync_fetches": self.sync_fetches,
+            "refill_running": bool(self._refill_task and not self._refill_task.done()),
+        }
+
+
+# Create global session key pool instance
+session_key_pool = SessionKeyPool()
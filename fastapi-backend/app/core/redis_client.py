@@ -1,10 +1,132 @@
 # app/core/redis_client.py
 import os
+import threading
+import time
 import redis
-import json
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, List, Optional
 from datetime import datetime, timedelta
 
+from . import json_codec
+from .boot import FAST_BOOT
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for Redis. Closed: every operation
+    goes to Redis. After `threshold` connection errors or timeouts in a row
+    it opens and callers skip Redis (cache miss / no-op, i.e. straight to
+    the database) for `cooldown` seconds. Then it is half-open: one caller
+    at a time is let through as a probe; success closes it, failure opens
+    it for another cooldown.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+        self.errors = 0
+        self.opens = 0
+        self.probes = 0
+        self.short_circuits = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if now - self._opened_at >= self.cooldown:
+                # a probe that never reached Redis must not wedge the breaker open
+                if self._probe_at is None or now - self._probe_at >= self.cooldown:
+                    self._probe_at = now
+                    self.probes += 1
+                    return True
+            self.short_circuits += 1
+            return False
+
+    def record_success(self) -> None:
+        if self._failures == 0 and self._opened_at is None:
+            return
+        with self._lock:
+            self._failures = 0
+            if self._opened_at is not None:
+                print("[RedisClient] circuit closed")
+            self._opened_at = self._probe_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self._failures += 1
+            if self._probe_at is not None or (self._opened_at is None and self._failures >= self.threshold):
+                if self._opened_at is None:
+                    print(f"[RedisClient] circuit open after {self._failures} consecutive failures")
+                self.opens += 1
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "errors": self.errors,
+            "opens": self.opens,
+            "probes": self.probes,
+            "short_circuits": self.short_circuits,
+            "threshold": self.threshold,
+            "cooldown": self.cooldown,
+        }
+
+
+class RoundTripCountingConnection(redis.Connection):
+    """
+    Connection that counts request/response round trips (a pipeline is one)
+    and reports connection errors and successful replies to the breaker,
+    so every command, pipeline and script feeds it without extra calls.
+    """
+    round_trips = 0
+    breaker: Optional[CircuitBreaker] = None
+
+    def connect(self):
+        try:
+            super().connect()
+        except (redis.ConnectionError, redis.TimeoutError):
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+
+    def send_packed_command(self, command, check_health=True):
+        RoundTripCountingConnection.round_trips += 1
+        try:
+            super().send_packed_command(command, check_health)
+        except (redis.ConnectionError, redis.TimeoutError):
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+
+    def read_response(self, *args, **kwargs):
+        try:
+            response = super().read_response(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError):
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        if self.breaker is not None:
+            self.breaker.record_success()
+        return response
+
 
 class RedisClient:
     """Enhanced Redis client with project-specific functionality"""
@@ -21,15 +143,40 @@ class RedisClient:
         # Cvonnection pool settings
         self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
         self.retry_on_timeout = os.getenv("REDIS_RETRY_ON_TIMEOUT", "true").lower() == "true"
+        # Keys per MGET in batched reads; all chunks go out in one pipeline
+        self.mget_chunk_size = int(os.getenv("REDIS_MGET_CHUNK_SIZE", "500"))
+
+        # Pattern operations walk the keyspace with SCAN (never KEYS): COUNT
+        # hint per call, and at most REDIS_SCAN_MAX_CALLS calls per operation
+        self.scan_count = int(os.getenv("REDIS_SCAN_COUNT", "1000"))
+        self.scan_max_calls = int(os.getenv("REDIS_SCAN_MAX_CALLS", "1000"))
+        self.unlink_chunk_size = 1000
+
+        # batched read metrics
+        self.batch_reads = 0
+        self.batch_keys = 0
+        self.batch_chunks = 0
+
+        # SCAN metrics
+        self.scan_calls = 0
+        self.scans_truncated = 0
+
+        # Circuit breaker replacing the per-operation PING (see available())
+        self.breaker = CircuitBreaker(
+            threshold=int(os.getenv("REDIS_BREAKER_THRESHOLD", "3")),
+            cooldown=float(os.getenv("REDIS_BREAKER_COOLDOWN", "10")),
+        )
+        RoundTripCountingConnection.breaker = self.breaker
         
         self._client = None
         self._connection_pool = None
-        self._initialize_client()
+        # FAST_BOOT: build the pool without a round-trip; the lifespan probes Redis
+        self._initialize_client(probe=not FAST_BOOT)
     # ---- Session helpers ----
     def cache_user_session(self, uid: str, session: dict, ex: int = 7200) -> bool:
         """Cache a user session as JSON"""
         try:
-            if not self.ping():
+            if not self.available():
                 return False
             from .redis_client import serialize_for_redis  # avoid circular if top-level imported
             return self.set(f"user_session:{uid}", serialize_for_redis(session), ex=ex)
@@ -40,7 +187,7 @@ class RedisClient:
     def get_user_session(self, uid: str):
         """Get cached user session"""
         try:
-            if not self.ping():
+            if not self.available():
                 return None
             blob = self.get(f"user_session:{uid}")
             if not blob:
@@ -56,7 +203,7 @@ class RedisClient:
     def invalidate_user_session(self, uid: str) -> int:
         """Delete cached user session"""
         try:
-            if not self.ping():
+            if not self.available():
                 return 0
             return self.delete(f"user_session:{uid}")
         except Exception as e:
@@ -64,17 +211,16 @@ class RedisClient:
             return 0
 
     def clear_pattern(self, pattern: str) -> int:
-        """Delete keys by pattern (use carefully)"""
+        """Delete keys by pattern (SCAN + UNLINK, see unlink_pattern)"""
         try:
-            if not self.ping():
+            if not self.available():
                 return 0
-            keys = self.client.keys(pattern)
-            return self.delete(*keys) if keys else 0
+            return self.unlink_pattern(pattern)
         except Exception as e:
             print(f"[RedisClient] clear_pattern failed: {e}")
             return 0
 
-    def _initialize_client(self):
+    def _initialize_client(self, probe: bool = True):
         """Initialize Redis client with connection pool"""
         try:
             # Create connection pool
@@ -87,7 +233,8 @@ class RedisClient:
                 socket_connect_timeout=self.socket_connect_timeout,
                 max_connections=self.max_connections,
                 retry_on_timeout=self.retry_on_timeout,
-                decode_responses=False  # Keep as bytes for flexibility
+                decode_responses=False,  # Keep as bytes for flexibility
+                connection_class=RoundTripCountingConnection
             )
             
             # Create Redis client
@@ -97,6 +244,9 @@ class RedisClient:
                 socket_keepalive_options={}
             )
             
+            if not probe:
+                return
+
             # Test connection
             self._client.ping()
             print(f"✅ Redis client initialized successfully")
@@ -115,8 +265,17 @@ class RedisClient:
             self._initialize_client()
         return self._client
     
+    def available(self) -> bool:
+        """
+        Whether callers should use Redis right now, without a round trip:
+        False while the circuit is open, so cache operations fall back to
+        the database at no cost. Call this before cache operations; ping()
+        is a real PING for probes and health checks.
+        """
+        return self._client is not None and self.breaker.allow()
+
     def ping(self) -> bool:
-        """Test Redis connection"""
+        """Test Redis connection (one round trip)"""
         try:
             if self._client is None:
                 return False
@@ -150,7 +309,7 @@ class RedisClient:
     def safe_get(self, key: str, default: Any = None) -> Any:
         """Safely get a key with error handling"""
         try:
-            if not self.ping():
+            if not self.available():
                 return default
             
             result = self._client.get(key)
@@ -163,7 +322,7 @@ class RedisClient:
     def safe_set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
         """Safely set a key with error handling"""
         try:
-            if not self.ping():
+            if not self.available():
                 return False
             
             if ex:
@@ -178,7 +337,7 @@ class RedisClient:
     def safe_delete(self, *keys: str) -> int:
         """Safely delete keys with error handling"""
         try:
-            if not self.ping() or not keys:
+            if not self.available() or not keys:
                 return 0
             
             return self._client.delete(*keys)
@@ -190,7 +349,7 @@ class RedisClient:
     def safe_exists(self, key: str) -> bool:
         """Safely check if key exists"""
         try:
-            if not self.ping():
+            if not self.available():
                 return False
             
             return bool(self._client.exists(key))
@@ -202,7 +361,7 @@ class RedisClient:
     def safe_ttl(self, key: str) -> int:
         """Safely get TTL of a key"""
         try:
-            if not self.ping():
+            if not self.available():
                 return -2  # Key doesn't exist
             
             return self._client.ttl(key)
@@ -214,7 +373,7 @@ class RedisClient:
     def safe_expire(self, key: str, time: int) -> bool:
         """Safely set expiration for a key"""
         try:
-            if not self.ping():
+            if not self.available():
                 return False
             
             return bool(self._client.expire(key, time))
@@ -226,7 +385,7 @@ class RedisClient:
     def get_memory_info(self) -> dict:
         """Get Redis memory information"""
         try:
-            if not self.ping():
+            if not self.available():
                 return {"error": "Redis not available"}
             
             info = self._client.info("memory")
@@ -247,22 +406,113 @@ class RedisClient:
     def flush_pattern(self, pattern: str = "project:*") -> int:
         """Flush all keys matching a pattern"""
         try:
-            if not self.ping():
+            if not self.available():
                 return 0
             
-            keys = self._client.keys(pattern)
-            if keys:
-                return self._client.delete(*keys)
-            return 0
+            return self.unlink_pattern(pattern)
             
         except Exception as e:
             print(f"[RedisClient] Flush pattern failed for {pattern}: {e}")
             return 0
-    
+
+    # Keyspace walks: incremental SCAN instead of KEYS, which blocks Redis for
+    # the whole keyspace. Each SCAN call does bounded work, so other clients
+    # are served in between; connection errors propagate to the caller.
+
+    def scan_batches(self, pattern: str, count: Optional[int] = None,
+                     max_calls: Optional[int] = None) -> Iterator[List[bytes]]:
+        """
+        Yield batches of keys matching pattern. Stops after max_calls SCAN
+        calls (default REDIS_SCAN_MAX_CALLS) even if the walk is incomplete,
+        so a huge keyspace cannot turn one maintenance call into minutes of
+        load; incomplete walks are counted in stats()["scans_truncated"].
+        """
+        budget = max_calls or self.scan_max_calls
+        cursor, calls = 0, 0
+        try:
+            while True:
+                cursor, keys = self.client.scan(cursor=cursor, match=pattern, count=count or self.scan_count)
+                calls += 1
+                if keys:
+                    yield keys
+                if int(cursor) == 0:
+                    return
+                if calls >= budget:
+                    self.scans_truncated += 1
+                    print(f"[RedisClient] SCAN {pattern} stopped after {calls} calls")
+                    return
+        finally:
+            self.scan_calls += calls
+
+    def scan_keys(self, pattern: str, limit: Optional[int] = None) -> List[bytes]:
+        """Keys matching pattern (at most limit), via scan_batches"""
+        out: List[bytes] = []
+        for keys in self.scan_batches(pattern):
+            out.extend(keys)
+            if limit is not None and len(out) >= limit:
+                return out[:limit]
+        return out
+
+    def unlink_keys(self, keys: List[Any]) -> int:
+        """UNLINK keys in chunks sent in one pipeline (memory is freed off the main thread)"""
+        if not keys:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        for i in range(0, len(keys), self.unlink_chunk_size):
+            pipe.unlink(*keys[i:i + self.unlink_chunk_size])
+        return sum(pipe.execute())
+
+    def unlink_pattern(self, pattern: str) -> int:
+        """UNLINK every key matching pattern, one SCAN batch at a time"""
+        return sum(self.client.unlink(*keys) for keys in self.scan_batches(pattern))
+
+    def get_many(self, keys: List[str], deserialize: Optional[Callable[[bytes], Any]] = None,
+                 chunk_size: Optional[int] = None) -> List[Any]:
+        """
+        Batched GET for list caches: MGET in chunks of chunk_size keys, all
+        sent in one pipeline, so N keys cost a single round trip. Returns
+        values in key order with None for missing keys (and for values
+        deserialize rejects). Connection errors propagate to the caller.
+        """
+        if not keys:
+            return []
+        size = chunk_size or self.mget_chunk_size
+        pipe = self.client.pipeline(transaction=False)
+        for i in range(0, len(keys), size):
+            pipe.mget(keys[i:i + size])
+        chunks = pipe.execute()
+
+        self.batch_reads += 1
+        self.batch_keys += len(keys)
+        self.batch_chunks += len(chunks)
+
+        values = [value for chunk in chunks for value in chunk]
+        if deserialize is None:
+            return values
+        out = []
+        for value in values:
+            try:
+                out.append(deserialize(value) if value is not None else None)
+            except Exception:
+                out.append(None)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "round_trips": RoundTripCountingConnection.round_trips,
+            "breaker": self.breaker.stats(),
+            "batch_reads": self.batch_reads,
+            "batch_keys": self.batch_keys,
+            "batch_chunks": self.batch_chunks,
+            "mget_chunk_size": self.mget_chunk_size,
+            "scan_calls": self.scan_calls,
+            "scans_truncated": self.scans_truncated,
+        }
+
     def get_connection_info(self) -> dict:
         """Get Redis connection information"""
         try:
-            if not self.ping():
+            if not self.available():
                 return {"status": "disconnected"}
             
             info = self._client.info("clients")
@@ -288,19 +538,14 @@ redis_client = RedisClient()
 # Utility functions for common Redis operations
 def serialize_for_redis(data: Any) -> str:
     """Serialize data for Redis storage"""
-    def json_serializer(obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-    
-    return json.dumps(data, default=json_serializer)
+    return json_codec.dumps(data)
 
 
 def deserialize_from_redis(data: str) -> Any:
     """Deserialize data from Redis"""
     try:
-        return json.loads(data)
-    except (json.JSONDecodeError, TypeError) as e:
+        return json_codec.loads(data)
+    except (json_codec.JSONDecodeError, TypeError) as e:
         print(f"[RedisClient] Deserialization failed: {e}")
         return None
 
@@ -314,7 +559,7 @@ class RedisTransaction:
         self.pipeline = None
     
     def __enter__(self):
-        if self.client.ping():
+        if self.client.available():
             self.pipeline = self.client.client.pipeline()
             return self.pipeline
         return None
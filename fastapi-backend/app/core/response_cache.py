@@ -0,0 +1,142 @@
+# app/core/response_cache.py
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from . import json_codec
+from .redis_client import redis_client
+
+BODY_SUFFIX = ":body"
+ETAG_SUFFIX = ":etag"
+
+
+@dataclass
+class CachedBody:
+    """Final serialized JSON response body and its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def parse_if_none_match(value: Optional[str]) -> List[str]:
+    """Split an If-None-Match header into entity tags (weak prefixes dropped)"""
+    if not value:
+        return []
+    tags = []
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def etag_matches(etag: str, if_none_match: Iterable[str]) -> bool:
+    return any(tag == "*" or tag == etag for tag in if_none_match)
+
+
+@lru_cache(maxsize=64)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def serialize(payload: Any, response_model: Any = None) -> bytes:
+    """
+    Serialize payload exactly once into the bytes sent to the client.
+    With a response_model the output matches what FastAPI would render for
+    that route (validation, field filtering, aliases).
+    """
+    if response_model is None:
+        return json_codec.dumpb(payload)
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(payload, from_attributes=True), by_alias=True)
+
+
+class ResponseBodyCache:
+    """
+    Redis cache of final response bytes for cacheable GET endpoints.
+
+    A cached body is stored next to the list key it mirrors (`<key>:body`)
+    with its ETag under `<key>:etag`, written in one MULTI so the two never
+    disagree. Hits are served as raw bytes: no Redis payload decoding, no
+    Pydantic and no re-serialization, and the encrypt middleware encrypts
+    the bytes directly. A request whose If-None-Match matches the stored
+    ETag gets a 304 after reading only the small ETag key.
+    """
+
+    @staticmethod
+    def keys(key: str) -> tuple:
+        return key + BODY_SUFFIX, key + ETAG_SUFFIX
+
+    def store(self, key: str, payload: Any, ttl: int, response_model: Any = None) -> CachedBody:
+        """Serialize payload and cache it; returns the body even if Redis is down"""
+        body = serialize(payload, response_model)
+        cached = CachedBody(body=body, etag=compute_etag(body))
+        try:
+            if redis_client.available():
+                body_key, etag_key = self.keys(key)
+                pipe = redis_client.client.pipeline()
+                pipe.setex(body_key, ttl, cached.body)
+                pipe.setex(etag_key, ttl, cached.etag)
+                pipe.execute()
+        except Exception as e:
+            print(f"[ResponseBodyCache] store failed for {key}: {e}")
+        return cached
+
+    def etag(self, key: str) -> Optional[str]:
+        try:
+            if not redis_client.available():
+                return None
+            etag = redis_client.client.get(key + ETAG_SUFFIX)
+            return etag.decode() if etag else None
+        except Exception:
+            return None
+
+    def load(self, key: str) -> Optional[CachedBody]:
+        try:
+            if not redis_client.available():
+                return None
+            body, etag = redis_client.client.mget(self.keys(key))
+            if body is None or etag is None:
+                return None
+            return CachedBody(body=body, etag=etag.decode())
+        except Exception:
+            return None
+
+    def invalidate(self, *keys: str) -> None:
+        try:
+            if not redis_client.available():
+                return
+            redis_client.client.delete(*(k for key in keys for k in self.keys(key)))
+        except Exception:
+            pass
+
+    def respond(self, request: Request, key: str) -> Optional[Response]:
+        """304 or cached 200 for `key`, or None on a cache miss"""
+        if_none_match = parse_if_none_match(request.headers.get("if-none-match"))
+        if if_none_match:
+            etag = self.etag(key)
+            if etag and etag_matches(etag, if_none_match):
+                return Response(status_code=304, headers={"ETag": etag})
+        cached = self.load(key)
+        return self.to_response(request, cached) if cached else None
+
+    @staticmethod
+    def to_response(request: Request, cached: CachedBody) -> Response:
+        headers = {"ETag": cached.etag}
+        if etag_matches(cached.etag, parse_if_none_match(request.headers.get("if-none-match"))):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+# Create global response body cache instance
+response_cache = ResponseBodyCache()
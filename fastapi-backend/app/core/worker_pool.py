@@ -0,0 +1,161 @@
+# app/core/worker_pool.py
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class CryptoWorkerPool:
+    """
+    Executor stage for CPU-bound crypto and (de)serialization work.
+
+    Jobs at or above CRYPTO_OFFLOAD_THRESHOLD bytes leave the event loop so a
+    single large payload does not stall every other in-flight request;
+    smaller jobs run inline where a hop to the executor would cost more than
+    the work itself.
+
+    CRYPTO_EXECUTOR selects "thread", "process" or "none". Process mode only
+    applies to self-contained jobs (module-level function, picklable
+    arguments); stateful jobs such as a streaming cipher always run on the
+    thread pool.
+    """
+
+    def __init__(self):
+        self.mode = os.getenv("CRYPTO_EXECUTOR", "thread").lower()
+        self.max_workers = int(os.getenv("CRYPTO_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.threshold = int(os.getenv("CRYPTO_OFFLOAD_THRESHOLD", str(64 * 1024)))  # bytes
+
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # metrics
+        self.inline_jobs = 0
+        self.offloaded_jobs = 0
+        self.failed_jobs = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+        self.max_run = 0.0
+
+    def _executor(self, stateful: bool) -> Optional[Executor]:
+        if self.mode == "none":
+            return None
+        with self._lock:
+            if self.mode == "process" and not stateful:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+                return self._processes
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="crypto"
+                )
+            return self._threads
+
+    async def run(self, fn: Callable[..., Any], *args, size: int = 0, stateful: bool = False) -> Any:
+        """Run fn(*args), off the loop when size >= threshold"""
+        executor = self._executor(stateful) if size >= self.threshold else None
+        if executor is None:
+            self.inline_jobs += 1
+            return fn(*args)
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+
+        if isinstance(executor, ProcessPoolExecutor):
+            # Worker start time is not observable from here: jobs beyond the
+            # worker count are counted as queued, and the time reported is
+            # queue wait plus run time
+            with self._lock:
+                self.in_flight += 1
+                self.offloaded_jobs += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.in_flight - self.max_workers)
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except Exception:
+                self.failed_jobs += 1
+                raise
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                self._record(0.0, time.perf_counter() - submitted)
+
+        state = {"started": False, "abandoned": False}
+
+        def job():
+            begun = time.perf_counter()
+            with self._lock:
+                if not state["abandoned"]:
+                    state["started"] = True
+                    self.queued -= 1
+                    self.in_flight += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    if state["started"]:
+                        self.in_flight -= 1
+                self._record(begun - submitted, time.perf_counter() - begun)
+
+        with self._lock:
+            self.queued += 1
+            self.offloaded_jobs += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            return await loop.run_in_executor(executor, job)
+        except Exception:
+            self.failed_jobs += 1
+            raise
+        finally:
+            with self._lock:
+                if not state["started"] and not state["abandoned"]:
+                    # cancelled before a worker picked it up
+                    state["abandoned"] = True
+                    self.queued -= 1
+
+    def _record(self, wait: float, run: float) -> None:
+        with self._lock:
+            self.total_wait += wait
+            self.total_run += run
+            self.max_wait = max(self.max_wait, wait)
+            self.max_run = max(self.max_run, run)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor in (self._threads, self._processes):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+            self._processes = None
+
+    def queue_depth(self) -> int:
+        if self.mode == "process":
+            return max(0, self.in_flight - self.max_workers)
+        return self.queued
+
+    def stats(self) -> dict:
+        n = max(self.offloaded_jobs, 1)
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "threshold_bytes": self.threshold,
+            "queue_depth": self.queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "inline_jobs": self.inline_jobs,
+            "offloaded_jobs": self.offloaded_jobs,
+            "failed_jobs": self.failed_jobs,
+            "avg_wait_ms": round(self.total_wait / n * 1000, 3),
+            "avg_run_ms": round(self.total_run / n * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "max_run_ms": round(self.max_run * 1000, 3),
+        }
+
+
+# Create global crypto worker pool instance
+crypto_pool = CryptoWorkerPool()
@@ -4,6 +4,8 @@ from sqlalchemy.orm import sessionmaker
 import logging
 import sys
 
+from .core.boot import FAST_BOOT
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -56,8 +58,8 @@ def get_db():
     finally:
         db.close()
 
-# Test connection on import
-if __name__ != "__main__":  # Only test when imported, not when run directly
+# Test connection on import (FAST_BOOT defers this to an async startup probe)
+if __name__ != "__main__" and not FAST_BOOT:  # Only test when imported, not when run directly
     connection_success = test_database_connection()
     if not connection_success:
         logger.warning("⚠️  Application started with database connection issues")
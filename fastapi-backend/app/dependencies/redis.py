@@ -11,7 +11,7 @@ def get_redis_client() -> RedisClient:
     def example_endpoint(redis: RedisClient = Depends(get_redis_client)):
         redis.cache_survey(survey_id, survey_data)
     """
-    if not redis_client.ping():
+    if not redis_client.available():
         raise HTTPException(
             status_code=503, 
             detail="Redis service is unavailable"
@@ -33,6 +33,6 @@ def get_redis_optional() -> RedisClient:
             # Fallback to database only
             pass
     """
-    if redis_client.ping():
+    if redis_client.available():
         return redis_client
     return None
\ No newline at end of file
@@ -1,30 +1,41 @@
+import time
+_import_started = time.perf_counter()
+
 import os
 import asyncio
 import threading
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from app.db import Base, engine
-from app.middleware.decrypt_middleware import DecryptMiddleware
-from app.middleware.encrypt_middleware import EncryptGetMiddleware
+from app.db import test_database_connection
+from app.middleware.stack import install_middleware
 from app.models import init_models
+from app.scripts.create_schema import ensure_schema
 from contextlib import asynccontextmanager
 import logging
 
+from app.core import boot
+
 # Import Redis client and utilities
 from app.core.redis_client import redis_client
+from app.core.cache import cache
+from app.core.cache_bus import cache_bus
+from app.core.json_codec import CodecJSONResponse
+from app.core.key_pool import session_key_pool
+from app.core.worker_pool import crypto_pool
+from app.utils.crypto_utils import aes_key_cache
 from app.utils.redis_utils import RedisHealthCheck, RedisProjectAnalytics, RedisKeyManager
 from app.routes.rbac.assignments import router as rbac_router
 
 # Import outbox processor
 from app.services.outbox_processor import run_forever as run_outbox_processor
-from app.middleware.request_context import request_context_middleware
 from app.services.campaign_scheduler_service import start_scheduler, stop_scheduler
+from app.services.response_ingest import response_ingest
 
 # Import all models so SQLAlchemy knows about them
 init_models()
 
-# Create tables in the database
-Base.metadata.create_all(bind=engine)
+# Create tables and added columns (FAST_BOOT: run `python -m app.scripts.create_schema` at deploy instead)
+if not boot.FAST_BOOT:
+    ensure_schema()
 
 from app.routes import (
     quota, secure_crud, user, project, survey, questions, responses, tickets, webhook, answer,
@@ -33,7 +44,8 @@ from app.routes import (
     support_groups, support_teams, support_routing, slas, business_calendars, tags, 
     ticket_categories, ticket_sla, ticket_taxonomies, audit_events, contact_emails, campaign_results,
     contact_lists, list_members, contact_phone, contact_socials, ticket_templates, audience_files,
-    themes, campaigns, scheduler_routes, salesforce_routes, salesforce_campaign_routes, salesforce_sync_routes, group, participant_sources,assignments, rbac_permissions
+    themes, campaigns, scheduler_routes, salesforce_routes, salesforce_campaign_routes, salesforce_sync_routes, group, participant_sources,assignments, rbac_permissions,
+    survey_results
 )
 # Configure logging
 logging.basicConfig(
@@ -72,44 +84,39 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for startup/shutdown events
     """
     global outbox_processor_thread
+    startup_started = time.perf_counter()
     
+    # Connectivity probes, concurrently and off the event loop
+    # (FAST_BOOT skipped the database probe at import)
+    probes = [boot.run_probe("redis", redis_client.ping)]
+    if boot.FAST_BOOT:
+        probes.append(boot.run_probe("database", test_database_connection))
+    await asyncio.gather(*probes)
     
-    # Test Redis connection with detailed info
-    try:
-        redis_info = RedisHealthCheck.get_redis_info()
-        if redis_info["status"] == "connected":
-            logger.info("✅ Redis connected successfully")
-        else:
-            logger.warning(f"   - Error: {redis_info.get('error', 'Unknown error')}")
-    except Exception as e:
-        logger.warning(f"⚠️  Warning: Redis connection error: {e}")
-    
-    # Get Redis cache statistics
-    try:
-        cache_stats = RedisHealthCheck.get_cache_statistics("project:*")
-        if "error" not in cache_stats:
-            logger.info(f"📊 Redis Cache Statistics:")
-            logger.info(f"   - Project Keys: {cache_stats.get('total_keys', 0)}")
-            logger.info(f"   - Estimated Cache Size: {cache_stats.get('estimated_total_size_human', '0 KB')}")
-    except Exception as e:
-        logger.warning(f"⚠️  Warning: Could not get cache statistics: {e}")
+    # Get Redis cache statistics (walks the keyspace, so not on fast boots)
+    if not boot.FAST_BOOT and boot.probe_results["redis"]["ok"]:
+        try:
+            cache_stats = await asyncio.to_thread(RedisHealthCheck.get_cache_statistics, "project:*")
+            if "error" not in cache_stats:
+                logger.info(f"📊 Redis Cache Statistics:")
+                logger.info(f"   - Project Keys: {cache_stats.get('total_keys', 0)}")
+                logger.info(f"   - Estimated Cache Size: {cache_stats.get('estimated_total_size_human', '0 KB')}")
+        except Exception as e:
+            logger.warning(f"⚠️  Warning: Could not get cache statistics: {e}")
     
-    # Test key server connection if encryption is enabled
+    # Prefill the session key pool if encryption is enabled
     if ENABLE_ENCRYPTION:
         try:
-            import httpx
-            timeout = httpx.Timeout(5.0, connect=3.0)
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                test_key_id = "startup_test"
-                response = await client.get(f"https://surveyarcdocker.onrender.com/get-key/{test_key_id}")
-                if response.status_code == 200:
-                    logger.info("✅ Key server connected successfully")
-                else:
-                    logger.warning(f"⚠️  Warning: Key server returned {response.status_code}")
-                    if not ENCRYPTION_FALLBACK:
-                        logger.error("❌ Encryption fallback disabled - this may cause issues")
+            if await session_key_pool.start():
+                logger.info("✅ Key server connected, session key pool ready")
+                logger.info(f"   - Pool Size: {session_key_pool.pool_size}")
+                logger.info(f"   - Rotation Interval: {session_key_pool.rotation_interval}s")
+            else:
+                logger.warning("⚠️  Warning: Session key pool is empty, keys will be fetched on demand")
+                if not ENCRYPTION_FALLBACK:
+                    logger.error("❌ Encryption fallback disabled - this may cause issues")
         except Exception as e:
-            logger.warning(f"⚠️  Warning: Key server connection failed: {e}")
+            logger.warning(f"⚠️  Warning: Key pool startup failed: {e}")
             if not ENCRYPTION_FALLBACK:
                 logger.error("❌ Encryption fallback disabled - API may fail")
     
@@ -127,6 +134,16 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("ℹ️  Outbox processor disabled (set ENABLE_OUTBOX_PROCESSOR=true to enable)")
     
+    # Start the write-behind response flusher (RESPONSE_WRITE_BEHIND=true)
+    if response_ingest.start():
+        logger.info("✅ Response ingest flusher started")
+        logger.info(f"   - Batch Size: {response_ingest.batch_size}")
+        logger.info(f"   - Max Latency: {response_ingest.max_latency_ms}ms")
+    
+    # Subscribe to other workers' cache invalidations (CACHE_BUS_ENABLED)
+    if cache_bus.start():
+        logger.info(f"✅ Cache invalidation bus started on {cache_bus.channel}")
+    
     # Start campaign scheduler
     try:
         start_scheduler(check_interval=CAMPAIGN_SCHEDULER_INTERVAL)
@@ -135,8 +152,9 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to start campaign scheduler: {e}")
     
+    boot.boot_timings["startup"] = time.perf_counter() - startup_started
     logger.info("=" * 80)
-    logger.info("✅ Application startup complete")
+    logger.info(f"✅ Application startup complete ({boot.report()['timings_ms']})")
     logger.info("=" * 80)
     
     yield
@@ -153,6 +171,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"⚠️  Warning: Campaign scheduler shutdown failed: {e}")
     
+    # Stop the response flusher after its batch in flight
+    try:
+        response_ingest.stop()
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Response ingest flusher shutdown failed: {e}")
+    
+    try:
+        cache_bus.stop()
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Cache invalidation bus shutdown failed: {e}")
+    
+    # Stop session key pool refill
+    try:
+        await session_key_pool.stop()
+        logger.info("✅ Session key pool stopped")
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Session key pool shutdown failed: {e}")
+    
+    # Stop crypto executor
+    try:
+        crypto_pool.shutdown()
+        logger.info("✅ Crypto executor stopped")
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Crypto executor shutdown failed: {e}")
+    
     # Stop outbox processor
     if outbox_processor_thread and outbox_processor_thread.is_alive():
         logger.info("🛑 Outbox processor will terminate with main process")
@@ -173,26 +216,12 @@ app = FastAPI(
     title="Survey & Ticket Management API",
     description="FastAPI application with Redis caching layer for improved performance",
     version="1.0.0",
-    lifespan=lifespan  # Register the lifespan context manager
+    lifespan=lifespan,  # Register the lifespan context manager
+    default_response_class=CodecJSONResponse,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Add custom middleware
-app.add_middleware(DecryptMiddleware)
-app.middleware("http")(request_context_middleware)
-app.add_middleware(
-    EncryptGetMiddleware, 
-    enable_encryption=ENABLE_ENCRYPTION, 
-    fallback_on_error=ENCRYPTION_FALLBACK
-)
+# Add CORS, decrypt, request-context and encrypt middleware
+install_middleware(app, enable_encryption=ENABLE_ENCRYPTION, fallback_on_error=ENCRYPTION_FALLBACK)
 
 # ==================== HEALTH CHECK ENDPOINTS ====================
 
@@ -222,11 +251,17 @@ def health_check():
             "version": redis_info.get("redis_version"),
             "memory_used": redis_info.get("used_memory_human"),
             "hit_ratio": redis_info.get("hit_ratio"),
-            "uptime": redis_info.get("uptime_in_seconds")
+            "uptime": redis_info.get("uptime_in_seconds"),
+            "client": redis_client.stats()
         },
+        "cache": cache.stats(),
+        "cache_bus": cache_bus.stats(),
         "encryption": {
             "enabled": ENABLE_ENCRYPTION,
-            "fallback_enabled": ENCRYPTION_FALLBACK
+            "fallback_enabled": ENCRYPTION_FALLBACK,
+            "key_pool": session_key_pool.stats() if ENABLE_ENCRYPTION else None,
+            "key_cache": aes_key_cache.stats(),
+            "executor": crypto_pool.stats()
         },
         "outbox_processor": {
             "enabled": ENABLE_OUTBOX_PROCESSOR,
@@ -237,11 +272,18 @@ def health_check():
         "campaign_scheduler": {
             "interval": CAMPAIGN_SCHEDULER_INTERVAL
         },
+        "response_ingest": response_ingest.stats(),
         "api": "Survey & Ticket Management API",
         "version": "1.0.0"
     }
 
 
+@app.get("/health/boot")
+def boot_health():
+    """Boot mode, import/startup timings and startup probe results"""
+    return boot.report()
+
+
 @app.get("/health/redis")
 def redis_health_detailed():
     """Detailed Redis health check"""
@@ -284,7 +326,7 @@ def outbox_health():
 def redis_info():
     """Get Redis database information for admin monitoring"""
     try:
-        if not redis_client.ping():
+        if not redis_client.available():
             raise HTTPException(status_code=503, detail="Redis connection failed")
         
         # Get basic Redis info
@@ -310,14 +352,20 @@ def redis_info():
 def redis_keys(pattern: str = "*"):
     """Get all Redis keys (for debugging/admin purposes)"""
     try:
-        if not redis_client.ping():
+        if not redis_client.available():
             raise HTTPException(status_code=503, detail="Redis connection failed")
         
-        keys = redis_client.client.keys(pattern)
+        # incremental SCAN (bounded by REDIS_SCAN_MAX_CALLS), never KEYS
+        truncated_before = redis_client.scans_truncated
+        total, keys = 0, []
+        for batch in redis_client.scan_batches(pattern):
+            total += len(batch)
+            keys.extend(batch[:100 - len(keys)])
         return {
-            "total_keys": len(keys),
-            "keys": keys[:100] if len(keys) > 100 else keys,
-            "note": "Showing first 100 keys" if len(keys) > 100 else "All keys shown"
+            "total_keys": total,
+            "keys": keys,
+            "note": "Showing first 100 keys" if total > 100 else "All keys shown",
+            "complete": redis_client.scans_truncated == truncated_before
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Redis error: {str(e)}")
@@ -327,7 +375,7 @@ def redis_keys(pattern: str = "*"):
 def redis_cache_stats(pattern: str = "project:*"):
     """Get cache statistics for specific pattern"""
     try:
-        if not redis_client.ping():
+        if not redis_client.available():
             raise HTTPException(status_code=503, detail="Redis connection failed")
         
         return RedisHealthCheck.get_cache_statistics(pattern)
@@ -339,7 +387,7 @@ def redis_cache_stats(pattern: str = "project:*"):
 def redis_cache_cleanup(dry_run: bool = True):
     """Clean up Redis cache keys"""
     try:
-        if not redis_client.ping():
+        if not redis_client.available():
             raise HTTPException(status_code=503, detail="Redis connection failed")
         
         return RedisKeyManager.cleanup_expired_keys(dry_run)
@@ -351,7 +399,7 @@ def redis_cache_cleanup(dry_run: bool = True):
 async def get_org_analytics(org_id: str):
     """Get organization project analytics from Redis"""
     try:
-        if not redis_client.ping():
+        if not redis_client.available():
             raise HTTPException(status_code=503, detail="Redis connection failed")
         
         analytics = await RedisProjectAnalytics.get_project_analytics(org_id)
@@ -420,4 +468,6 @@ app.include_router(group.router)
 app.include_router(participant_sources.router)
 app.include_router(assignments.router)
 app.include_router(rbac_permissions.router)
+app.include_router(survey_results.router)
 
+boot.boot_timings["import"] = time.perf_counter() - _import_started
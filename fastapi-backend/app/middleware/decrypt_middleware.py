@@ -1,12 +1,9 @@
 # app/middleware/decrypt_middleware.py
-import json, base64, traceback
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+import traceback
 from starlette.responses import JSONResponse
-from app.utils.crypto_utils import load_private_key
-
-private_key = load_private_key()
+from app.core import json_codec
+from app.core.worker_pool import crypto_pool
+from app.utils.crypto_utils import decrypt_envelope_body
 
 class DecryptMiddleware:
     def __init__(self, app):
@@ -18,12 +15,13 @@ class DecryptMiddleware:
             return
 
         async def receive_wrapper():
-            body = b""
+            chunks = []
             more_body = True
             while more_body:
                 message = await receive()
-                body += message.get("body", b"")
+                chunks.append(message.get("body", b""))
                 more_body = message.get("more_body", False)
+            body = b"".join(chunks)
 
             try:
                 # ============================================
@@ -51,43 +49,23 @@ class DecryptMiddleware:
                     if not body:
                         return {"type": "http.request", "body": body, "more_body": False}
                     
-                    # Try to parse as JSON
+                    # Parse + decrypt off the event loop for large bodies
                     try:
-                        data = json.loads(body.decode("utf-8"))
-                    except json.JSONDecodeError:
+                        decrypted_bytes = await crypto_pool.run(
+                            decrypt_envelope_body, body, size=len(body)
+                        )
+                    except json_codec.JSONDecodeError:
                         # Not JSON, pass through
                         print(f"[DecryptMiddleware] Not JSON, passing through")
                         return {"type": "http.request", "body": body, "more_body": False}
                     
                     # Only decrypt if encrypted_key is present
-                    if "encrypted_key" in data:
+                    if decrypted_bytes is not None:
                         print(f"[DecryptMiddleware] DecryptMiddleware activated for {scope['path']}")
+                        print("Decrypted payload preview:", decrypted_bytes[:200])
 
-                        encrypted_key_bytes = base64.b64decode(data["encrypted_key"])
-                        ciphertext_bytes   = base64.b64decode(data["ciphertext"])
-                        iv_bytes           = base64.b64decode(data["iv"])
-                        tag_bytes          = base64.b64decode(data["tag"])
-
-                        aes_key = private_key.decrypt(
-                            encrypted_key_bytes,
-                            padding.OAEP(
-                                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                algorithm=hashes.SHA256(),
-                                label=None
-                            )
-                        )
-
-                        decryptor = Cipher(
-                            algorithms.AES(aes_key), modes.GCM(iv_bytes, tag_bytes)
-                        ).decryptor()
-                        decrypted_bytes = decryptor.update(ciphertext_bytes) + decryptor.finalize()
-                        decrypted_text = decrypted_bytes.decode("utf-8")
-
-                        decrypted_data = json.loads(decrypted_text)
-                        print("Decrypted payload preview:", decrypted_data)
-
-                        # Replace request body with decrypted JSON
-                        body = json.dumps(decrypted_data).encode("utf-8")
+                        # Replace request body with the decrypted JSON bytes as sent by the client
+                        body = decrypted_bytes
                         # Ensure content-type header
                         headers = [(b"content-type", b"application/json")]
                         scope["headers"] = headers + [
@@ -1,134 +1,205 @@
-import time
-import json
+import os
 import base64
-import asyncio
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.responses import JSONResponse
-from fastapi import Request
-import httpx
-from app.utils.crypto_utils import encrypt_aes_gcm
+import traceback
+from typing import Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from app.core import json_codec
+from app.core.key_pool import session_key_pool
+from app.core.worker_pool import crypto_pool
+from app.utils.crypto_utils import AESGCMStreamEncryptor, AESGCMFrameEncryptor
+from app.utils.compression_utils import StreamCompressor, negotiate
 
-# KEYSERVER_URL = "http://localhost:8001/get-key"
-KEYSERVER_URL = "https://surveyarcdocker.onrender.com/get-key"
+# Clients that can decrypt frame by frame ask for it with this header;
+# everyone else gets the classic {key_id, encrypted_key, ciphertext, iv, tag}.
+HDR_ENCRYPTION_MODE = "x-encryption-mode"
+FRAMED_MODE = "framed"
+# Comma-separated compressions the client can undo after decrypting
+# (e.g. "zstd, gzip"); the chosen one is flagged in the envelope
+HDR_ENVELOPE_ENCODING = "x-envelope-encoding"
+FRAME_SIZE = int(os.getenv("ENCRYPTION_FRAME_SIZE", str(64 * 1024)))
+# Encrypted bodies carry the plaintext ETag bound to their session key:
+# "<etag>@<key_id>". A cached envelope is only revalidated (304) while its
+# key is still the active one, so clients never keep an envelope whose key
+# the key server may already have expired.
+ETAG_KEY_SEPARATOR = "@"
+
+
+def _bind_etag(etag: str, key_id: str) -> str:
+    if not etag.endswith('"'):
+        return etag
+    return etag[:-1] + ETAG_KEY_SEPARATOR + key_id + '"'
+
+
+def _unbind_if_none_match(value: str, active_key_id: Optional[str]) -> Tuple[str, bool]:
+    """
+    Strip the key binding from If-None-Match entries sealed with the active
+    key and drop entries bound to any other key. Unbound entries (plain
+    responses, non-JSON endpoints) are kept as they are. Returns the new
+    header value and whether a bound entry was kept.
+    """
+    kept, bound = [], False
+    for tag in value.split(","):
+        tag = tag.strip()
+        if ETAG_KEY_SEPARATOR not in tag:
+            if tag:
+                kept.append(tag)
+            continue
+        etag, _, key_id = tag[:-1].rpartition(ETAG_KEY_SEPARATOR)
+        if key_id and key_id == active_key_id:
+            kept.append(etag + '"')
+            bound = True
+    return ", ".join(kept), bound
+
+
+def _encrypt_chunk(enc, comp, chunk: bytes, more_body: bool) -> bytes:
+    """Compress (optional) and encrypt one body chunk in the wire format of enc"""
+    if comp is not None:
+        chunk = comp.compress(chunk)
+        if not more_body:
+            chunk += comp.flush()
+
+    if isinstance(enc, AESGCMFrameEncryptor):
+        frames = enc.update(chunk) if chunk else []
+        if not more_body:
+            frames.append(enc.finalize())
+        return b"".join(json_codec.dumpb(f) + b"\n" for f in frames)
+
+    out = enc.update(chunk) if chunk else b""
+    if not more_body:
+        tail, tag = enc.finalize()
+        out += tail + b'","tag":"' + base64.b64encode(tag) + b'"}'
+    return out
+
+
+class EncryptGetMiddleware:
+    """
+    Encrypts successful JSON GET responses as they stream out.
+
+    The already-serialized body is fed chunk by chunk into AES-GCM; nothing
+    is re-parsed and the full body is never held in memory. In the default
+    mode the legacy envelope is written with `tag` as its last field, so
+    existing clients decode it unchanged. Clients that send
+    x-envelope-encoding get the plaintext compressed before encryption and a
+    `compression` field in the envelope. ETags set by the route (see
+    app.core.response_cache) are bound to the session key on the way out.
+    """
 
-class EncryptGetMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, enable_encryption: bool = True, fallback_on_error: bool = True):
-        super().__init__(app)
+        self.app = app
         self.enable_encryption = enable_encryption
         self.fallback_on_error = fallback_on_error
 
-    async def dispatch(self, request: Request, call_next):
-        request_path = request.url.path
-        
-        if request.method != "GET":
-            return await call_next(request)
-
-        response = await call_next(request)
-        
-        # Skip encryption for non-200 responses or non-JSON content
-        if response.status_code != 200 or "application/json" not in response.headers.get("content-type", ""):
-            return response
-
-        # Skip encryption if disabled
-        if not self.enable_encryption:
-            return response
-
-        try:
-            
-            # Read response body
-            body_bytes = b"".join([section async for section in response.body_iterator])
-            
-            data = json.loads(body_bytes.decode("utf-8"))
-
-            # Generate key_id
-            timestamp = int(time.time() * 1000)
-            key_id = f"req_{timestamp}"
-
-            # Validate key_id is not None or empty
-            if not key_id or key_id == "req_":
-                raise ValueError(f"Invalid key_id generated: {key_id}")
-
-            # Add timeout and retry logic
-            max_retries = 2
-            timeout = httpx.Timeout(10.0, connect=5.0)  # Increased timeouts
-            key_server_url = f"{KEYSERVER_URL}/{key_id}"
-            
-            for attempt in range(max_retries):
-                try:
-                    
-                    async with httpx.AsyncClient(timeout=timeout) as client:
-                        key_res = await client.get(key_server_url)
-                        
-                        
-                        if key_res.status_code != 200:
-                            raise httpx.HTTPStatusError(
-                                f"Key server returned {key_res.status_code}", 
-                                request=key_res.request, 
-                                response=key_res
-                            )
-                        
-                        key_data = key_res.json()
-                    
-                    break  # Success, exit retry loop
-                    
-                except (httpx.ConnectError, httpx.TimeoutException, httpx.HTTPStatusError) as e:
-                    error_msg = f"[EncryptGetMiddleware] Attempt {attempt + 1} failed: {type(e).__name__}: {e}"
-                    print(error_msg)
-                    
-                    if attempt == max_retries - 1:  # Last attempt
-                        print(f"[EncryptGetMiddleware] All {max_retries} attempts failed, raising exception")
-                        raise e
-                    
-                    await asyncio.sleep(0.5)  # Brief delay before retry
-
-            
-            # Validate key data
-            if "encrypted_key" not in key_data or "aes_key_b64" not in key_data:
-                raise ValueError(f"Invalid key data from server: {list(key_data.keys())}")
-            
-            encrypted_key = key_data["encrypted_key"]
-            aes_key_b64 = key_data["aes_key_b64"]
-            
-
-            
-            aes_key = base64.b64decode(aes_key_b64)
-
-            encrypted_payload = encrypt_aes_gcm(data, aes_key)
-
-            result = {
-                "key_id": key_id, 
-                "encrypted_key": encrypted_key, 
-                **encrypted_payload
-            }
-            
-            return JSONResponse(result, media_type="application/json")
-
-        except Exception as e:
-            error_msg = f"[EncryptGetMiddleware] Encryption failed: {type(e).__name__}: {e}"
-            print(error_msg)
-            
-            # Print stack trace for debugging
-            import traceback
-            traceback.print_exc()
-            
-            # Return original response if fallback is enabled
-            if self.fallback_on_error:
-                print("[EncryptGetMiddleware] Falling back to unencrypted response")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.enable_encryption:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        framed = request_headers.get(HDR_ENCRYPTION_MODE, "").lower() == FRAMED_MODE
+        accepted_encodings = request_headers.get(HDR_ENVELOPE_ENCODING, "").split(",")
+        state = {"mode": None, "encryptor": None, "compressor": None, "etag_key_id": None}
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            active_key_id = session_key_pool.active_key_id()
+            if_none_match, bound = _unbind_if_none_match(if_none_match, active_key_id)
+            state["etag_key_id"] = active_key_id if bound else None
+            raw = [(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+            if if_none_match:
+                raw.append((b"if-none-match", if_none_match.encode("latin-1")))
+            scope = dict(scope, headers=raw)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message.setdefault("headers", []))
+                if message["status"] == 304 and state["etag_key_id"] and "etag" in headers:
+                    headers["etag"] = _bind_etag(headers["etag"], state["etag_key_id"])
+                if message["status"] != 200 or "application/json" not in headers.get("content-type", ""):
+                    state["mode"] = "passthrough"
+                    await send(message)
+                    return
+
                 try:
-                    return JSONResponse(data, media_type="application/json")
-                except Exception as fallback_error:
-                    print(f"[EncryptGetMiddleware] Fallback also failed: {fallback_error}")
-                    return JSONResponse(
-                        {"status": "error", "message": "Complete encryption failure"},
-                        status_code=500
+                    # Active session key from the local pool (no key-server hop)
+                    session_key = await session_key_pool.current()
+                except Exception as e:
+                    print(f"[EncryptGetMiddleware] Encryption failed: {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    if self.fallback_on_error:
+                        print("[EncryptGetMiddleware] Falling back to unencrypted response")
+                        state["mode"] = "passthrough"
+                        await send(message)
+                    else:
+                        state["mode"] = "drop"
+                        await self._send_unavailable(send, e)
+                    return
+
+                # Compress before encrypting (ciphertext does not compress)
+                length = headers.get("content-length")
+                compression = negotiate(accepted_encodings, int(length) if length else None)
+                comp = StreamCompressor(compression) if compression else None
+                headers.add_vary_header(HDR_ENVELOPE_ENCODING)
+
+                del headers["content-length"]
+                if "etag" in headers:
+                    headers["etag"] = _bind_etag(headers["etag"], session_key.key_id)
+                if framed:
+                    enc = AESGCMFrameEncryptor(session_key.aes_key, FRAME_SIZE)
+                    headers["content-type"] = "application/x-ndjson"
+                    head = json_codec.dumpb({
+                        "key_id": session_key.key_id,
+                        "encrypted_key": session_key.encrypted_key,
+                        "alg": "AES-256-GCM-FRAMED",
+                        "nonce_prefix": base64.b64encode(enc.nonce_prefix).decode(),
+                        "frame_size": enc.frame_size,
+                        "compression": compression,
+                    }) + b"\n"
+                else:
+                    enc = AESGCMStreamEncryptor(session_key.aes_key)
+                    head = (
+                        b'{"key_id":' + json_codec.dumpb(session_key.key_id)
+                        + b',"encrypted_key":' + json_codec.dumpb(session_key.encrypted_key)
+                        + (b',"compression":"' + compression.encode() + b'"' if compression else b"")
+                        + b',"iv":"' + base64.b64encode(enc.iv) + b'","ciphertext":"'
                     )
-            else:
-                # Return error response
-                return JSONResponse(
-                    {
-                        "status": "error", 
-                        "message": "Encryption service unavailable",
-                        "details": str(e)
-                    }, 
-                    status_code=503
-                )
\ No newline at end of file
+                state["mode"] = "framed" if framed else "envelope"
+                state["encryptor"] = enc
+                state["compressor"] = comp
+
+                await send(message)
+                await send({"type": "http.response.body", "body": head, "more_body": True})
+                return
+
+            if message["type"] != "http.response.body" or state["mode"] == "passthrough":
+                await send(message)
+                return
+            if state["mode"] == "drop":
+                return
+
+            enc = state["encryptor"]
+            chunk = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            # Stateful cipher: large chunks go to the crypto thread pool
+            out = await crypto_pool.run(
+                _encrypt_chunk, enc, state["compressor"], chunk, more_body,
+                size=len(chunk), stateful=True
+            )
+
+            if out or not more_body:
+                await send({"type": "http.response.body", "body": out, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    async def _send_unavailable(send, error: Exception):
+        response = JSONResponse(
+            {
+                "status": "error",
+                "message": "Encryption service unavailable",
+                "details": str(error)
+            },
+            status_code=503
+        )
+        await response({"type": "http"}, None, send)
@@ -0,0 +1,31 @@
+# app/middleware/stack.py
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from app.middleware.decrypt_middleware import DecryptMiddleware
+from app.middleware.encrypt_middleware import EncryptGetMiddleware
+from app.middleware.request_context import request_context_middleware
+
+
+def install_middleware(app: FastAPI, enable_encryption: bool = True, fallback_on_error: bool = True) -> None:
+    """
+    Register the request pipeline middleware in production order.
+    Shared by app.main and the benchmarks so both run the same stack.
+    """
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Link", "X-Next-Cursor"],
+    )
+
+    # Add custom middleware
+    app.add_middleware(DecryptMiddleware)
+    app.middleware("http")(request_context_middleware)
+    app.add_middleware(
+        EncryptGetMiddleware,
+        enable_encryption=enable_encryption,
+        fallback_on_error=fallback_on_error
+    )
@@ -13,6 +13,7 @@ def init_models():
     from .answer import Answer
     from .webhook import Webhook    
     from .archive import Archive
+    from .survey_results import SurveyResultRollup
     from .audit_log import AuditLog
     from .domains import Domain
     from .integration import Integration
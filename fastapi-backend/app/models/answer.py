@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, ForeignKey, DateTime, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db import Base
@@ -21,3 +21,8 @@ class Answer(Base):
 
     # 🔗 many-to-one relationship (Answer → Response)
     response = relationship("Response", back_populates="answers")
+
+    # one row per question per response: answer writes upsert on this key
+    __table_args__ = (
+        UniqueConstraint("response_id", "question_id", name="uq_answer_response_question"),
+    )
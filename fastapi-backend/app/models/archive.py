@@ -13,3 +13,7 @@ class Archive(Base):
     record_count = Column(Integer, default=0)
     size_bytes = Column(Integer, default=0)
     generated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # survey exports: which survey, and the newest response change included
+    survey_id = Column(String, index=True, nullable=True)
+    watermark = Column(DateTime(timezone=True), nullable=True)
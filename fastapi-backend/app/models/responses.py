@@ -1,5 +1,5 @@
 # app/models/responses.py
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, BigInteger, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db import Base
@@ -30,9 +30,21 @@ class Response(Base):
     # inline answers snapshot
     answers_blob = Column(JSON, default=list)
 
+    # highest client sequence number applied by delta autosave
+    autosave_seq = Column(BigInteger, nullable=True)
+
+    # hashed client idempotency key; a retried submission maps to this row
+    idempotency_key = Column(String, nullable=True)
+
     # relational answers
     answers = relationship(
         "Answer",
         back_populates="response",
         cascade="all, delete-orphan"
     )
+
+    # keyset pagination / export order: newest first within a survey
+    __table_args__ = (
+        Index("ix_responses_survey_started_id", "survey_id", "started_at", "response_id"),
+        Index("uq_responses_survey_idempotency_key", "survey_id", "idempotency_key", unique=True),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Float
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class SurveyResultRollup(Base):
+    """
+    Durable per-question aggregates, one additive counter per row:
+    n, opt:<option>, num_n, sum, sumsq, hist:<bucket> for questions and
+    started/completed under question_id FUNNEL_ID for the survey.
+    """
+    __tablename__ = "survey_result_rollups"
+
+    survey_id = Column(String, primary_key=True)
+    question_id = Column(String, primary_key=True)
+    field = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
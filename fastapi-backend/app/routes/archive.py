@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models.archive import Archive
 from ..schemas.archive import ArchiveCreate, ArchiveResponse
+from ..services.answer_columnar_export import export_survey_answers
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import func
 
@@ -47,3 +48,15 @@ def delete_archive(archive_id: str, db: Session = Depends(get_db)):
     db.delete(db_archive)
     db.commit()
     return {"detail": "Archive deleted"}
+
+@router.post("/surveys/{survey_id}/answers", response_model=ArchiveResponse)
+def export_answers(
+    survey_id: str,
+    full: bool = Query(False, description="Re-export every response instead of changes since the last export"),
+    db: Session = Depends(get_db),
+):
+    """Columnar (Parquet) answer export, registered as an archive; 204 when nothing changed"""
+    archive = export_survey_answers(db, survey_id, full=full)
+    if archive is None:
+        return Response(status_code=204)
+    return archive
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File,
 from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
-import pandas as pd
 import io
 import os
 from datetime import datetime, UTC
@@ -75,6 +74,12 @@ async def upload_audience_file(
         
         print(f"📊 [Backend] File size: {len(content) / 1024:.2f} KB")
         
+        # pandas is heavy and only needed here: import it on first upload
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise HTTPException(status_code=503, detail=f"File parsing unavailable: {e}")
+        
         # Parse file based on extension
         try:
             if file_extension == 'csv' or file.content_type == 'text/csv':
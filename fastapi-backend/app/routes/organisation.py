@@ -82,7 +82,7 @@ def _deserialize_organisation(org_data: dict) -> dict:
 def _redis_set_json(redis: Optional[RedisClient], key: str, value, ex: Optional[int] = None):
     """Serialize value to JSON and store via wrapper safely."""
     try:
-        if redis and redis.ping():
+        if redis and redis.available():
             payload = serialize_for_redis(value)
             redis.safe_set(key, payload, ex=ex)
     except Exception as e:
@@ -91,7 +91,7 @@ def _redis_set_json(redis: Optional[RedisClient], key: str, value, ex: Optional[
 def _redis_get_json(redis: Optional[RedisClient], key: str):
     """Get JSON string and deserialize to Python object; return None if missing."""
     try:
-        if not (redis and redis.ping()):
+        if not (redis and redis.available()):
             return None
         raw = redis.safe_get(key)
         return deserialize_from_redis(raw)
@@ -101,7 +101,7 @@ def _redis_get_json(redis: Optional[RedisClient], key: str):
 
 def _redis_delete(redis: Optional[RedisClient], *keys: str):
     try:
-        if redis and redis.ping():
+        if redis and redis.available():
             redis.safe_delete(*keys)
     except Exception as e:
         print(f"[organisation] redis delete error (ignored): {e}")
@@ -109,7 +109,7 @@ def _redis_delete(redis: Optional[RedisClient], *keys: str):
 def _redis_clear_pattern(redis: Optional[RedisClient], pattern: str):
     """Prefer flush_pattern; if unavailable, no-op."""
     try:
-        if redis and redis.ping():
+        if redis and redis.available():
             if hasattr(redis, "flush_pattern"):
                 redis.flush_pattern(pattern)
             elif hasattr(redis, "clear_pattern"):
@@ -121,7 +121,7 @@ def _redis_clear_pattern(redis: Optional[RedisClient], pattern: str):
 def _redis_invalidate_user_session(redis: Optional[RedisClient], uid: str):
     """Fallback if client lacks a helper: delete user_session:{uid}."""
     try:
-        if not (redis and redis.ping()):
+        if not (redis and redis.available()):
             return
         if hasattr(redis, "invalidate_user_session"):
             getattr(redis, "invalidate_user_session")(uid)
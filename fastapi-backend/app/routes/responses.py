@@ -1,14 +1,23 @@
+import hashlib
 import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response as HTTPResponse
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..core.response_cache import response_cache
 from ..db import get_db
 from ..models.answer import Answer
 from ..models.responses import Response
-from ..schemas.responses import ResponseCreate, ResponseUpdate, ResponseOut
+from ..schemas.responses import (
+    ResponseCreate, ResponseUpdate, ResponseOut, ResponseAnswersDelta, ResponseAutosaveOut,
+)
+from ..services import response_export, survey_results
+from ..services.answer_writer import build_answer_rows, upsert_answers
+from ..services.response_ingest import response_ingest
 from ..services.redis_response_service import RedisResponseService
 
 router = APIRouter(prefix="/responses", tags=["Responses"])
@@ -23,39 +32,91 @@ def normalize_response(row):
     base["answers"] = row.answers_blob or []
     return base
 
-def _write_answers(db, survey_id: str, response_id: str, answers: list, org_id: str):
-    from ..models.answer import Answer
-    from ..schemas.answer import AnswerCreate
-    import uuid
-    # print("_write_answers called with:", survey_id, response_id, answers, org_id)
-    for ans in answers:
+def merge_answers(blob: list, changed: list) -> list:
+    """Replace or append changed answers in an answers snapshot, keyed by questionId"""
+    merged = list(blob or [])
+    position = {a.get("questionId"): i for i, a in enumerate(merged) if a}
+    for ans in changed:
         if not ans:
             continue
-
-        question_id = ans.get("questionId")
-        project_id = ans.get("projectId") or ""
-        answer_val = ans.get("answer")
-
-        answer_data = AnswerCreate(
-            question_id=question_id,
-            project_id=project_id,
-            survey_id=survey_id,
-            org_id=org_id, 
-            response_id=response_id,
-            answer_config={"value": answer_val},
-        )
-
-        new_id = str(uuid.uuid4())
-        db_answer = Answer(id=new_id, **answer_data.dict())
-        db.add(db_answer)
-
+        qid = ans.get("questionId")
+        if qid in position:
+            merged[position[qid]] = ans
+        else:
+            position[qid] = len(merged)
+            merged.append(ans)
+    return merged
+
+def submission_key(respondent_id: str, header: Optional[str], nonce: Optional[str]) -> Optional[str]:
+    """Hashed idempotency key: the Idempotency-Key header, else respondent + client_nonce"""
+    if header:
+        raw = f"h:{header}"
+    elif nonce:
+        raw = f"n:{respondent_id}:{nonce}"
+    else:
+        return None
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def _replay(http_response: HTTPResponse, response: dict) -> dict:
+    http_response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+def _find_response(db: Session, response_id: str) -> Optional[dict]:
+    cached = RedisResponseService.get_response(response_id)
+    if cached is not None:
+        return cached
+    row = db.get(Response, response_id)
+    return normalize_response(row) if row else None
 
 @router.post("/", response_model=ResponseOut)
-def create_response(data: ResponseCreate, db: Session = Depends(get_db)):
-    rid = data.response_id or "resp_" + uuid.uuid4().hex[:10]
+def create_response(
+    data: ResponseCreate,
+    http_response: HTTPResponse,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=200),
+    db: Session = Depends(get_db),
+):
+    idem = submission_key(data.respondent_id, idempotency_key, data.client_nonce)
+    if data.response_id:
+        rid = data.response_id
+    elif idem:
+        # same key, same id: duplicates also collide on the primary key
+        rid = "resp_" + hashlib.blake2b(f"{data.survey_id}:{idem}".encode(), digest_size=10).hexdigest()
+    else:
+        rid = "resp_" + uuid.uuid4().hex[:10]
+
+    # a retry is answered before any database work
+    if idem:
+        earlier = RedisResponseService.claim_idempotent(data.survey_id, idem, rid)
+        if earlier:
+            replay = _find_response(db, earlier)
+            if replay is not None:
+                return _replay(http_response, replay)
 
     answers_data = [a.model_dump() for a in data.answers or []]
 
+    if response_ingest.enabled:
+        # write-behind: validate now, acknowledge once durably queued
+        build_answer_rows(data.survey_id, rid, answers_data, data.org_id)
+        now = datetime.utcnow().isoformat()
+        queued = {
+            "response_id": rid,
+            "org_id": data.org_id,
+            "survey_id": data.survey_id,
+            "respondent_id": data.respondent_id,
+            "source_id": data.source_id,
+            "status": data.status or "started",
+            "meta_data": data.meta_data or {},
+            "started_at": now,
+            "updated_at": now,
+            "completed_at": None,
+            "autosave_seq": None,
+            "idempotency_key": idem,
+            "answers": answers_data,
+        }
+        if response_ingest.enqueue(queued) is not None:
+            http_response.status_code = 202
+            return queued
+
     row = Response(
             response_id=rid,
             org_id=data.org_id,
@@ -67,47 +128,79 @@ def create_response(data: ResponseCreate, db: Session = Depends(get_db)):
             started_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
             answers_blob=answers_data,
+            idempotency_key=idem,
         )
 
-    db.add(row)
-    answers_list = [a.model_dump() for a in data.answers or []]
-    _write_answers(db, data.survey_id, rid, answers_list, data.org_id)
-    db.commit()
+    try:
+        db.add(row)
+        answers_list = [a.model_dump() for a in data.answers or []]
+        upsert_answers(db, data.survey_id, rid, answers_list, data.org_id)
+        delta = survey_results.record_change(db, data.survey_id, [], answers_list, None, row.status, started=1)
+        db.commit()
+    except IntegrityError:
+        # lost a race with a concurrent retry (or Redis was down): return the winner
+        db.rollback()
+        if not idem:
+            raise
+        existing = (
+            db.query(Response)
+            .filter(Response.survey_id == data.survey_id, Response.idempotency_key == idem)
+            .first()
+        )
+        if existing is None:
+            raise
+        return _replay(http_response, normalize_response(existing))
     db.refresh(row)
+    survey_results.publish(data.survey_id, delta)
 
     # 🔹 FIX: Normalize before caching
     normalized_response = normalize_response(row)
-    RedisResponseService.cache_response(normalized_response)
-    
-    # 🔹 FIX: Get all responses, normalize them, then cache
-    rows = db.query(Response).filter(Response.survey_id == data.survey_id).all()
-    normalized_list = [normalize_response(r) for r in rows]
-    RedisResponseService.cache_list(data.survey_id, normalized_list)
-    RedisResponseService.cache_count(data.survey_id, len(rows))
+    # Append to the survey's response index (constant work per submission)
+    RedisResponseService.index_response(data.survey_id, normalized_response)
 
     # Return the normalized response
     return normalized_response
 
 @router.get("", response_model=List[ResponseOut])
-def list_responses(survey_id: str = Query(...), db: Session = Depends(get_db)):
-    cached = RedisResponseService.get_list(survey_id)
-    if cached is not None:
-        return cached
-
-    rows = (
-        db.query(Response)
-        .filter(Response.survey_id == survey_id)
-        .order_by(Response.started_at.desc())
-        .all()
-    )
+def list_responses(
+    request: Request,
+    survey_id: str = Query(...),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: Session = Depends(get_db),
+):
+    if limit is not None or cursor is not None:
+        try:
+            items, next_cursor = response_export.fetch_page(db, survey_id, limit or 100, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return response_export.page_response(request, items, next_cursor)
+
+    # Serialized body + ETag: 304 or raw bytes without decoding anything
+    list_key = RedisResponseService.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+    cached_response = response_cache.respond(request, list_key)
+    if cached_response is not None:
+        return cached_response
+
+    normalized = RedisResponseService.get_list(survey_id)
+    if normalized is None:
+        rows = (
+            db.query(Response)
+            .filter(Response.survey_id == survey_id)
+            .order_by(Response.started_at.desc())
+            .all()
+        )
 
-    normalized = [normalize_response(r) for r in rows]
+        normalized = [normalize_response(r) for r in rows]
 
-    # 🔹 FIX: Cache the normalized data, not the ORM objects
-    RedisResponseService.cache_list(survey_id, normalized)  # ✅ This is correct
-    RedisResponseService.cache_count(survey_id, len(rows))
+        # 🔹 FIX: Cache the normalized data, not the ORM objects
+        RedisResponseService.cache_list(survey_id, normalized)  # ✅ This is correct
+        RedisResponseService.cache_count(survey_id, len(rows))
 
-    return normalized
+    body = response_cache.store(
+        list_key, normalized, RedisResponseService.RESP_LIST_TTL, response_model=List[ResponseOut]
+    )
+    return response_cache.to_response(request, body)
 
 
 @router.get("/count")
@@ -119,6 +212,22 @@ def count_responses(survey_id: str = Query(...), db: Session = Depends(get_db)):
     RedisResponseService.cache_count(survey_id, count)
     return {"count": count}
 
+@router.get("/export")
+def export_responses(
+    survey_id: str = Query(...),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    """Stream every response of a survey as NDJSON or CSV in constant memory"""
+    if format == "csv":
+        body, media_type = response_export.iter_csv(survey_id), "text/csv"
+    else:
+        body, media_type = response_export.iter_ndjson(survey_id), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=responses_{survey_id}.{format}"},
+    )
+
 @router.get("/{survey_id}/{response_id}", response_model=ResponseOut)
 def get_response(survey_id: str, response_id: str, db: Session = Depends(get_db)):
     cached = RedisResponseService.get_response(response_id)
@@ -150,23 +259,66 @@ def update_response(survey_id: str, response_id: str, data: ResponseUpdate, db:
 
     upd = data.dict(exclude_unset=True)
     answers = upd.pop("answers", None)
+    old_answers, old_status = row.answers_blob, row.status
 
     for k, v in upd.items():
         setattr(row, k, v)
     row.updated_at = datetime.utcnow()
     if answers is not None:
         row.answers_blob = answers
-        _write_answers(db, survey_id, response_id, answers, data.org_id)  # 🔹 Add org_id parameter
+        upsert_answers(db, survey_id, response_id, answers, row.org_id)
+    delta = survey_results.record_change(db, survey_id, old_answers, row.answers_blob, old_status, row.status)
 
     db.commit()
     db.refresh(row)
+    survey_results.publish(survey_id, delta)
 
     # 🔹 FIX: Normalize before caching
     normalized_response = normalize_response(row)
-    RedisResponseService.cache_response(normalized_response)
-    RedisResponseService.invalidate(response_id, survey_id=survey_id)
+    RedisResponseService.index_response(survey_id, normalized_response)
     
     return normalized_response  # 🔹 Return normalized, not ORM object
+@router.patch("/{survey_id}/{response_id}/answers", response_model=ResponseAutosaveOut)
+def autosave_answers(survey_id: str, response_id: str, data: ResponseAnswersDelta, db: Session = Depends(get_db)):
+    """
+    Delta autosave: merge only the changed answers into the snapshot and
+    upsert only their Answer rows. The row is locked for the merge, and a
+    save whose seq is not above the last applied one is acknowledged
+    without writing (retries and out-of-order saves are no-ops).
+    """
+    row = (
+        db.query(Response)
+        .filter(Response.survey_id == survey_id, Response.response_id == response_id)
+        .with_for_update()
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Response not found")
+
+    if row.autosave_seq is not None and data.seq <= row.autosave_seq:
+        db.rollback()  # release the row lock
+        return {"response_id": response_id, "seq": row.autosave_seq, "applied": False, "updated_at": row.updated_at}
+
+    changed = [a.model_dump() for a in data.answers]
+    old_answers, old_status = row.answers_blob, row.status
+    if changed:
+        row.answers_blob = merge_answers(row.answers_blob, changed)
+        upsert_answers(db, survey_id, response_id, changed, row.org_id)
+    if data.status is not None:
+        row.status = data.status
+    if data.completed_at is not None:
+        row.completed_at = data.completed_at
+    row.autosave_seq = data.seq
+    row.updated_at = datetime.utcnow()
+    delta = survey_results.record_change(db, survey_id, old_answers, row.answers_blob, old_status, row.status)
+
+    db.commit()
+    db.refresh(row)
+    survey_results.publish(survey_id, delta)
+
+    RedisResponseService.index_response(survey_id, normalize_response(row))
+    return {"response_id": response_id, "seq": row.autosave_seq, "applied": True, "updated_at": row.updated_at}
+
 @router.delete("/{survey_id}/{response_id}")
 def delete_response(survey_id: str, response_id: str, db: Session = Depends(get_db)):
     row = (
@@ -177,8 +329,10 @@ def delete_response(survey_id: str, response_id: str, db: Session = Depends(get_
     if not row:
         raise HTTPException(status_code=404, detail="Response not found")
 
+    delta = survey_results.record_change(db, survey_id, row.answers_blob, [], row.status, None, started=-1)
     db.delete(row)
     db.commit()
+    survey_results.publish(survey_id, delta)
 
-    RedisResponseService.invalidate(response_id, survey_id=survey_id)
+    RedisResponseService.unindex_response(survey_id, response_id)
     return {"detail": "Response deleted"}
@@ -1,15 +1,10 @@
 from fastapi import APIRouter, Request
 import base64, json
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from ..utils.crypto_utils import get_private_key, unwrap_aes_key
 
 router = APIRouter()
 
-# Load backend private key
-with open("keys/fastapi_private.pem", "rb") as f:
-    private_key = serialization.load_pem_private_key(f.read(), password=None)
-
 @router.post("/secure-crud")
 async def secure_crud(request: Request):
     body = await request.json()
@@ -24,15 +19,8 @@ async def secure_crud(request: Request):
         print("[Backend] Decoded lengths - encrypted_key:", len(encrypted_key),
               "ciphertext:", len(ciphertext), "iv:", len(iv), "tag:", len(tag))
 
-        # 1️⃣ Decrypt AES key
-        aes_key = private_key.decrypt(
-            encrypted_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        # 1️⃣ Decrypt AES key (cached per encrypted_key)
+        aes_key = unwrap_aes_key(encrypted_key, get_private_key())  # key loaded on first use
         print("[Backend] AES key decrypted successfully")
 
         # 2️⃣ Decrypt payload
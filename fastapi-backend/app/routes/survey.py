@@ -3,24 +3,19 @@ import uuid
 from datetime import datetime
 from typing import List, Optional, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
 from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models.survey import Survey
 from ..schemas.survey import SurveyCreate, SurveyUpdate, SurveyOut
+from ..services import response_export
 from ..services.redis_survey_service import RedisSurveyService
 import os
 import asyncio
 from pydantic import BaseModel, Field
 from ..models.questions import Question
 
-from ..services.dummy_responses_bot import (
-    DummyBotConfig,
-    generate_dummy_responses,
-)
-
-
 
 router = APIRouter(prefix="/surveys", tags=["Surveys"])
 dummy_generation_tasks: Dict[str, dict] = {}
@@ -165,7 +160,7 @@ def delete_survey(survey_id: str, db: Session = Depends(get_db)):
     db.delete(survey)
     db.commit()
 
-    RedisSurveyService.invalidate_survey(survey_id)
+    RedisSurveyService.purge_survey(survey_id)
     if project_id:
         # Rebuild project list cache (simple strategy)
         surveys = db.query(Survey).filter(Survey.project_id == project_id).all()
@@ -185,13 +180,18 @@ def get_responses_count(survey_id: str, db: Session = Depends(get_db)):
     return {"count": 0}
 
 @router.get("/{survey_id}/responses")
-def list_responses(survey_id: str, db: Session = Depends(get_db)):
-    cached = RedisSurveyService.get_responses(survey_id)
-    if cached is not None:  # FIXED: explicit None check
-        return cached
-    # Fallback empty list if you haven't implemented responses storage yet
-    RedisSurveyService.cache_responses(survey_id, [])
-    return []
+def list_responses(
+    request: Request,
+    survey_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = response_export.fetch_page(db, survey_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return response_export.page_response(request, items, next_cursor)
 
 class DummyGenerateRequest(BaseModel):
     org_id: str
@@ -211,6 +211,12 @@ async def generate_dummy_for_survey(
     """
     Start dummy response generation and return task ID for tracking.
     """
+    # Playwright is heavy and optional: load the bot on first use only
+    try:
+        from ..services.dummy_responses_bot import DummyBotConfig, generate_dummy_responses
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Dummy response generation unavailable: {e}")
+
     task_id = f"task_{uuid.uuid4().hex[:12]}"
     
     base_form_url = (
@@ -0,0 +1,27 @@
+# app/routes/survey_results.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..schemas.survey_results import CrosstabRequest
+from ..services import crosstab, survey_results
+
+router = APIRouter(prefix="/surveys", tags=["Survey Results"])
+
+
+@router.get("/{survey_id}/results")
+def get_survey_results(survey_id: str, db: Session = Depends(get_db)):
+    """Per-question aggregates and completion funnel, served from the rollup"""
+    return survey_results.get_results(db, survey_id)
+
+
+@router.post("/{survey_id}/results/rebuild")
+def rebuild_survey_results(survey_id: str, db: Session = Depends(get_db)):
+    """Recompute the survey's aggregates from its responses (backfill)"""
+    return survey_results.rebuild(db, survey_id)
+
+
+@router.post("/{survey_id}/crosstab")
+def crosstab_survey(survey_id: str, req: CrosstabRequest, db: Session = Depends(get_db)):
+    """Contingency tables of one row question against column questions, with significance tests"""
+    return crosstab.crosstab(db, survey_id, req)
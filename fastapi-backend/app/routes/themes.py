@@ -50,21 +50,14 @@ def list_themes(
     active: Optional[bool] = Query(None),
     db: Session = Depends(get_db),
 ):
-    # Try Redis
-    cached = RedisThemeService.get_list_by_org(org_id, active)
-    if cached is not None:
-        return cached
-
-    # Fetch from DB
-    q = db.query(Theme).filter(Theme.org_id == org_id)
-    if active is not None:
-        q = q.filter(Theme.is_active == active)
-
-    rows = [_to_dict(t) for t in q.all()]
-
-    # Cache Redis
-    RedisThemeService.cache_list_by_org(org_id, active, rows)
-    return rows
+    def load():
+        q = db.query(Theme).filter(Theme.org_id == org_id)
+        if active is not None:
+            q = q.filter(Theme.is_active == active)
+        return [_to_dict(t) for t in q.all()]
+
+    # Redis first; concurrent misses share one DB load
+    return RedisThemeService.load_list_by_org(org_id, active, load)
 
 
 # --------------------------------------------------------
@@ -18,13 +18,15 @@ Additions in this version:
 
 from __future__ import annotations
 import json, sqlalchemy as sa
-from fastapi import APIRouter, Depends, HTTPException, Query,Header
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request
 from sqlalchemy.orm import Session, selectinload, joinedload
 from sqlalchemy import func, select, text  # <-- text is used for atomic counter SQL
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
 
+from ..core.cache import cache
+from ..core.response_cache import response_cache
 from ..db import get_db
 from ..services.redis_ticket_service import RedisTicketService
 from ..services.redis_sla_service import get_ticket_sla_status
@@ -614,6 +616,7 @@ def on_sla_assigned(session, ticket: Ticket, sla: SLA, status: TicketSLAStatus):
 
 @router.get("/", response_model=List[TicketOut])
 def list_tickets(
+    request: Request,
     org_id: str = Query(...),
     status: Optional[TicketStatus] = Query(None),
     assignee_id: Optional[str] = Query(None),
@@ -636,11 +639,20 @@ def list_tickets(
     - team list
     - agent list
     """
-    # Org-wide simple list cache
-    if all(v is None for v in [status, assignee_id, team_id, agent_id, q, group_id]) and offset == 0:
+    # Org-wide simple list cache: serialized body + ETag first (304 or raw
+    # bytes), then the per-ticket blobs
+    org_list = all(v is None for v in [status, assignee_id, team_id, agent_id, q, group_id]) and offset == 0
+    org_list_key = RedisTicketService.ORG_LIST_KEY.format(org_id=org_id)
+    if org_list:
+        cached_response = response_cache.respond(request, org_list_key)
+        if cached_response is not None:
+            return cached_response
         cached = RedisTicketService.get_org_list(org_id)
         if cached is not None:
-            return cached
+            body = response_cache.store(
+                org_list_key, cached, RedisTicketService.LIST_TTL, response_model=List[TicketOut]
+            )
+            return response_cache.to_response(request, body)
 
     # Team-specific cache
     if team_id and all(v is None for v in [status, assignee_id, agent_id, q, group_id]) and offset == 0:
@@ -689,14 +701,31 @@ def list_tickets(
         stmt = stmt.where(func.lower(Ticket.subject).like(like))
 
     stmt = stmt.limit(limit).offset(offset)
-    records = db.execute(stmt).scalars().all()
 
-    ticket_outs = [TicketOut.model_validate(r, from_attributes=True) for r in records]
+    def fetch() -> List[TicketOut]:
+        records = db.execute(stmt).scalars().all()
+        return [TicketOut.model_validate(r, from_attributes=True) for r in records]
+
+    if org_list:
+        # A hot org list expiring costs one query: concurrent misses in this
+        # process and in other workers wait for a single loader
+        def load_org_list() -> List[TicketOut]:
+            outs = fetch()
+            RedisTicketService.cache_org_list(org_id, outs)
+            return outs
+
+        ticket_outs = cache.coalesce(
+            org_list_key, load_org_list, lookup=lambda: RedisTicketService.get_org_list(org_id)
+        )
+        body = response_cache.store(
+            org_list_key, ticket_outs, RedisTicketService.LIST_TTL, response_model=List[TicketOut]
+        )
+        return response_cache.to_response(request, body)
+
+    ticket_outs = fetch()
 
     # Populate caches
-    if all(v is None for v in [status, assignee_id, team_id, agent_id, q, group_id]) and offset == 0:
-        RedisTicketService.cache_org_list(org_id, ticket_outs)
-    elif team_id and all(v is None for v in [status, assignee_id, agent_id, q, group_id]) and offset == 0:
+    if team_id and all(v is None for v in [status, assignee_id, agent_id, q, group_id]) and offset == 0:
         RedisTicketService.cache_team_list(org_id, team_id, ticket_outs)
     elif agent_id and all(v is None for v in [status, assignee_id, team_id, q, group_id]) and offset == 0:
         RedisTicketService.cache_agent_list(org_id, agent_id, ticket_outs)
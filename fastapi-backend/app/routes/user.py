@@ -50,7 +50,7 @@ def create_user(
 
         # Make Redis truly optional and non-blocking
         try:
-            if redis and redis.ping():
+            if redis and redis.available():
                 print("[/users POST] caching to redis")
                 user_data = {
                     "uid": user.uid, "email": user.email, "display_name": user.display_name,
@@ -494,7 +494,7 @@ def admin_create_user(
 
     # 5) Cache in Redis
     try:
-        if redis and redis.ping():
+        if redis and redis.available():
             user_data = {
                 "uid": user.uid,
                 "email": user.email,
@@ -9,6 +9,8 @@ class ArchiveBase(BaseModel):
     format: str
     record_count: Optional[int] = 0
     size_bytes: Optional[int] = 0
+    survey_id: Optional[str] = None
+    watermark: Optional[datetime] = None
 
 class ArchiveCreate(ArchiveBase):
     archive_id: str
@@ -19,6 +19,9 @@ class ResponseBase(BaseModel):
 
 class ResponseCreate(ResponseBase):
     response_id: Optional[str] = None
+    # per-submission nonce from the client; retries with the same nonce
+    # (or the same Idempotency-Key header) return the original response
+    client_nonce: Optional[str] = Field(None, max_length=200)
 
 
 class ResponseUpdate(BaseModel):
@@ -30,6 +33,21 @@ class ResponseUpdate(BaseModel):
     source_id: Optional[str] = None
 
 
+class ResponseAnswersDelta(BaseModel):
+    """Changed answers only; seq orders saves per response (stale/replayed ones are ignored)"""
+    seq: int = Field(..., ge=0)
+    answers: List[AnswerIn] = Field(default_factory=list)
+    status: Optional[str] = None
+    completed_at: Optional[datetime] = None
+
+
+class ResponseAutosaveOut(BaseModel):
+    response_id: str
+    seq: Optional[int] = None  # last applied sequence number
+    applied: bool
+    updated_at: Optional[datetime] = None
+
+
 class ResponseOut(ResponseBase):
     response_id: str
     started_at: Optional[datetime] = None
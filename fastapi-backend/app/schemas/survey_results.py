@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class CrosstabRequest(BaseModel):
+    row_question_id: str
+    column_question_ids: List[str] = Field(..., min_length=1)
+    # segment filters: response meta_data key -> required value
+    segment: Dict[str, str] = Field(default_factory=dict)
+    source_id: Optional[str] = None
+    # numeric meta_data key holding the response weight (default 1)
+    weight_key: Optional[str] = None
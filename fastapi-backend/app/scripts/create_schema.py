@@ -0,0 +1,67 @@
+"""
+Create missing database tables for all models.
+
+Importing app.main does this (ensure_schema) on every worker start; with
+FAST_BOOT=true it is skipped there and run once per deploy instead:
+
+    python -m app.scripts.create_schema
+
+create_all only creates missing tables, so columns added to existing
+models are listed in COLUMN_ADDITIONS and applied idempotently, and
+indexes declared on existing tables are created when missing.
+"""
+import sys
+
+from sqlalchemy import text
+
+from app.db import Base, engine, test_database_connection
+from app.models import init_models
+from app.scripts.dedupe_answers import has_answer_key
+
+# (table, column, DDL type) for columns added after their table shipped
+COLUMN_ADDITIONS = [
+    ("responses", "autosave_seq", "BIGINT"),
+    ("responses", "idempotency_key", "VARCHAR"),
+    ("archives", "survey_id", "VARCHAR"),
+    ("archives", "watermark", "TIMESTAMP WITH TIME ZONE"),
+]
+
+# serializes the DDL below between workers starting together
+SCHEMA_LOCK_ID = 0x5c4e3a
+
+
+def ensure_schema() -> None:
+    """
+    Create missing tables, then add missing columns and indexes to existing
+    ones. Raises when the answers table still lacks its upsert key, which
+    takes a deliberate data migration (dedupe_answers).
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+        for table, column, ddl_type in COLUMN_ADDITIONS:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl_type}"))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+    with engine.connect() as conn:
+        # answer upserts need (response_id, question_id) unique
+        if not has_answer_key(conn):
+            raise RuntimeError(
+                "answers has no uq_answer_response_question constraint; "
+                "run `python -m app.scripts.dedupe_answers` before starting the app"
+            )
+
+
+def main():
+    if not test_database_connection():
+        sys.exit(1)
+
+    # Import all models so SQLAlchemy knows about them
+    init_models()
+    ensure_schema()
+    print(f"✅ Schema up to date ({len(Base.metadata.tables)} tables)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Collapse duplicate answers and add the (response_id, question_id) unique
+constraint that answer upserts rely on.
+
+Autosaves used to insert a fresh copy of every answer, so existing tables
+hold many rows per question. create_all does not alter existing tables, so
+run this once per database before deploying the upsert path (startup
+refuses to run without the constraint, see create_schema.ensure_schema):
+
+    python -m app.scripts.dedupe_answers
+    python -m app.scripts.dedupe_answers --dry-run
+"""
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from app.db import engine, test_database_connection
+
+COUNT_DUPLICATES = text("""
+    SELECT count(*) FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY response_id, question_id
+            ORDER BY coalesce(updated_at, answered_at) DESC NULLS LAST, id DESC
+        ) AS rn
+        FROM answers
+    ) ranked
+    WHERE rn > 1
+""")
+
+# keep the newest row per (response_id, question_id)
+DELETE_DUPLICATES = text("""
+    DELETE FROM answers
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY response_id, question_id
+                ORDER BY coalesce(updated_at, answered_at) DESC NULLS LAST, id DESC
+            ) AS rn
+            FROM answers
+        ) ranked
+        WHERE rn > 1
+    )
+""")
+
+HAS_CONSTRAINT = text("""
+    SELECT 1 FROM pg_constraint WHERE conname = 'uq_answer_response_question'
+""")
+
+ADD_CONSTRAINT = text("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = 'uq_answer_response_question'
+        ) THEN
+            ALTER TABLE answers
+                ADD CONSTRAINT uq_answer_response_question UNIQUE (response_id, question_id);
+        END IF;
+    END $$;
+""")
+
+
+def has_answer_key(conn) -> bool:
+    return conn.execute(HAS_CONSTRAINT).first() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate answers and add the upsert key")
+    parser.add_argument("--dry-run", action="store_true", help="only count duplicate rows")
+    args = parser.parse_args()
+
+    if not test_database_connection():
+        sys.exit(1)
+
+    with engine.begin() as conn:
+        duplicates = conn.execute(COUNT_DUPLICATES).scalar()
+        print(f"Found {duplicates} duplicate answer rows")
+        if args.dry_run:
+            return
+        conn.execute(DELETE_DUPLICATES)
+        conn.execute(ADD_CONSTRAINT)
+    print("✅ answers deduplicated; uq_answer_response_question in place")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Import-time report for app.main (or any module).
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter with
+FAST_BOOT=true, so no database/Redis round-trips are counted, and
+aggregates the per-module cost.
+
+    python -m app.scripts.import_report
+    python -m app.scripts.import_report --top 40 --group
+    python -m app.scripts.import_report --json boot.json   # for tracking over time
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def measure(module: str, fast_boot: bool = True):
+    """Return (total_seconds, [(name, self_us, cumulative_us)]) for importing module"""
+    env = dict(os.environ, FAST_BOOT="true" if fast_boot else os.getenv("FAST_BOOT", "false"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        tail = errors[-1:] or ["unknown error"]
+        raise SystemExit(f"import {module} failed: {tail[0]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    total = next((cum for name, _, cum in rows if name == module), sum(s for _, s, _ in rows))
+    return total / 1e6, rows
+
+
+def group_by_package(rows):
+    """Self time summed per top-level package (app.* split one level deeper)"""
+    groups = defaultdict(int)
+    for name, self_us, _ in rows:
+        parts = name.split(".")
+        key = ".".join(parts[:3]) if parts[0] == "app" else parts[0]
+        groups[key] += self_us
+    return sorted(groups.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import cost")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--group", action="store_true", help="aggregate self time by package")
+    parser.add_argument("--no-fast-boot", action="store_true", help="measure a regular boot")
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    total, rows = measure(args.module, fast_boot=not args.no_fast_boot)
+    print(f"import {args.module}: {total:.3f}s across {len(rows)} modules\n")
+
+    if args.group:
+        print(f"{'self ms':>9}  package")
+        for name, self_us in group_by_package(rows)[:args.top]:
+            print(f"{self_us / 1000:>9.1f}  {name}")
+    else:
+        print(f"{'cum ms':>9} {'self ms':>9}  module")
+        for name, self_us, cum_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+            print(f"{cum_us / 1000:>9.1f} {self_us / 1000:>9.1f}  {name}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "module": args.module,
+                "total_seconds": total,
+                "modules": [{"name": n, "self_us": s, "cumulative_us": c} for n, s, c in rows],
+                "packages": [{"name": n, "self_us": s} for n, s in group_by_package(rows)],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
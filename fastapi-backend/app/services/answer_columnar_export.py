@@ -0,0 +1,301 @@
+# app/services/answer_columnar_export.py
+"""
+Columnar (Parquet) export of survey answers for analytics.
+
+Answer rows are pivoted into one wide row per response with one typed
+column per question (column type from Question.type). Responses are read
+in keyset batches of ROW_GROUP_SIZE and every batch is written as one
+Parquet row group, so memory is bounded by the batch, not the survey.
+
+Exports are incremental. Each file is registered as an Archive whose
+watermark is the newest Response.updated_at it contains; the next export
+only reads responses changed after that watermark (minus WATERMARK_OVERLAP,
+so transactions that commit late are not skipped). A response can appear
+in several files: consumers keep the row with the latest updated_at per
+response_id.
+
+pyarrow is optional and imported on first use.
+"""
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.models.answer import Answer
+from app.models.archive import Archive
+from app.models.questions import Question
+from app.models.responses import Response
+from app.models.survey import Survey
+
+ARCHIVE_TYPE = "survey_answers"
+EXPORT_DIR = os.getenv("ANSWER_EXPORT_DIR", "exports")
+ROW_GROUP_SIZE = int(os.getenv("ANSWER_EXPORT_ROW_GROUP_SIZE", "5000"))
+WATERMARK_OVERLAP = timedelta(seconds=int(os.getenv("ANSWER_EXPORT_WATERMARK_OVERLAP", "60")))
+
+# question type -> column kind; anything not listed is exported as text
+NUMERIC_TYPES = {"nps", "rating", "opinion_scale", "osat", "number", "slider", "smiley"}
+BOOLEAN_TYPES = {"yes_no", "legal"}
+MULTI_TYPES = {"checkbox", "ranking"}
+DATE_TYPES = {"date"}
+SKIPPED_TYPES = {"welcome_screen", "end_screen", "redirect_url"}  # collect no answer
+
+RESPONSE_COLUMNS = ["response_id", "respondent_id", "status", "started_at", "completed_at", "updated_at"]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Columnar export unavailable: {e}")
+    return pa, pq
+
+
+def column_kind(question_type: str) -> str:
+    if question_type in NUMERIC_TYPES:
+        return "number"
+    if question_type in BOOLEAN_TYPES:
+        return "boolean"
+    if question_type in MULTI_TYPES:
+        return "multi"
+    if question_type in DATE_TYPES:
+        return "date"
+    return "text"
+
+
+# ------------------------------ coercion -------------------------------
+
+def _to_number(v: Any) -> Optional[float]:
+    if isinstance(v, (bool, int, float)):
+        return float(v)
+    if isinstance(v, str):
+        try:
+            return float(v)
+        except ValueError:
+            return None
+    return None
+
+
+def _to_boolean(v: Any) -> Optional[bool]:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, str):
+        lowered = v.strip().lower()
+        if lowered in ("yes", "true", "1", "agree", "accepted"):
+            return True
+        if lowered in ("no", "false", "0", "disagree", "declined"):
+            return False
+    if isinstance(v, (int, float)):
+        return bool(v)
+    return None
+
+
+def _to_text(v: Any) -> Optional[str]:
+    if v is None or isinstance(v, str):
+        return v
+    return json_codec.dumps(v)
+
+
+def _to_multi(v: Any) -> Optional[List[str]]:
+    if v is None:
+        return None
+    if isinstance(v, (list, tuple)):
+        return [_to_text(x) for x in v if x is not None]
+    return [_to_text(v)]
+
+
+def _to_date(v: Any) -> Optional[date]:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    if isinstance(v, str):
+        try:
+            return date.fromisoformat(v[:10])
+        except ValueError:
+            return None
+    return None
+
+
+COERCE = {
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "multi": _to_multi,
+    "date": _to_date,
+    "text": _to_text,
+}
+
+
+def build_schema(questions: List[Question]):
+    pa, _ = _require_pyarrow()
+    arrow_types = {
+        "number": pa.float64(),
+        "boolean": pa.bool_(),
+        "multi": pa.list_(pa.string()),
+        "date": pa.date32(),
+        "text": pa.string(),
+    }
+    fields = [
+        pa.field("response_id", pa.string(), nullable=False),
+        pa.field("respondent_id", pa.string()),
+        pa.field("status", pa.string()),
+        pa.field("started_at", pa.timestamp("us", tz="UTC")),
+        pa.field("completed_at", pa.timestamp("us", tz="UTC")),
+        pa.field("updated_at", pa.timestamp("us", tz="UTC")),
+    ]
+    for q in questions:
+        fields.append(pa.field(
+            q.question_id,
+            arrow_types[column_kind(q.type)],
+            metadata={"label": q.label or "", "type": q.type},
+        ))
+    return pa.schema(fields)
+
+
+# ------------------------------- reading -------------------------------
+
+def last_watermark(db: Session, survey_id: str) -> Optional[datetime]:
+    return (
+        db.query(Archive.watermark)
+        .filter(Archive.survey_id == survey_id, Archive.type == ARCHIVE_TYPE, Archive.watermark.isnot(None))
+        .order_by(Archive.watermark.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def _changed_responses(db: Session, survey_id: str, since: Optional[datetime], batch_size: int):
+    """Batches of responses changed after `since`, keyset-paged on (updated_at, response_id)"""
+    stmt = (
+        select(*(getattr(Response, c) for c in RESPONSE_COLUMNS))
+        .where(Response.survey_id == survey_id)
+        .order_by(Response.updated_at, Response.response_id)
+        .limit(batch_size)
+    )
+    if since is not None:
+        stmt = stmt.where(Response.updated_at > since)
+
+    last: Optional[Tuple[datetime, str]] = None
+    while True:
+        page = stmt if last is None else stmt.where(
+            tuple_(Response.updated_at, Response.response_id) > last
+        )
+        rows = db.execute(page).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size or rows[-1].updated_at is None:
+            return
+        last = (rows[-1].updated_at, rows[-1].response_id)
+
+
+def _pivot(db: Session, rows, questions: List[Question]) -> Dict[str, list]:
+    """Column-oriented batch: response fields plus one coerced column per question"""
+    index = {r.response_id: i for i, r in enumerate(rows)}
+    columns: Dict[str, list] = {c: [getattr(r, c) for r in rows] for c in RESPONSE_COLUMNS}
+    kinds = {q.question_id: column_kind(q.type) for q in questions}
+    for qid in kinds:
+        columns[qid] = [None] * len(rows)
+
+    answers = db.execute(
+        select(Answer.response_id, Answer.question_id, Answer.answer_config)
+        .where(Answer.response_id.in_(list(index)))
+        .order_by(Answer.answered_at)  # legacy duplicate rows: newest wins
+    )
+    for response_id, question_id, config in answers:
+        kind = kinds.get(question_id)
+        if kind is None:
+            continue  # question deleted since the answer was written
+        value = (config or {}).get("value")
+        columns[question_id][index[response_id]] = COERCE[kind](value)
+    return columns
+
+
+# ------------------------------- export --------------------------------
+
+def export_survey_answers(db: Session, survey_id: str, full: bool = False,
+                          export_dir: Optional[str] = None) -> Optional[Archive]:
+    """
+    Write the survey's answers (all of them with full=True, otherwise only
+    responses changed since the last export) to a Parquet file and register
+    it as an Archive. Returns None when nothing changed.
+    """
+    pa, pq = _require_pyarrow()
+
+    survey = (
+        db.query(Survey.org_id, Survey.question_order)
+        .filter(Survey.survey_id == survey_id)
+        .first()
+    )
+    if not survey:
+        raise HTTPException(status_code=404, detail="Survey not found")
+
+    # survey order first, then any questions missing from question_order
+    position = {qid: i for i, qid in enumerate(survey.question_order or [])}
+    questions = sorted(
+        (
+            q for q in (
+                db.query(Question)
+                .filter(Question.survey_id == survey_id)
+                .order_by(Question.created_at, Question.question_id)
+                .all()
+            )
+            if q.type not in SKIPPED_TYPES
+        ),
+        key=lambda q: position.get(q.question_id, len(position)),
+    )
+    schema = build_schema(questions).with_metadata({
+        "survey_id": survey_id,
+        "questions": json_codec.dumps([
+            {"question_id": q.question_id, "label": q.label, "type": q.type} for q in questions
+        ]),
+    })
+
+    previous = None if full else last_watermark(db, survey_id)
+    since = previous - WATERMARK_OVERLAP if previous else None
+
+    export_dir = export_dir or EXPORT_DIR
+    os.makedirs(export_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(export_dir, f"answers_{survey_id}_{stamp}_{uuid.uuid4().hex[:6]}.parquet")
+
+    record_count = 0
+    watermark = previous
+    writer = pq.ParquetWriter(path, schema, compression="zstd")
+    try:
+        for rows in _changed_responses(db, survey_id, since, ROW_GROUP_SIZE):
+            table = pa.Table.from_pydict(_pivot(db, rows, questions), schema=schema)
+            writer.write_table(table, row_group_size=len(rows))
+            record_count += len(rows)
+            newest = rows[-1].updated_at
+            if newest is not None and (watermark is None or newest > watermark):
+                watermark = newest
+    finally:
+        writer.close()
+
+    # the overlap window re-reads rows at the previous watermark; only a
+    # row past it means something changed
+    if record_count == 0 or (previous is not None and watermark <= previous):
+        os.remove(path)
+        return None
+
+    archive = Archive(
+        archive_id="arch_" + uuid.uuid4().hex[:12],
+        org_id=survey.org_id,
+        type=ARCHIVE_TYPE,
+        url=path,
+        format="parquet",
+        record_count=record_count,
+        size_bytes=os.path.getsize(path),
+        survey_id=survey_id,
+        watermark=watermark,
+    )
+    db.add(archive)
+    db.commit()
+    db.refresh(archive)
+    return archive
@@ -0,0 +1,72 @@
+# app/services/answer_writer.py
+import uuid
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.answer import Answer
+from app.schemas.answer import AnswerCreate
+
+_answers_adapter = TypeAdapter(List[AnswerCreate])
+
+UPSERT_CHUNK_SIZE = 5000
+
+
+def build_answer_rows(survey_id: str, response_id: str, answers: List[Dict[str, Any]], org_id: str) -> List[Dict[str, Any]]:
+    """
+    Validate a response's answers (camelCase AnswerIn dicts) in one pass.
+    One row per question: a question answered twice in the same payload
+    keeps the last value, as a single statement may not upsert a key twice.
+    """
+    by_question: Dict[str, Dict[str, Any]] = {}
+    for ans in answers or []:
+        if not ans:
+            continue
+        by_question[ans.get("questionId")] = {
+            "question_id": ans.get("questionId"),
+            "project_id": ans.get("projectId") or "",
+            "survey_id": survey_id,
+            "org_id": org_id,
+            "response_id": response_id,
+            "answer_config": {"value": ans.get("answer")},
+        }
+    return _answers_adapter.validate_python(list(by_question.values()))
+
+
+def upsert_answers(db: Session, survey_id: str, response_id: str, answers: List[Dict[str, Any]], org_id: str) -> int:
+    """
+    Write all answers of a response with one multi-row
+    INSERT ... ON CONFLICT (response_id, question_id) DO UPDATE.
+
+    Re-saving a response updates its answers in place, so autosaves are
+    idempotent and the answers table holds at most one row per question.
+    Pending ORM state is flushed first so the parent response row exists.
+    Returns the number of rows written; the caller commits.
+    """
+    rows = build_answer_rows(survey_id, response_id, answers, org_id)
+    db.flush()
+    return upsert_answer_rows(db, rows)
+
+
+def upsert_answer_rows(db: Session, rows: List[AnswerCreate]) -> int:
+    """
+    Upsert validated answer rows, possibly of many responses, in
+    statements of at most UPSERT_CHUNK_SIZE rows (bind parameter limit).
+    """
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        values = [{"id": str(uuid.uuid4()), **row.model_dump()} for row in rows[start:start + UPSERT_CHUNK_SIZE]]
+        stmt = pg_insert(Answer).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Answer.response_id, Answer.question_id],
+            set_={
+                "answer_config": stmt.excluded.answer_config,
+                "project_id": stmt.excluded.project_id,
+                "org_id": stmt.excluded.org_id,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+    return len(rows)
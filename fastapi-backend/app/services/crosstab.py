@@ -0,0 +1,323 @@
+# app/services/crosstab.py
+"""
+Cross-tabulation of survey answers.
+
+One query loads the answers of every requested question (answer value
+extracted in SQL, filtered by source and meta_data segment), with the
+response and the value already factorized into integer codes by dense_rank
+window functions. Labels are parsed once per distinct value. Each question
+becomes its distinct (response, category) code pairs, i.e. the non-zero
+cells of a response x category indicator matrix A. A table for row
+question R and column question C, A_R.T @ diag(w) @ A_C, is then one
+bincount over the pairs joined on response, weighted by w, so memory
+grows with the answers rather than responses x categories. Multi-select
+answers simply contribute several pairs per response. Per table the result carries unweighted counts, weighted counts
+and percentages, a chi-square test of independence with Cramer's V, and
+adjusted standardized residuals per cell (|z| > 1.96 ~ significant at
+5%). For multi-select questions the test is approximate, as one response
+can fall in several cells.
+
+Results are cached per survey version and data revision (bumped on every
+response write), so a repeat request is one Redis GET.
+"""
+import hashlib
+import math
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import JSON, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.models.answer import Answer
+from app.models.responses import Response
+from app.models.survey import Survey
+from app.schemas.survey_results import CrosstabRequest
+from app.services.answer_columnar_export import _to_number
+from app.services.redis_results_service import RedisResultsService
+from app.services.survey_results import CHOICE_TYPES, NUMERIC_TYPES, _bucket, question_types
+
+MAX_CATEGORIES = 200
+Z_95 = 1.959964
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Cross-tabs unavailable: {e}")
+    return np
+
+
+# ------------------------------ statistics -----------------------------
+
+def chi2_sf(statistic: float, dof: int) -> float:
+    """Upper tail of the chi-square distribution: Q(dof/2, statistic/2)"""
+    if dof <= 0 or not math.isfinite(statistic):
+        return float("nan")
+    a, x = dof / 2.0, statistic / 2.0
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # series for the lower regularized gamma P(a, x)
+        term = total = 1.0 / a
+        n = a
+        for _ in range(1000):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # continued fraction for Q(a, x) (modified Lentz)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        step = d * c
+        h *= step
+        if abs(step - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def independence_test(np, counts) -> Tuple[Dict[str, Any], Any]:
+    """Chi-square test over non-empty rows/columns and adjusted residuals"""
+    total = counts.sum()
+    row_tot, col_tot = counts.sum(axis=1), counts.sum(axis=0)
+    residuals = np.zeros_like(counts)
+    if total <= 0:
+        return {"statistic": None, "dof": 0, "p_value": None, "cramers_v": None}, residuals
+
+    expected = np.outer(row_tot, col_tot) / total
+    keep_r, keep_c = row_tot > 0, col_tot > 0
+    observed_k, expected_k = counts[np.ix_(keep_r, keep_c)], expected[np.ix_(keep_r, keep_c)]
+    statistic = float(((observed_k - expected_k) ** 2 / expected_k).sum())
+    r, c = int(keep_r.sum()), int(keep_c.sum())
+    dof = (r - 1) * (c - 1)
+    k = min(r, c) - 1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = expected * np.outer(1 - row_tot / total, 1 - col_tot / total)
+        residuals = np.where(variance > 0, (counts - expected) / np.sqrt(variance), 0.0)
+
+    return {
+        "statistic": statistic,
+        "dof": dof,
+        "p_value": chi2_sf(statistic, dof) if dof > 0 else None,
+        "cramers_v": math.sqrt(statistic / (total * k)) if k > 0 else None,
+    }, residuals
+
+
+# ------------------------------- loading -------------------------------
+
+def _labels(kind: str, raw: Optional[str], json_type: Optional[str]) -> List[str]:
+    """Category labels of one answer (answer_config->>'value' text and its JSON type)"""
+    if raw is None or raw == "":
+        return []
+    # split only real arrays: a label may itself read "[N/A]"
+    values = json_codec.loads(raw) if json_type == "array" else [raw]
+    out = []
+    for v in values:
+        if v is None or v == "":
+            continue
+        if kind == "numeric":
+            x = _to_number(v)
+            if x is None or not math.isfinite(x):
+                continue
+            label = _bucket(x)
+        else:
+            label = v if isinstance(v, str) else json_codec.dumps(v)
+        if label not in out:
+            out.append(label)
+    return out
+
+
+def _load(db: Session, survey_id: str, req: CrosstabRequest, question_ids: List[str]):
+    """
+    (response_rank, question_id, value_rank, value, json_type[, weight])
+    per answer. The database factorizes: dense ranks are 1-based integer
+    codes for the response and for the value within its question, so
+    NumPy only handles integer arrays.
+    """
+    value = Answer.answer_config["value"].as_string()
+    json_type = func.json_typeof(cast(Answer.answer_config["value"], JSON))
+    cols = [
+        func.dense_rank().over(order_by=Answer.response_id),
+        Answer.question_id,
+        func.dense_rank().over(partition_by=Answer.question_id, order_by=(value, json_type)),
+        value,
+        json_type,
+    ]
+    if req.weight_key:
+        cols.append(Response.meta_data[req.weight_key].as_string())
+    stmt = (
+        select(*cols)
+        .join(Response, Response.response_id == Answer.response_id)
+        .where(Answer.survey_id == survey_id, Answer.question_id.in_(question_ids))
+    )
+    if req.source_id:
+        stmt = stmt.where(Response.source_id == req.source_id)
+    for key, expected in req.segment.items():
+        stmt = stmt.where(Response.meta_data[key].as_string() == expected)
+    return db.execute(stmt).all()
+
+
+def _sorted_labels(kind: str, labels):
+    if kind == "numeric":
+        return sorted(labels, key=int)
+    return sorted(labels)
+
+
+def _within(np, repeat):
+    """0..n-1 within each run of np.repeat(x, repeat)"""
+    ends = np.cumsum(repeat)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - repeat, repeat)
+
+
+def _table(np, row, col, n_rows: int, n_cols: int, n_resp: int, weights):
+    """(counts, weighted) of A_R.T @ diag(w) @ A_C from response-sorted code pairs"""
+    (r_resp, r_code), (c_resp, c_code) = row, col
+    # pair every row-question code with every column-question code of its response
+    c_count = np.bincount(c_resp, minlength=n_resp)
+    c_start = np.cumsum(c_count) - c_count
+    repeat = c_count[r_resp]
+    r_idx = np.repeat(np.arange(len(r_resp)), repeat)
+    c_idx = np.repeat(c_start[r_resp], repeat) + _within(np, repeat)
+    cell = r_code[r_idx] * n_cols + c_code[c_idx]
+    size = n_rows * n_cols
+    counts = np.bincount(cell, minlength=size).astype(float).reshape(n_rows, n_cols)
+    weighted = np.bincount(cell, weights=weights[r_resp[r_idx]], minlength=size).astype(float).reshape(n_rows, n_cols)
+    return counts, weighted
+
+
+# ------------------------------- compute -------------------------------
+
+def compute(db: Session, survey_id: str, req: CrosstabRequest) -> Dict[str, Any]:
+    np = _require_numpy()
+    question_ids = list(dict.fromkeys([req.row_question_id, *req.column_question_ids]))
+    types = question_types(db, survey_id)
+    kinds = {}
+    for qid in question_ids:
+        qtype = types.get(qid)
+        if qtype is None:
+            raise HTTPException(status_code=404, detail=f"Question {qid} not found in survey")
+        if qtype not in CHOICE_TYPES and qtype not in NUMERIC_TYPES:
+            raise HTTPException(status_code=400, detail=f"Question {qid} ({qtype}) is not categorical")
+        kinds[qid] = "numeric" if qtype in NUMERIC_TYPES else "choice"
+
+    rows = _load(db, survey_id, req, question_ids)
+    if not rows:
+        return {"survey_id": survey_id, "responses": 0, "tables": []}
+
+    n = len(rows)
+    resp = np.fromiter(map(itemgetter(0), rows), dtype=np.int64, count=n) - 1
+    qids = np.array(list(map(itemgetter(1), rows)), dtype=object)
+    value_rank = np.fromiter(map(itemgetter(2), rows), dtype=np.int64, count=n)
+    n_resp = int(resp.max()) + 1
+
+    weights = np.ones(n_resp)
+    if req.weight_key:
+        _, first = np.unique(resp, return_index=True)
+        raw_weights = [rows[i][5] for i in first.tolist()]
+        try:
+            parsed = np.array(raw_weights, dtype=object).astype(float)
+        except (TypeError, ValueError):  # missing or non-numeric weights
+            parsed = np.array([_to_number(w) for w in raw_weights], dtype=float)  # None -> nan
+        parsed[~np.isfinite(parsed)] = 1.0
+        weights[resp[first]] = parsed
+
+    pairs: Dict[str, Any] = {}
+    answered: Dict[str, Any] = {}
+    labels: Dict[str, List[str]] = {}
+    for qid in question_ids:
+        rows_q = np.flatnonzero(qids == qid)
+        resp_q, rank_q = resp[rows_q], value_rank[rows_q]
+        # labels once per distinct value, e.g. '["a","b"]' -> a, b
+        ranks, first = np.unique(rank_q, return_index=True)
+        per_value = [_labels(kinds[qid], rows[i][3], rows[i][4]) for i in rows_q[first].tolist()]
+        cats = _sorted_labels(kinds[qid], {label for ls in per_value for label in ls})
+        if len(cats) > MAX_CATEGORIES:
+            raise HTTPException(status_code=400, detail=f"Question {qid} has more than {MAX_CATEGORIES} categories")
+        code = {c: i for i, c in enumerate(cats)}
+
+        # explode each answer into its label codes without a Python loop
+        lengths = np.array([len(ls) for ls in per_value], dtype=np.int64)
+        flat = np.array([code[label] for ls in per_value for label in ls], dtype=np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        pos = np.searchsorted(ranks, rank_q)
+        repeat = lengths[pos]
+        codes = flat[np.repeat(offsets[pos], repeat) + _within(np, repeat)]
+
+        # one pair per (response, category), sorted by response
+        width = max(len(cats), 1)
+        key = np.unique(np.repeat(resp_q, repeat) * width + codes)
+        pairs[qid] = (key // width, key % width)
+        answered[qid] = np.zeros(n_resp, dtype=bool)
+        answered[qid][pairs[qid][0]] = True
+        labels[qid] = cats
+
+    row_q = req.row_question_id
+    tables = []
+    for col_q in dict.fromkeys(req.column_question_ids):
+        if col_q == row_q:
+            continue
+        counts, weighted = _table(np, pairs[row_q], pairs[col_q],
+                                  len(labels[row_q]), len(labels[col_q]), n_resp, weights)
+        test, residuals = independence_test(np, counts)
+
+        w_total = weighted.sum()
+        w_rows, w_cols = weighted.sum(axis=1), weighted.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            col_pct = np.where(w_cols > 0, weighted / w_cols * 100, 0.0)
+            row_pct = np.where(w_rows[:, None] > 0, weighted / w_rows[:, None] * 100, 0.0)
+        base = answered[row_q] & answered[col_q]
+
+        tables.append({
+            "row_question_id": row_q,
+            "column_question_id": col_q,
+            "row_labels": labels[row_q],
+            "column_labels": labels[col_q],
+            "base": int(base.sum()),
+            "weighted_base": float(weights[base].sum()),
+            "counts": counts.astype(int).tolist(),
+            "weighted": np.round(weighted, 4).tolist(),
+            "column_percent": np.round(col_pct, 2).tolist(),
+            "row_percent": np.round(row_pct, 2).tolist(),
+            "weighted_total": float(w_total),
+            "test": test,
+            "adjusted_residuals": np.round(residuals, 3).tolist(),
+            "significant_cells": (np.abs(residuals) > Z_95).tolist(),
+        })
+
+    return {"survey_id": survey_id, "responses": n_resp, "tables": tables}
+
+
+def crosstab(db: Session, survey_id: str, req: CrosstabRequest) -> Dict[str, Any]:
+    """compute(), cached per survey version and data revision"""
+    version = db.query(Survey.version).filter(Survey.survey_id == survey_id).scalar()
+    if version is None and not db.query(Survey.survey_id).filter(Survey.survey_id == survey_id).first():
+        raise HTTPException(status_code=404, detail="Survey not found")
+
+    params = hashlib.blake2b(json_codec.dumpb(req.model_dump()), digest_size=12).hexdigest()
+    revision = RedisResultsService.revision(survey_id)
+    if revision is not None:
+        cached = RedisResultsService.get_crosstab(survey_id, version, revision, params)
+        if cached is not None:
+            return cached
+
+    result = compute(db, survey_id, req)
+    if revision is not None:
+        RedisResultsService.cache_crosstab(survey_id, version, revision, params, result)
+    return result
@@ -1,13 +1,6 @@
 # app/services/redis_calendar_service.py
-import json
-from typing import Any, Dict, List, Optional
-from ..core.redis_client import redis_client
-
-def _ser(obj: Any) -> str:
-    return json.dumps(obj, default=str)
-
-def _deser(blob: str) -> Any:
-    return json.loads(blob)
+from typing import Dict, List, Optional
+from ..core.cache import cache
 
 class RedisCalendarService:
     # TTLs
@@ -15,105 +8,72 @@ class RedisCalendarService:
     ITEM_TTL = 600       # 10m single calendar
     CHILD_TTL = 600      # 10m hours/holidays
 
-    # Keys
-    CAL_KEY             = "bizcal:{calendar_id}"
-    CAL_FULL_KEY        = "bizcal:{calendar_id}:full"            # with hours & holidays
-    CAL_LIST_BY_ORG_KEY = "bizcal:org:{org_id}:active:{active}"  # list w/ filter
-    CAL_HOURS_KEY       = "bizcal:{calendar_id}:hours"
-    CAL_HOLIDAYS_KEY    = "bizcal:{calendar_id}:holidays"
-
-    @classmethod
-    def _ok(cls) -> bool:
-        try:
-            return bool(redis_client.ping())
-        except Exception:
-            return False
+    # Calendars change rarely and are read on every SLA computation: keep
+    # them in process memory too. Everything about one calendar carries the
+    # "bizcal:<id>" tag, org lists the "bizcal:org:<org_id>" tag.
+    CAL = cache.namespace("bizcal:{calendar_id}", ttl=ITEM_TTL, local_ttl=60, tags=("bizcal:{calendar_id}",))
+    CAL_FULL = cache.namespace("bizcal:{calendar_id}:full", ttl=ITEM_TTL, local_ttl=60,    # with hours & holidays
+                               tags=("bizcal:{calendar_id}",))
+    CAL_LIST_BY_ORG = cache.namespace("bizcal:org:{org_id}:active:{active}", ttl=LIST_TTL, local_ttl=30,
+                                      tags=("bizcal:org:{org_id}",))
+    CAL_HOURS = cache.namespace("bizcal:{calendar_id}:hours", ttl=CHILD_TTL, local_ttl=60,
+                                tags=("bizcal:{calendar_id}",))
+    CAL_HOLIDAYS = cache.namespace("bizcal:{calendar_id}:holidays", ttl=CHILD_TTL, local_ttl=60,
+                                   tags=("bizcal:{calendar_id}",))
 
-    @classmethod
-    def _set(cls, key: str, obj: Any, ttl: int | None = None) -> None:
-        if not cls._ok(): return
-        blob = _ser(obj)
-        try:
-            if ttl:
-                redis_client.client.setex(key, ttl, blob)
-            else:
-                redis_client.client.set(key, blob)
-        except Exception as e:
-            print(f"[RedisCalendarService] set error {key}: {e}")
-
-    @classmethod
-    def _get(cls, key: str) -> Optional[Any]:
-        if not cls._ok(): return None
-        try:
-            blob = redis_client.client.get(key)
-            if not blob: return None
-            if isinstance(blob, bytes):
-                blob = blob.decode("utf-8")
-            return _deser(blob)
-        except Exception as e:
-            print(f"[RedisCalendarService] get error {key}: {e}")
-            return None
-
-    @classmethod
-    def _del(cls, *keys: str) -> None:
-        if not cls._ok(): return
-        try:
-            redis_client.client.delete(*keys)
-        except Exception as e:
-            print(f"[RedisCalendarService] delete error {keys}: {e}")
+    # Keys
+    CAL_KEY             = CAL.template
+    CAL_FULL_KEY        = CAL_FULL.template
+    CAL_LIST_BY_ORG_KEY = CAL_LIST_BY_ORG.template
+    CAL_HOURS_KEY       = CAL_HOURS.template
+    CAL_HOLIDAYS_KEY    = CAL_HOLIDAYS.template
 
     # ---------- cache helpers ----------
     @classmethod
     def cache_calendar(cls, calendar_id: str, data: Dict) -> None:
-        cls._set(cls.CAL_KEY.format(calendar_id=calendar_id), data, cls.ITEM_TTL)
+        cls.CAL.set(calendar_id, value=data)
 
     @classmethod
     def get_calendar(cls, calendar_id: str) -> Optional[Dict]:
-        return cls._get(cls.CAL_KEY.format(calendar_id=calendar_id))
+        return cls.CAL.get(calendar_id)
 
     @classmethod
     def cache_calendar_full(cls, calendar_id: str, data: Dict) -> None:
-        cls._set(cls.CAL_FULL_KEY.format(calendar_id=calendar_id), data, cls.ITEM_TTL)
+        cls.CAL_FULL.set(calendar_id, value=data)
 
     @classmethod
     def get_calendar_full(cls, calendar_id: str) -> Optional[Dict]:
-        return cls._get(cls.CAL_FULL_KEY.format(calendar_id=calendar_id))
+        return cls.CAL_FULL.get(calendar_id)
 
     @classmethod
     def cache_list_by_org(cls, org_id: str, active: Optional[bool], rows: List[Dict]) -> None:
-        cls._set(cls.CAL_LIST_BY_ORG_KEY.format(org_id=org_id, active=str(active)), rows, cls.LIST_TTL)
+        cls.CAL_LIST_BY_ORG.set(org_id, str(active), value=rows)
 
     @classmethod
     def get_list_by_org(cls, org_id: str, active: Optional[bool]) -> Optional[List[Dict]]:
-        return cls._get(cls.CAL_LIST_BY_ORG_KEY.format(org_id=org_id, active=str(active)))
+        return cls.CAL_LIST_BY_ORG.get(org_id, str(active))
 
     @classmethod
     def cache_hours(cls, calendar_id: str, hours: List[Dict]) -> None:
-        cls._set(cls.CAL_HOURS_KEY.format(calendar_id=calendar_id), hours, cls.CHILD_TTL)
+        cls.CAL_HOURS.set(calendar_id, value=hours)
 
     @classmethod
     def get_hours(cls, calendar_id: str) -> Optional[List[Dict]]:
-        return cls._get(cls.CAL_HOURS_KEY.format(calendar_id=calendar_id))
+        return cls.CAL_HOURS.get(calendar_id)
 
     @classmethod
     def cache_holidays(cls, calendar_id: str, holidays: List[Dict]) -> None:
-        cls._set(cls.CAL_HOLIDAYS_KEY.format(calendar_id=calendar_id), holidays, cls.CHILD_TTL)
+        cls.CAL_HOLIDAYS.set(calendar_id, value=holidays)
 
     @classmethod
     def get_holidays(cls, calendar_id: str) -> Optional[List[Dict]]:
-        return cls._get(cls.CAL_HOLIDAYS_KEY.format(calendar_id=calendar_id))
+        return cls.CAL_HOLIDAYS.get(calendar_id)
 
     # ---------- invalidation ----------
     @classmethod
     def invalidate_calendar(cls, calendar_id: str, org_id: Optional[str] = None) -> None:
-        keys = [
-            cls.CAL_KEY.format(calendar_id=calendar_id),
-            cls.CAL_FULL_KEY.format(calendar_id=calendar_id),
-            cls.CAL_HOURS_KEY.format(calendar_id=calendar_id),
-            cls.CAL_HOLIDAYS_KEY.format(calendar_id=calendar_id),
-        ]
-        cls._del(*keys)
-        # If org is known, nuke org lists (both active True/False/None)
+        # If org is known, nuke org lists (active True/False/None) too
+        tags = [f"bizcal:{calendar_id}"]
         if org_id:
-            for active in ("True", "False", "None"):
-                cls._del(cls.CAL_LIST_BY_ORG_KEY.format(org_id=org_id, active=active))
+            tags.append(f"bizcal:org:{org_id}")
+        cache.invalidate_tags(*tags)
@@ -2,335 +2,303 @@
 # REDIS CACHE SERVICE - app/services/redis_campaign_service.py
 # ============================================
 
-import json
-from typing import Any, List, Optional, Dict
+from typing import List, Optional, Dict
+from ..core.cache import cache
 from ..core.redis_client import redis_client
 
-def _ser(obj: Any) -> str:
-    return json.dumps(obj, default=str)
-
-def _deser(blob: str) -> Any:
-    return json.loads(blob)
-
 class RedisCampaignService:
     # TTLs in seconds
     LIST_TTL = 300      # 5 minutes for lists
     ITEM_TTL = 600      # 10 minutes for individual items
     ANALYTICS_TTL = 60  # 1 minute for analytics (frequently updated)
     RESULT_TTL = 900    # 15 minutes for results
-    
+
+    # Key families that used to be dropped with KEYS patterns are tagged:
+    #   campaigns:org:<org_id>          org lists, status lists, daily stats
+    #   campaign:<id>:results / :events  paginated and per-status lists
+    #   campaign:<id>:channel_stats      per-channel stats
+    CAMPAIGNS_BY_ORG = cache.namespace("campaigns:org:{org_id}", ttl=LIST_TTL,
+                                       tags=("campaigns:org:{org_id}",))
+    CAMPAIGNS_BY_SURVEY = cache.namespace("campaigns:survey:{survey_id}", ttl=LIST_TTL)
+    CAMPAIGNS_BY_STATUS = cache.namespace("campaigns:org:{org_id}:status:{status}", ttl=LIST_TTL,
+                                          tags=("campaigns:org:{org_id}", "campaigns:org:{org_id}:status"))
+    CAMPAIGN = cache.namespace("campaign:{campaign_id}", ttl=ITEM_TTL)
+    CAMPAIGN_ANALYTICS = cache.namespace("campaign:{campaign_id}:analytics", ttl=ANALYTICS_TTL)
+
+    RESULTS_PAGE = cache.namespace("results:campaign:{campaign_id}:page:{page}", ttl=RESULT_TTL,
+                                   tags=("campaign:{campaign_id}:results",))
+    RESULTS_BY_CONTACT = cache.namespace("results:contact:{contact_id}", ttl=RESULT_TTL)
+    RESULTS_BY_STATUS = cache.namespace("results:campaign:{campaign_id}:status:{status}", ttl=RESULT_TTL,
+                                        tags=("campaign:{campaign_id}:results",))
+    RESULT = cache.namespace("result:{result_id}", ttl=RESULT_TTL)
+    RESULT_BY_TOKEN = cache.namespace("result:token:{tracking_token}", ttl=RESULT_TTL)
+
+    EVENTS_PAGE = cache.namespace("events:campaign:{campaign_id}:page:{page}", ttl=LIST_TTL,
+                                  tags=("campaign:{campaign_id}:events",))
+    EVENTS_BY_RESULT = cache.namespace("events:result:{result_id}", ttl=LIST_TTL)
+    EVENT = cache.namespace("event:{event_id}", ttl=ITEM_TTL)
+
+    CHANNEL_STATS = cache.namespace("stats:campaign:{campaign_id}:channel:{channel}", ttl=ANALYTICS_TTL,
+                                    tags=("campaign:{campaign_id}:channel_stats",))
+    DAILY_STATS = cache.namespace("stats:org:{org_id}:date:{date}", ttl=LIST_TTL,
+                                  tags=("campaigns:org:{org_id}",))
+
     # Cache key patterns
-    CAMPAIGNS_BY_ORG_KEY = "campaigns:org:{org_id}"
-    CAMPAIGNS_BY_SURVEY_KEY = "campaigns:survey:{survey_id}"
-    CAMPAIGNS_BY_STATUS_KEY = "campaigns:org:{org_id}:status:{status}"
-    CAMPAIGN_KEY = "campaign:{campaign_id}"
-    CAMPAIGN_ANALYTICS_KEY = "campaign:{campaign_id}:analytics"
+    CAMPAIGNS_BY_ORG_KEY = CAMPAIGNS_BY_ORG.template
+    CAMPAIGNS_BY_SURVEY_KEY = CAMPAIGNS_BY_SURVEY.template
+    CAMPAIGNS_BY_STATUS_KEY = CAMPAIGNS_BY_STATUS.template
+    CAMPAIGN_KEY = CAMPAIGN.template
+    CAMPAIGN_ANALYTICS_KEY = CAMPAIGN_ANALYTICS.template
     
     RESULTS_BY_CAMPAIGN_KEY = "results:campaign:{campaign_id}"
-    RESULTS_BY_CONTACT_KEY = "results:contact:{contact_id}"
-    RESULTS_BY_STATUS_KEY = "results:campaign:{campaign_id}:status:{status}"
-    RESULT_KEY = "result:{result_id}"
-    RESULT_BY_TOKEN_KEY = "result:token:{tracking_token}"
+    RESULTS_BY_CONTACT_KEY = RESULTS_BY_CONTACT.template
+    RESULTS_BY_STATUS_KEY = RESULTS_BY_STATUS.template
+    RESULT_KEY = RESULT.template
+    RESULT_BY_TOKEN_KEY = RESULT_BY_TOKEN.template
     
     EVENTS_BY_CAMPAIGN_KEY = "events:campaign:{campaign_id}"
-    EVENTS_BY_RESULT_KEY = "events:result:{result_id}"
-    EVENT_KEY = "event:{event_id}"
+    EVENTS_BY_RESULT_KEY = EVENTS_BY_RESULT.template
+    EVENT_KEY = EVENT.template
     
     # Stats aggregation keys
-    CAMPAIGN_CHANNEL_STATS_KEY = "stats:campaign:{campaign_id}:channel:{channel}"
-    DAILY_STATS_KEY = "stats:org:{org_id}:date:{date}"
-
-    @classmethod
-    def _set(cls, key: str, obj: Any, ttl: int = None) -> None:
-        try:
-            if not redis_client.ping():
-                return
-            blob = _ser(obj)
-            if ttl:
-                redis_client.client.setex(key, ttl, blob)
-            else:
-                redis_client.client.set(key, blob)
-        except Exception as e:
-            print(f"Redis set error for key {key}: {e}")
-
-    @classmethod
-    def _get(cls, key: str) -> Optional[Any]:
-        try:
-            if not redis_client.ping():
-                return None
-            blob = redis_client.client.get(key)
-            if not blob:
-                return None
-            if isinstance(blob, bytes):
-                blob = blob.decode("utf-8")
-            return _deser(blob)
-        except Exception as e:
-            print(f"Redis get error for key {key}: {e}")
-            return None
-
-    @classmethod
-    def _delete(cls, *keys: str) -> None:
-        try:
-            if not redis_client.ping() or not keys:
-                return
-            redis_client.client.delete(*keys)
-        except Exception as e:
-            print(f"Redis delete error for keys {keys}: {e}")
-
-    @classmethod
-    def _delete_pattern(cls, pattern: str) -> None:
-        """Delete all keys matching a pattern"""
-        try:
-            if not redis_client.ping():
-                return
-            keys = redis_client.client.keys(pattern)
-            if keys:
-                redis_client.client.delete(*keys)
-        except Exception as e:
-            print(f"Redis delete pattern error for {pattern}: {e}")
+    CAMPAIGN_CHANNEL_STATS_KEY = CHANNEL_STATS.template
+    DAILY_STATS_KEY = DAILY_STATS.template
 
     # -------- Campaigns Cache --------
     @classmethod
     def cache_campaigns_by_org(cls, org_id: str, campaigns: List[Dict]) -> None:
         """Cache all campaigns for an organization"""
-        cls._set(cls.CAMPAIGNS_BY_ORG_KEY.format(org_id=org_id), campaigns, cls.LIST_TTL)
+        cls.CAMPAIGNS_BY_ORG.set(org_id, value=campaigns)
 
     @classmethod
     def get_campaigns_by_org(cls, org_id: str) -> Optional[List[Dict]]:
         """Get cached campaigns for an organization"""
-        return cls._get(cls.CAMPAIGNS_BY_ORG_KEY.format(org_id=org_id))
+        return cls.CAMPAIGNS_BY_ORG.get(org_id)
 
     @classmethod
     def cache_campaigns_by_survey(cls, survey_id: str, campaigns: List[Dict]) -> None:
         """Cache campaigns for a specific survey"""
-        cls._set(cls.CAMPAIGNS_BY_SURVEY_KEY.format(survey_id=survey_id), campaigns, cls.LIST_TTL)
+        cls.CAMPAIGNS_BY_SURVEY.set(survey_id, value=campaigns)
 
     @classmethod
     def get_campaigns_by_survey(cls, survey_id: str) -> Optional[List[Dict]]:
         """Get cached campaigns for a survey"""
-        return cls._get(cls.CAMPAIGNS_BY_SURVEY_KEY.format(survey_id=survey_id))
+        return cls.CAMPAIGNS_BY_SURVEY.get(survey_id)
 
     @classmethod
     def cache_campaigns_by_status(cls, org_id: str, status: str, campaigns: List[Dict]) -> None:
         """Cache campaigns filtered by status"""
-        cls._set(cls.CAMPAIGNS_BY_STATUS_KEY.format(org_id=org_id, status=status), campaigns, cls.LIST_TTL)
+        cls.CAMPAIGNS_BY_STATUS.set(org_id, status, value=campaigns)
 
     @classmethod
     def get_campaigns_by_status(cls, org_id: str, status: str) -> Optional[List[Dict]]:
         """Get cached campaigns by status"""
-        return cls._get(cls.CAMPAIGNS_BY_STATUS_KEY.format(org_id=org_id, status=status))
+        return cls.CAMPAIGNS_BY_STATUS.get(org_id, status)
 
     @classmethod
     def cache_campaign(cls, campaign_id: str, campaign_data: Dict) -> None:
         """Cache a single campaign"""
-        cls._set(cls.CAMPAIGN_KEY.format(campaign_id=campaign_id), campaign_data, cls.ITEM_TTL)
+        cls.CAMPAIGN.set(campaign_id, value=campaign_data)
 
     @classmethod
     def get_campaign(cls, campaign_id: str) -> Optional[Dict]:
         """Get cached campaign"""
-        return cls._get(cls.CAMPAIGN_KEY.format(campaign_id=campaign_id))
+        return cls.CAMPAIGN.get(campaign_id)
 
     @classmethod
     def cache_campaign_analytics(cls, campaign_id: str, analytics: Dict) -> None:
         """Cache campaign analytics (shorter TTL as it updates frequently)"""
-        cls._set(cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id), analytics, cls.ANALYTICS_TTL)
+        cls.CAMPAIGN_ANALYTICS.set(campaign_id, value=analytics)
 
     @classmethod
     def get_campaign_analytics(cls, campaign_id: str) -> Optional[Dict]:
         """Get cached campaign analytics"""
-        return cls._get(cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id))
+        return cls.CAMPAIGN_ANALYTICS.get(campaign_id)
 
     # -------- Campaign Results Cache --------
     @classmethod
     def cache_results_by_campaign(cls, campaign_id: str, results: List[Dict], page: int = 1) -> None:
         """Cache results for a campaign (with pagination)"""
-        key = f"{cls.RESULTS_BY_CAMPAIGN_KEY.format(campaign_id=campaign_id)}:page:{page}"
-        cls._set(key, results, cls.RESULT_TTL)
+        cls.RESULTS_PAGE.set(campaign_id, page, value=results)
 
     @classmethod
     def get_results_by_campaign(cls, campaign_id: str, page: int = 1) -> Optional[List[Dict]]:
         """Get cached results for a campaign"""
-        key = f"{cls.RESULTS_BY_CAMPAIGN_KEY.format(campaign_id=campaign_id)}:page:{page}"
-        return cls._get(key)
+        return cls.RESULTS_PAGE.get(campaign_id, page)
 
     @classmethod
     def cache_results_by_contact(cls, contact_id: str, results: List[Dict]) -> None:
         """Cache all campaign results for a contact"""
-        cls._set(cls.RESULTS_BY_CONTACT_KEY.format(contact_id=contact_id), results, cls.RESULT_TTL)
+        cls.RESULTS_BY_CONTACT.set(contact_id, value=results)
 
     @classmethod
     def get_results_by_contact(cls, contact_id: str) -> Optional[List[Dict]]:
         """Get cached results for a contact"""
-        return cls._get(cls.RESULTS_BY_CONTACT_KEY.format(contact_id=contact_id))
+        return cls.RESULTS_BY_CONTACT.get(contact_id)
 
     @classmethod
     def cache_results_by_status(cls, campaign_id: str, status: str, results: List[Dict]) -> None:
         """Cache results filtered by status"""
-        cls._set(cls.RESULTS_BY_STATUS_KEY.format(campaign_id=campaign_id, status=status), results, cls.RESULT_TTL)
+        cls.RESULTS_BY_STATUS.set(campaign_id, status, value=results)
 
     @classmethod
     def get_results_by_status(cls, campaign_id: str, status: str) -> Optional[List[Dict]]:
         """Get cached results by status"""
-        return cls._get(cls.RESULTS_BY_STATUS_KEY.format(campaign_id=campaign_id, status=status))
+        return cls.RESULTS_BY_STATUS.get(campaign_id, status)
 
     @classmethod
     def cache_result(cls, result_id: str, result_data: Dict) -> None:
         """Cache a single campaign result"""
-        cls._set(cls.RESULT_KEY.format(result_id=result_id), result_data, cls.RESULT_TTL)
+        cls.RESULT.set(result_id, value=result_data)
 
     @classmethod
     def get_result(cls, result_id: str) -> Optional[Dict]:
         """Get cached result"""
-        return cls._get(cls.RESULT_KEY.format(result_id=result_id))
+        return cls.RESULT.get(result_id)
 
     @classmethod
     def cache_result_by_token(cls, tracking_token: str, result_data: Dict) -> None:
         """Cache result by tracking token (for webhook lookups)"""
-        cls._set(cls.RESULT_BY_TOKEN_KEY.format(tracking_token=tracking_token), result_data, cls.RESULT_TTL)
+        cls.RESULT_BY_TOKEN.set(tracking_token, value=result_data)
 
     @classmethod
     def get_result_by_token(cls, tracking_token: str) -> Optional[Dict]:
         """Get result by tracking token"""
-        return cls._get(cls.RESULT_BY_TOKEN_KEY.format(tracking_token=tracking_token))
+        return cls.RESULT_BY_TOKEN.get(tracking_token)
 
     # -------- Campaign Events Cache --------
     @classmethod
     def cache_events_by_campaign(cls, campaign_id: str, events: List[Dict], page: int = 1) -> None:
         """Cache events for a campaign"""
-        key = f"{cls.EVENTS_BY_CAMPAIGN_KEY.format(campaign_id=campaign_id)}:page:{page}"
-        cls._set(key, events, cls.LIST_TTL)
+        cls.EVENTS_PAGE.set(campaign_id, page, value=events)
 
     @classmethod
     def get_events_by_campaign(cls, campaign_id: str, page: int = 1) -> Optional[List[Dict]]:
         """Get cached events for a campaign"""
-        key = f"{cls.EVENTS_BY_CAMPAIGN_KEY.format(campaign_id=campaign_id)}:page:{page}"
-        return cls._get(key)
+        return cls.EVENTS_PAGE.get(campaign_id, page)
 
     @classmethod
     def cache_events_by_result(cls, result_id: str, events: List[Dict]) -> None:
         """Cache events for a specific result"""
-        cls._set(cls.EVENTS_BY_RESULT_KEY.format(result_id=result_id), events, cls.LIST_TTL)
+        cls.EVENTS_BY_RESULT.set(result_id, value=events)
 
     @classmethod
     def get_events_by_result(cls, result_id: str) -> Optional[List[Dict]]:
         """Get cached events for a result"""
-        return cls._get(cls.EVENTS_BY_RESULT_KEY.format(result_id=result_id))
+        return cls.EVENTS_BY_RESULT.get(result_id)
 
     @classmethod
     def cache_event(cls, event_id: str, event_data: Dict) -> None:
         """Cache a single event"""
-        cls._set(cls.EVENT_KEY.format(event_id=event_id), event_data, cls.ITEM_TTL)
+        cls.EVENT.set(event_id, value=event_data)
 
     @classmethod
     def get_event(cls, event_id: str) -> Optional[Dict]:
         """Get cached event"""
-        return cls._get(cls.EVENT_KEY.format(event_id=event_id))
+        return cls.EVENT.get(event_id)
 
     # -------- Channel Statistics Cache --------
     @classmethod
     def cache_channel_stats(cls, campaign_id: str, channel: str, stats: Dict) -> None:
         """Cache per-channel statistics for a campaign"""
-        cls._set(cls.CAMPAIGN_CHANNEL_STATS_KEY.format(campaign_id=campaign_id, channel=channel), 
-                stats, cls.ANALYTICS_TTL)
+        cls.CHANNEL_STATS.set(campaign_id, channel, value=stats)
 
     @classmethod
     def get_channel_stats(cls, campaign_id: str, channel: str) -> Optional[Dict]:
         """Get cached channel statistics"""
-        return cls._get(cls.CAMPAIGN_CHANNEL_STATS_KEY.format(campaign_id=campaign_id, channel=channel))
+        return cls.CHANNEL_STATS.get(campaign_id, channel)
 
     @classmethod
     def cache_daily_stats(cls, org_id: str, date: str, stats: Dict) -> None:
         """Cache daily aggregated stats for an organization"""
-        cls._set(cls.DAILY_STATS_KEY.format(org_id=org_id, date=date), stats, cls.LIST_TTL)
+        cls.DAILY_STATS.set(org_id, date, value=stats)
 
     @classmethod
     def get_daily_stats(cls, org_id: str, date: str) -> Optional[Dict]:
         """Get cached daily stats"""
-        return cls._get(cls.DAILY_STATS_KEY.format(org_id=org_id, date=date))
+        return cls.DAILY_STATS.get(org_id, date)
 
     # -------- Cache Invalidation --------
     @classmethod
     def invalidate_campaign_caches(cls, campaign_id: str, org_id: str, survey_id: str = None) -> None:
         """Invalidate all caches related to a campaign"""
         keys_to_delete = [
-            cls.CAMPAIGN_KEY.format(campaign_id=campaign_id),
-            cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id),
-            cls.CAMPAIGNS_BY_ORG_KEY.format(org_id=org_id),
+            cls.CAMPAIGN.key(campaign_id),
+            cls.CAMPAIGN_ANALYTICS.key(campaign_id),
+            cls.CAMPAIGNS_BY_ORG.key(org_id),
         ]
         
         if survey_id:
-            keys_to_delete.append(cls.CAMPAIGNS_BY_SURVEY_KEY.format(survey_id=survey_id))
-        
-        cls._delete(*keys_to_delete)
+            keys_to_delete.append(cls.CAMPAIGNS_BY_SURVEY.key(survey_id))
         
-        # Delete status-based caches
-        cls._delete_pattern(f"campaigns:org:{org_id}:status:*")
+        cache.delete_keys(*keys_to_delete)
         
-        # Delete channel stats
-        cls._delete_pattern(f"stats:campaign:{campaign_id}:channel:*")
+        # Delete status-based caches and channel stats
+        cache.invalidate_tags(f"campaigns:org:{org_id}:status", f"campaign:{campaign_id}:channel_stats")
 
     @classmethod
     def invalidate_result_caches(cls, result_id: str, campaign_id: str, contact_id: str, 
                                  tracking_token: str = None) -> None:
         """Invalidate all caches related to a campaign result"""
         keys_to_delete = [
-            cls.RESULT_KEY.format(result_id=result_id),
-            cls.RESULTS_BY_CONTACT_KEY.format(contact_id=contact_id),
-            cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id),
+            cls.RESULT.key(result_id),
+            cls.RESULTS_BY_CONTACT.key(contact_id),
+            cls.CAMPAIGN_ANALYTICS.key(campaign_id),
         ]
         
         if tracking_token:
-            keys_to_delete.append(cls.RESULT_BY_TOKEN_KEY.format(tracking_token=tracking_token))
+            keys_to_delete.append(cls.RESULT_BY_TOKEN.key(tracking_token))
         
-        cls._delete(*keys_to_delete)
+        cache.delete_keys(*keys_to_delete)
         
-        # Delete paginated results
-        cls._delete_pattern(f"results:campaign:{campaign_id}:page:*")
-        cls._delete_pattern(f"results:campaign:{campaign_id}:status:*")
+        # Delete paginated and per-status results
+        cache.invalidate_tags(f"campaign:{campaign_id}:results")
 
     @classmethod
     def invalidate_event_caches(cls, event_id: str, campaign_id: str, result_id: str) -> None:
         """Invalidate all caches related to a campaign event"""
         keys_to_delete = [
-            cls.EVENT_KEY.format(event_id=event_id),
-            cls.EVENTS_BY_RESULT_KEY.format(result_id=result_id),
-            cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id),
+            cls.EVENT.key(event_id),
+            cls.EVENTS_BY_RESULT.key(result_id),
+            cls.CAMPAIGN_ANALYTICS.key(campaign_id),
         ]
         
-        cls._delete(*keys_to_delete)
+        cache.delete_keys(*keys_to_delete)
         
         # Delete paginated events
-        cls._delete_pattern(f"events:campaign:{campaign_id}:page:*")
+        cache.invalidate_tags(f"campaign:{campaign_id}:events")
 
     @classmethod
     def invalidate_analytics_caches(cls, campaign_id: str, org_id: str) -> None:
         """Invalidate all analytics caches for a campaign"""
-        cls._delete(cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id))
-        cls._delete_pattern(f"stats:campaign:{campaign_id}:channel:*")
+        cache.delete_keys(cls.CAMPAIGN_ANALYTICS.key(campaign_id))
+        cache.invalidate_tags(f"campaign:{campaign_id}:channel_stats")
         
         # Invalidate daily stats for today
         from datetime import datetime
         today = datetime.now().strftime("%Y-%m-%d")
-        cls._delete(cls.DAILY_STATS_KEY.format(org_id=org_id, date=today))
+        cache.delete_keys(cls.DAILY_STATS.key(org_id, today))
 
     @classmethod
     def invalidate_all_campaign_caches(cls, org_id: str) -> None:
         """Invalidate all campaign-related caches for an organization"""
+        # org lists, status lists and daily stats via their org tag
+        cache.invalidate_tags(f"campaigns:org:{org_id}")
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             
+            # Result/event lists carry no org, so they still go by pattern
+            # (incremental SCAN, not KEYS). "results:*" also matched the
+            # survey results cache, which is not campaign data.
             patterns = [
-                f"campaigns:org:{org_id}*",
-                f"stats:org:{org_id}*",
-                f"results:*",  # This is broad but ensures consistency
-                f"events:*",
+                "results:campaign:*",
+                "results:contact:*",
+                "events:*",
             ]
             
             for pattern in patterns:
-                keys = redis_client.client.keys(pattern)
-                if keys:
-                    redis_client.client.delete(*keys)
+                redis_client.unlink_pattern(pattern)
         except Exception as e:
             print(f"Error invalidating all campaign caches for org {org_id}: {e}")
 
@@ -343,7 +311,7 @@ class RedisCampaignService:
         Counter names: sent_count, delivered_count, opened_count, clicked_count, etc.
         """
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             
             counter_key = f"counter:campaign:{campaign_id}:{counter_name}"
@@ -351,7 +319,7 @@ class RedisCampaignService:
             redis_client.client.expire(counter_key, cls.ANALYTICS_TTL)
             
             # Invalidate analytics cache
-            cls._delete(cls.CAMPAIGN_ANALYTICS_KEY.format(campaign_id=campaign_id))
+            cache.delete_keys(cls.CAMPAIGN_ANALYTICS.key(campaign_id))
         except Exception as e:
             print(f"Error incrementing campaign counter {counter_name}: {e}")
 
@@ -359,7 +327,7 @@ class RedisCampaignService:
     def get_campaign_counter(cls, campaign_id: str, counter_name: str) -> Optional[int]:
         """Get a campaign counter value from Redis"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             counter_key = f"counter:campaign:{campaign_id}:{counter_name}"
@@ -380,7 +348,7 @@ class RedisCampaignService:
         Used for webhook processing
         """
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             
             key = f"token_lookup:{tracking_token}"
@@ -392,7 +360,7 @@ class RedisCampaignService:
     def get_result_id_by_token(cls, tracking_token: str) -> Optional[str]:
         """Get result ID from tracking token"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             key = f"token_lookup:{tracking_token}"
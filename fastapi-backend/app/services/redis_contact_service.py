@@ -1,16 +1,6 @@
 # app/services/redis_contact_service.py
-import json
-from typing import Any, Dict, List, Optional
-from ..core.redis_client import redis_client
-
-
-def _ser(obj: Any) -> str:
-    """Safe JSON serializer with datetime support."""
-    return json.dumps(obj, default=str)
-
-
-def _deser(blob: str) -> Any:
-    return json.loads(blob)
+from typing import Dict, List, Optional
+from ..core.cache import cache
 
 
 class RedisContactService:
@@ -19,104 +9,67 @@ class RedisContactService:
     CONTACT_LIST_TTL = 300   # 5 minutes for list/org-level collections
     LIST_TTL = 600           # 10 minutes for single contact list
 
+    CONTACT = cache.namespace("contact:{contact_id}", ttl=CONTACT_TTL)
+    CONTACT_FULL = cache.namespace("contact:{contact_id}:full", ttl=CONTACT_TTL)
+    ORG_CONTACTS = cache.namespace("contacts:org:{org_id}", ttl=CONTACT_LIST_TTL)
+    LIST_CONTACTS = cache.namespace("contacts:list:{list_id}", ttl=CONTACT_LIST_TTL)
+    LIST = cache.namespace("clist:{list_id}", ttl=LIST_TTL)
+    ORG_LISTS = cache.namespace("clist:org:{org_id}", ttl=LIST_TTL)
+
     # Key patterns
-    CONTACT_KEY          = "contact:{contact_id}"
-    CONTACT_FULL_KEY     = "contact:{contact_id}:full"
-    ORG_CONTACTS_KEY     = "contacts:org:{org_id}"
-    LIST_CONTACTS_KEY    = "contacts:list:{list_id}"
-
-    LIST_KEY             = "clist:{list_id}"
-    ORG_LISTS_KEY        = "clist:org:{org_id}"
-
-    @classmethod
-    def _ok(cls) -> bool:
-        try:
-            return bool(redis_client.ping())
-        except Exception:
-            return False
-
-    @classmethod
-    def _set(cls, key: str, obj: Any, ttl: Optional[int] = None) -> None:
-        if not cls._ok():
-            return
-        blob = _ser(obj)
-        try:
-            if ttl:
-                redis_client.client.setex(key, ttl, blob)
-            else:
-                redis_client.client.set(key, blob)
-        except Exception as e:
-            print(f"[RedisContactService] set error {key}: {e}")
-
-    @classmethod
-    def _get(cls, key: str) -> Optional[Any]:
-        if not cls._ok():
-            return None
-        try:
-            blob = redis_client.client.get(key)
-            if not blob:
-                return None
-            if isinstance(blob, bytes):
-                blob = blob.decode("utf-8")
-            return _deser(blob)
-        except Exception as e:
-            print(f"[RedisContactService] get error {key}: {e}")
-            return None
-
-    @classmethod
-    def _del(cls, *keys: str) -> None:
-        if not cls._ok() or not keys:
-            return
-        try:
-            redis_client.client.delete(*keys)
-        except Exception as e:
-            print(f"[RedisContactService] delete error {keys}: {e}")
+    CONTACT_KEY          = CONTACT.template
+    CONTACT_FULL_KEY     = CONTACT_FULL.template
+    ORG_CONTACTS_KEY     = ORG_CONTACTS.template
+    LIST_CONTACTS_KEY    = LIST_CONTACTS.template
+
+    LIST_KEY             = LIST.template
+    ORG_LISTS_KEY        = ORG_LISTS.template
 
     # --------- contact cache helpers ---------
 
     @classmethod
     def cache_contact(cls, contact_id: str, data: Dict) -> None:
         """Store a slim contact (without heavy relations)."""
-        cls._set(cls.CONTACT_KEY.format(contact_id=contact_id), data, cls.CONTACT_TTL)
+        cls.CONTACT.set(contact_id, value=data)
 
     @classmethod
     def get_contact(cls, contact_id: str) -> Optional[Dict]:
-        return cls._get(cls.CONTACT_KEY.format(contact_id=contact_id))
+        return cls.CONTACT.get(contact_id)
 
     @classmethod
     def cache_contact_full(cls, contact_id: str, data: Dict) -> None:
         """Store a full contact (with emails, phones, socials, lists)."""
-        cls._set(cls.CONTACT_FULL_KEY.format(contact_id=contact_id), data, cls.CONTACT_TTL)
+        cls.CONTACT_FULL.set(contact_id, value=data)
 
     @classmethod
     def get_contact_full(cls, contact_id: str) -> Optional[Dict]:
-        return cls._get(cls.CONTACT_FULL_KEY.format(contact_id=contact_id))
+        return cls.CONTACT_FULL.get(contact_id)
 
     @classmethod
     def cache_contacts_by_org(cls, org_id: str, rows: List[Dict]) -> None:
-        cls._set(cls.ORG_CONTACTS_KEY.format(org_id=org_id), rows, cls.CONTACT_LIST_TTL)
+        cls.ORG_CONTACTS.set(org_id, value=rows)
 
     @classmethod
     def get_contacts_by_org(cls, org_id: str) -> Optional[List[Dict]]:
-        return cls._get(cls.ORG_CONTACTS_KEY.format(org_id=org_id))
+        return cls.ORG_CONTACTS.get(org_id)
 
     @classmethod
     def cache_contacts_by_list(cls, list_id: str, rows: List[Dict]) -> None:
-        cls._set(cls.LIST_CONTACTS_KEY.format(list_id=list_id), rows, cls.CONTACT_LIST_TTL)
+        cls.LIST_CONTACTS.set(list_id, value=rows)
 
     @classmethod
     def get_contacts_by_list(cls, list_id: str) -> Optional[List[Dict]]:
-        return cls._get(cls.LIST_CONTACTS_KEY.format(list_id=list_id))
+        return cls.LIST_CONTACTS.get(list_id)
 
     # --------- list cache helpers ---------
 
     @classmethod
     def cache_list(cls, list_id: str, data: Dict) -> None:
-        cls._set(cls.LIST_KEY.format(list_id=list_id), data, cls.LIST_TTL)
+        cls.LIST.set(list_id, value=data)
 
     @classmethod
     def get_list(cls, list_id: str) -> Optional[Dict]:
-        return cls._get(cls.LIST_KEY.format(list_id=list_id))
+        return cls.LIST.get(list_id)
 
     @classmethod
     def cache_list_full(cls, list_id: str, data: Dict) -> None:
@@ -129,48 +82,40 @@ class RedisContactService:
 
     @classmethod
     def cache_lists_by_org(cls, org_id: str, rows: List[Dict]) -> None:
-        cls._set(cls.ORG_LISTS_KEY.format(org_id=org_id), rows, cls.LIST_TTL)
+        cls.ORG_LISTS.set(org_id, value=rows)
 
     @classmethod
     def get_lists_by_org(cls, org_id: str) -> Optional[List[Dict]]:
-        return cls._get(cls.ORG_LISTS_KEY.format(org_id=org_id))
+        return cls.ORG_LISTS.get(org_id)
 
     # --------- invalidation helpers ---------
 
     @classmethod
     def invalidate_contact(cls, contact_id: str, org_id: Optional[str] = None) -> None:
         """Invalidate a single contact + org-level contact list cache."""
-        keys = [
-            cls.CONTACT_KEY.format(contact_id=contact_id),
-            cls.CONTACT_FULL_KEY.format(contact_id=contact_id),
-        ]
-        cls._del(*keys)
+        keys = [cls.CONTACT.key(contact_id), cls.CONTACT_FULL.key(contact_id)]
         if org_id:
-            cls.invalidate_org_contacts(org_id)
+            keys.append(cls.ORG_CONTACTS.key(org_id))
+        cache.delete_keys(*keys)
 
     @classmethod
     def invalidate_org_contacts(cls, org_id: str) -> None:
         """Invalidate the org-level contacts collection."""
-        cls._del(cls.ORG_CONTACTS_KEY.format(org_id=org_id))
+        cls.ORG_CONTACTS.delete(org_id)
 
     @classmethod
     def invalidate_list(cls, list_id: str, org_id: Optional[str] = None) -> None:
         """Invalidate a single list + its contact collection + org lists cache."""
-        keys = [
-            cls.LIST_KEY.format(list_id=list_id),
-            cls.LIST_CONTACTS_KEY.format(list_id=list_id),
-        ]
-        cls._del(*keys)
+        keys = [cls.LIST.key(list_id), cls.LIST_CONTACTS.key(list_id)]
         if org_id:
-            cls.invalidate_org_lists(org_id)
-            cls.invalidate_org_contacts(org_id)
+            keys += [cls.ORG_LISTS.key(org_id), cls.ORG_CONTACTS.key(org_id)]
+        cache.delete_keys(*keys)
 
     @classmethod
     def invalidate_org_lists(cls, org_id: str) -> None:
-        cls._del(cls.ORG_LISTS_KEY.format(org_id=org_id))
+        cls.ORG_LISTS.delete(org_id)
 
     @classmethod
     def invalidate_org(cls, org_id: str) -> None:
         """Convenience: nuke both contacts + lists collections for an org."""
-        cls.invalidate_org_contacts(org_id)
-        cls.invalidate_org_lists(org_id)
+        cache.delete_keys(cls.ORG_CONTACTS.key(org_id), cls.ORG_LISTS.key(org_id))
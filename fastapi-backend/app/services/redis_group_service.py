@@ -1,64 +1,50 @@
 # app/services/redis_group_service.py
-import json
 from typing import Any, Dict, List, Optional
-from ..core.redis_client import redis_client
+from ..core.cache import cache
 
 class RedisGroupService:
     GROUP_TTL = 600
     MEMBERS_TTL = 600
     LIST_TTL = 300
 
-    GROUP_KEY = "sg:{group_id}"
-    ORG_LIST_KEY = "sglist:{org_id}"
-    MEMBERS_KEY = "sgmembers:{group_id}"
+    GROUP = cache.namespace("sg:{group_id}", ttl=GROUP_TTL)
+    ORG_LIST = cache.namespace("sglist:{org_id}", ttl=LIST_TTL)
+    MEMBERS = cache.namespace("sgmembers:{group_id}", ttl=MEMBERS_TTL)
 
-    @classmethod
-    def _ping(cls): 
-        try: return redis_client.ping()
-        except Exception: return False
+    GROUP_KEY = GROUP.template
+    ORG_LIST_KEY = ORG_LIST.template
+    MEMBERS_KEY = MEMBERS.template
 
     @classmethod
     def cache_group(cls, group: Dict[str, Any]) -> None:
-        if not cls._ping(): return
         gid = group.get("group_id")
         if not gid: return
-        redis_client.client.setex(cls.GROUP_KEY.format(group_id=gid), cls.GROUP_TTL, json.dumps(group))
+        cls.GROUP.set(gid, value=group)
 
     @classmethod
     def get_group(cls, group_id: str) -> Optional[Dict[str, Any]]:
-        if not cls._ping(): return None
-        blob = redis_client.client.get(cls.GROUP_KEY.format(group_id=group_id))
-        return json.loads(blob) if blob else None
+        return cls.GROUP.get(group_id)
 
     @classmethod
     def cache_org_list(cls, org_id: str, groups: List[Dict[str, Any]]) -> None:
-        if not cls._ping(): return
-        redis_client.client.setex(cls.ORG_LIST_KEY.format(org_id=org_id), cls.LIST_TTL, json.dumps(groups))
+        cls.ORG_LIST.set(org_id, value=groups)
 
     @classmethod
     def get_org_list(cls, org_id: str) -> Optional[List[Dict[str, Any]]]:
-        if not cls._ping(): return None
-        blob = redis_client.client.get(cls.ORG_LIST_KEY.format(org_id=org_id))
-        return json.loads(blob) if blob else None
+        return cls.ORG_LIST.get(org_id)
 
     @classmethod
     def cache_members(cls, group_id: str, members: List[Dict[str, Any]]) -> None:
-        if not cls._ping(): return
-        redis_client.client.setex(cls.MEMBERS_KEY.format(group_id=group_id), cls.MEMBERS_TTL, json.dumps(members))
+        cls.MEMBERS.set(group_id, value=members)
 
     @classmethod
     def get_members(cls, group_id: str) -> Optional[List[Dict[str, Any]]]:
-        if not cls._ping(): return None
-        blob = redis_client.client.get(cls.MEMBERS_KEY.format(group_id=group_id))
-        return json.loads(blob) if blob else None
+        return cls.MEMBERS.get(group_id)
 
     @classmethod
     def invalidate_group(cls, group_id: str) -> None:
-        if not cls._ping(): return
-        redis_client.client.delete(cls.GROUP_KEY.format(group_id=group_id))
-        redis_client.client.delete(cls.MEMBERS_KEY.format(group_id=group_id))
+        cache.delete_keys(cls.GROUP.key(group_id), cls.MEMBERS.key(group_id))
 
     @classmethod
     def invalidate_org(cls, org_id: str) -> None:
-        if not cls._ping(): return
-        redis_client.client.delete(cls.ORG_LIST_KEY.format(org_id=org_id))
+        cls.ORG_LIST.delete(org_id)
@@ -1,10 +1,10 @@
 # app/services/redis_project_service.py
-import json
 import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
 from ..core.redis_client import redis_client
+from ..core import json_codec
 from ..schemas.project import ProjectGetBase, ProjectCreate, ProjectUpdate
 
 # app/services/redis_project_service.py  (add near other KEYs)
@@ -17,7 +17,7 @@ FAVORITES_KEY = "projects:favorites:{user_id}"
 @classmethod
 def simple_rate_limit(cls, key: str, max_ops: int, window_s: int) -> bool:
     try:
-        if not redis_client.ping(): return True
+        if not redis_client.available(): return True
         now = int(time.time())
         bucket = f"rl:{key}:{now//window_s}"
         v = redis_client.client.incr(bucket)
@@ -61,18 +61,12 @@ class RedisProjectService:
         else:
             data = dict(project)
         
-        # Handle datetime serialization
-        def serialize_datetime(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-        
-        return json.dumps(data, default=serialize_datetime)
+        return json_codec.dumps(data)
     
     @classmethod
     def _deserialize_project(cls, data: str) -> Dict[str, Any]:
         """Deserialize project data from Redis"""
-        project_data = json.loads(data)
+        project_data = json_codec.loads(data)
         
         # Convert ISO datetime strings back to datetime objects
         datetime_fields = ['created_at', 'updated_at', 'start_date', 'due_date', 'last_activity']
@@ -89,7 +83,7 @@ class RedisProjectService:
     async def cache_project(cls, project: Any) -> bool:
         """Cache a single project"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             # Determine org_id and project_id
@@ -128,7 +122,7 @@ class RedisProjectService:
     async def get_cached_project(cls, org_id: str, project_id: str) -> Optional[Dict[str, Any]]:
         """Get a cached project"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             key = cls.PROJECT_KEY.format(org_id=org_id, project_id=project_id)
@@ -149,7 +143,7 @@ class RedisProjectService:
     async def cache_org_projects(cls, org_id: str, projects: List[Any]) -> bool:
         """Cache all projects for an organization"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             # Cache individual projects
@@ -165,7 +159,7 @@ class RedisProjectService:
                     project_ids.append(project.get('project_id'))
             
             list_key = cls.PROJECTS_LIST_KEY.format(org_id=org_id)
-            redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json.dumps(project_ids))
+            redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json_codec.dumps(project_ids))
             
             print(f"[RedisProjectService] Cached {len(projects)} projects for org {org_id}")
             return True
@@ -178,7 +172,7 @@ class RedisProjectService:
     async def get_cached_org_projects(cls, org_id: str) -> Optional[List[Dict[str, Any]]]:
         """Get all cached projects for an organization"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             # Get list of project IDs
@@ -189,14 +183,11 @@ class RedisProjectService:
                 print(f"[RedisProjectService] No cached project list for org {org_id}")
                 return None
             
-            project_ids = json.loads(cached_ids)
-            projects = []
+            project_ids = json_codec.loads(cached_ids)
             
-            # Get each project
-            for project_id in project_ids:
-                project = await cls.get_cached_project(org_id, project_id)
-                if project:
-                    projects.append(project)
+            # Get all projects in one batched read
+            keys = [cls.PROJECT_KEY.format(org_id=org_id, project_id=pid) for pid in project_ids]
+            projects = [p for p in redis_client.get_many(keys, cls._deserialize_project) if p]
             
             print(f"[RedisProjectService] Retrieved {len(projects)} cached projects for org {org_id}")
             return projects if projects else None
@@ -207,7 +198,7 @@ class RedisProjectService:
     @classmethod
     async def add_favorite(cls, user_id: str, project_id: str) -> bool:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             key = cls.FAVORITES_KEY.format(user_id=user_id)
             redis_client.client.sadd(key, project_id)
@@ -221,7 +212,7 @@ class RedisProjectService:
     @classmethod
     async def remove_favorite(cls, user_id: str, project_id: str) -> bool:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             key = cls.FAVORITES_KEY.format(user_id=user_id)
             redis_client.client.srem(key, project_id)
@@ -233,7 +224,7 @@ class RedisProjectService:
     @classmethod
     async def get_favorites(cls, user_id: str) -> list[str]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return []
             key = cls.FAVORITES_KEY.format(user_id=user_id)
             raw = redis_client.client.smembers(key) or set()
@@ -255,7 +246,7 @@ class RedisProjectService:
     async def invalidate_project_cache(cls, org_id: str, project_id: str) -> bool:
         """Invalidate project cache"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             # Remove individual project cache
@@ -281,7 +272,7 @@ class RedisProjectService:
     async def invalidate_org_projects_cache(cls, org_id: str) -> bool:
         """Invalidate all projects cache for an organization"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             # Get all project IDs for this org
@@ -289,7 +280,7 @@ class RedisProjectService:
             cached_ids = redis_client.client.get(list_key)
             
             if cached_ids:
-                project_ids = json.loads(cached_ids)
+                project_ids = json_codec.loads(cached_ids)
                 # Delete individual project caches
                 keys_to_delete = [cls.PROJECT_KEY.format(org_id=org_id, project_id=pid) for pid in project_ids]
                 if keys_to_delete:
@@ -313,15 +304,15 @@ class RedisProjectService:
             cached_ids = redis_client.client.get(list_key)
             
             if cached_ids:
-                project_ids = json.loads(cached_ids)
+                project_ids = json_codec.loads(cached_ids)
                 
                 if operation == 'add' and project_id not in project_ids:
                     project_ids.append(project_id)
-                    redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json.dumps(project_ids))
+                    redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json_codec.dumps(project_ids))
                 elif operation == 'remove' and project_id in project_ids:
                     project_ids.remove(project_id)
                     if project_ids:
-                        redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json.dumps(project_ids))
+                        redis_client.client.setex(list_key, cls.PROJECTS_LIST_CACHE_TTL, json_codec.dumps(project_ids))
                     else:
                         redis_client.client.delete(list_key)
             
@@ -334,11 +325,11 @@ class RedisProjectService:
     async def cache_project_stats(cls, project_id: str, stats: Dict[str, Any]) -> bool:
         """Cache project statistics"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             key = cls.PROJECT_STATS_KEY.format(project_id=project_id)
-            redis_client.client.setex(key, cls.PROJECT_CACHE_TTL, json.dumps(stats))
+            redis_client.client.setex(key, cls.PROJECT_CACHE_TTL, json_codec.dumps(stats))
             
             print(f"[RedisProjectService] Cached stats for project {project_id}")
             return True
@@ -351,13 +342,13 @@ class RedisProjectService:
     async def get_cached_project_stats(cls, project_id: str) -> Optional[Dict[str, Any]]:
         """Get cached project statistics"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             key = cls.PROJECT_STATS_KEY.format(project_id=project_id)
             cached_data = redis_client.client.get(key)
             
-            return json.loads(cached_data) if cached_data else None
+            return json_codec.loads(cached_data) if cached_data else None
             
         except Exception as e:
             print(f"[RedisProjectService] Failed to get cached project stats: {e}")
@@ -367,7 +358,7 @@ class RedisProjectService:
     async def add_to_recent_activity(cls, org_id: str, project_id: str, activity: str) -> bool:
         """Add project activity to recent activity list"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             key = cls.RECENT_ACTIVITY_KEY.format(org_id=org_id)
@@ -378,7 +369,7 @@ class RedisProjectService:
             }
             
             # Add to list (keep only recent 50 activities)
-            redis_client.client.lpush(key, json.dumps(activity_data))
+            redis_client.client.lpush(key, json_codec.dumps(activity_data))
             redis_client.client.ltrim(key, 0, 49)  # Keep only 50 recent activities
             redis_client.client.expire(key, 86400)  # Expire in 1 day
             
@@ -392,13 +383,13 @@ class RedisProjectService:
     async def get_recent_activity(cls, org_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent project activities"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return []
             
             key = cls.RECENT_ACTIVITY_KEY.format(org_id=org_id)
             activities = redis_client.client.lrange(key, 0, limit - 1)
             
-            return [json.loads(activity) for activity in activities]
+            return [json_codec.loads(activity) for activity in activities]
             
         except Exception as e:
             print(f"[RedisProjectService] Failed to get recent activity: {e}")
@@ -1,7 +1,25 @@
-import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
-from ..core.redis_client import redis_client
+from ..core.cache import cache
+from ..core import json_codec
+
+
+def _deserialize(blob: bytes | str) -> Dict[str, Any]:
+    if isinstance(blob, (bytes, bytearray)):
+        blob = blob.decode("utf-8", errors="ignore")
+
+    data = json_codec.loads(blob)
+
+    for k in ("created_at", "updated_at"):
+        if data.get(k):
+            try:
+                data[k] = datetime.fromisoformat(
+                    str(data[k]).replace("Z", "+00:00")
+                )
+            except Exception:
+                pass
+
+    return data
 
 
 class RedisQuestionService:
@@ -12,61 +30,17 @@ class RedisQuestionService:
     QUESTION_TTL = 3600        # 1 hour
     QUESTIONS_LIST_TTL = 1800  # 30 minutes
 
-    QUESTION_KEY = "question:{survey_id}:{question_id}"
-    QUESTIONS_BY_SURVEY_KEY = "questions:survey:{survey_id}"
-
-    # ============================================================
-    # INTERNAL HELPERS
-    # ============================================================
-
-    @classmethod
-    def _serialize(cls, obj: Any) -> str:
-        def default(o):
-            if isinstance(o, datetime):
-                return o.isoformat()
-            raise TypeError(f"Not JSON serializable: {type(o)}")
-
-        if hasattr(obj, "model_dump"):
-            return json.dumps(obj.model_dump(), default=default)
+    QUESTION = cache.namespace("question:{survey_id}:{question_id}", ttl=QUESTION_TTL, local_ttl=30,
+                               tags=("survey:{survey_id}",), deserialize=_deserialize)
+    QUESTIONS_BY_SURVEY = cache.namespace("questions:survey:{survey_id}", ttl=QUESTIONS_LIST_TTL, local_ttl=10,
+                                          tags=("survey:{survey_id}",))
 
-        if hasattr(obj, "__dict__"):
-            data = {
-                k: (v.isoformat() if isinstance(v, datetime) else v)
-                for k, v in obj.__dict__.items()
-                if not k.startswith("_")
-            }
-            return json.dumps(data, default=default)
+    QUESTION_KEY = QUESTION.template
+    QUESTIONS_BY_SURVEY_KEY = QUESTIONS_BY_SURVEY.template
 
-        return json.dumps(obj, default=default)
-
-    @classmethod
-    def _deserialize(cls, blob: bytes | str) -> Dict[str, Any]:
-        if isinstance(blob, (bytes, bytearray)):
-            blob = blob.decode("utf-8", errors="ignore")
-
-        data = json.loads(blob)
-
-        for k in ("created_at", "updated_at"):
-            if data.get(k):
-                try:
-                    data[k] = datetime.fromisoformat(
-                        str(data[k]).replace("Z", "+00:00")
-                    )
-                except Exception:
-                    pass
-
-        return data
-
-    @classmethod
-    def _list_key(cls, survey_id: str) -> str:
-        return cls.QUESTIONS_BY_SURVEY_KEY.format(survey_id=survey_id)
-
-    @classmethod
-    def _ping(cls) -> bool:
-        try:
-            return redis_client.ping()
-        except Exception:
-            return False
+    @staticmethod
+    def _qid(question: Any) -> Optional[str]:
+        return getattr(question, "question_id", None) or (isinstance(question, dict) and question.get("question_id")) or None
 
     # ============================================================
     # SINGLE QUESTION CACHE
@@ -74,59 +48,18 @@ class RedisQuestionService:
 
     @classmethod
     def cache_question(cls, survey_id: str, question: Any) -> bool:
-        try:
-            if not cls._ping():
-                return False
-
-            qid = getattr(question, "question_id", None) or question.get("question_id")
-            if not qid:
-                return False
-
-            key = cls.QUESTION_KEY.format(
-                survey_id=survey_id,
-                question_id=qid,
-            )
-
-            redis_client.client.setex(
-                key,
-                cls.QUESTION_TTL,
-                cls._serialize(question),
-            )
-            return True
-        except Exception as e:
-            print(f"[RedisQuestionService] cache_question failed: {e}")
+        qid = cls._qid(question)
+        if not qid:
             return False
+        return cls.QUESTION.set(survey_id, qid, value=question)
 
     @classmethod
     def get_question(cls, survey_id: str, question_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            if not cls._ping():
-                return None
-
-            key = cls.QUESTION_KEY.format(
-                survey_id=survey_id,
-                question_id=question_id,
-            )
-
-            blob = redis_client.client.get(key)
-            return cls._deserialize(blob) if blob else None
-        except Exception as e:
-            print(f"[RedisQuestionService] get_question failed: {e}")
-            return None
+        return cls.QUESTION.get(survey_id, question_id)
 
     @classmethod
     def invalidate_question(cls, survey_id: str, question_id: str) -> None:
-        try:
-            if not cls._ping():
-                return
-
-            key = cls.QUESTION_KEY.format(
-                survey_id=survey_id,
-                question_id=question_id,
-            )
-            redis_client.client.delete(key)
-        except Exception as e:
-            print(f"[RedisQuestionService] invalidate_question failed: {e}")
+        cls.QUESTION.delete(survey_id, question_id)
 
     # ============================================================
     # SURVEY QUESTION LIST CACHE
@@ -134,56 +67,26 @@ class RedisQuestionService:
 
     @classmethod
     def _get_ids(cls, survey_id: str) -> List[str]:
-        if not cls._ping():
-            return []
-
-        blob = redis_client.client.get(cls._list_key(survey_id))
-        if not blob:
-            return []
-
-        try:
-            if isinstance(blob, (bytes, bytearray)):
-                blob = blob.decode("utf-8", errors="ignore")
-            return json.loads(blob) or []
-        except Exception:
-            return []
+        return cls.QUESTIONS_BY_SURVEY.get(survey_id, fresh=True) or []
 
     @classmethod
     def _set_ids(cls, survey_id: str, ids: List[str]) -> None:
-        if not cls._ping():
-            return
-
-        redis_client.client.setex(
-            cls._list_key(survey_id),
-            cls.QUESTIONS_LIST_TTL,
-            json.dumps(ids),
-        )
+        cls.QUESTIONS_BY_SURVEY.set(survey_id, value=ids)
 
     @classmethod
     def cache_questions_list(cls, survey_id: str, questions: List[Any]) -> bool:
         """
         Merge-safe list cache.
         """
-        try:
-            if not cls._ping():
-                return False
-
-            incoming_ids: List[str] = []
+        incoming_ids: List[str] = []
+        for q in questions:
+            cls.cache_question(survey_id, q)
+            qid = cls._qid(q)
+            if qid:
+                incoming_ids.append(qid)
 
-            for q in questions:
-                cls.cache_question(survey_id, q)
-                qid = getattr(q, "question_id", None) or q.get("question_id")
-                if qid:
-                    incoming_ids.append(qid)
-
-            current_ids = set(cls._get_ids(survey_id))
-            merged_ids = sorted(current_ids.union(incoming_ids))
-
-            cls._set_ids(survey_id, merged_ids)
-            return True
-        except Exception as e:
-            print(f"[RedisQuestionService] cache_questions_list failed: {e}")
-            return False
+        merged_ids = sorted(set(cls._get_ids(survey_id)).union(incoming_ids))
+        return cls.QUESTIONS_BY_SURVEY.set(survey_id, value=merged_ids)
 
     @classmethod
     def remove_from_list(cls, survey_id: str, question_id: Optional[str] = None) -> None:
@@ -192,26 +95,19 @@ class RedisQuestionService:
         - If question_id provided → remove only that
         - If None → remove entire survey list
         """
-        try:
-            if not cls._ping():
-                return
-
-            if not question_id:
-                redis_client.client.delete(cls._list_key(survey_id))
-                return
-
-            ids = cls._get_ids(survey_id)
-            if not ids:
-                return
+        if not question_id:
+            cls.QUESTIONS_BY_SURVEY.delete(survey_id)
+            return
 
-            filtered = [i for i in ids if i != question_id]
+        ids = cls._get_ids(survey_id)
+        if not ids:
+            return
 
-            if filtered:
-                cls._set_ids(survey_id, filtered)
-            else:
-                redis_client.client.delete(cls._list_key(survey_id))
-        except Exception as e:
-            print(f"[RedisQuestionService] remove_from_list failed: {e}")
+        filtered = [i for i in ids if i != question_id]
+        if filtered:
+            cls._set_ids(survey_id, filtered)
+        else:
+            cls.QUESTIONS_BY_SURVEY.delete(survey_id)
 
     # ============================================================
     # READ FULL SURVEY QUESTIONS
@@ -221,22 +117,32 @@ class RedisQuestionService:
     def get_questions_for_survey(
         cls, survey_id: str
     ) -> Optional[List[Dict[str, Any]]]:
-        try:
-            if not cls._ping():
-                return None
-
-            ids = cls._get_ids(survey_id)
-            if not ids:
-                return None
-
-            result: List[Dict[str, Any]] = []
+        ids = cls.QUESTIONS_BY_SURVEY.get(survey_id)
+        if not ids:
+            return None
 
-            for qid in ids:
-                q = cls.get_question(survey_id, qid)
-                if q:
-                    result.append(q)
+        result = [q for q in cls.QUESTION.get_many([(survey_id, qid) for qid in ids]) if q]
+        return result or None
 
-            return result or None
-        except Exception as e:
-            print(f"[RedisQuestionService] get_questions_for_survey failed: {e}")
-            return None
+    @classmethod
+    def load_questions_for_survey(
+        cls, survey_id: str, loader: Callable[[], List[Any]]
+    ) -> List[Any]:
+        """
+        Cached questions, else loader() (cached for the next reader). A live
+        survey's concurrent misses share one loader call.
+        """
+        cached = cls.get_questions_for_survey(survey_id)
+        if cached:
+            return cached
+
+        def load():
+            questions = loader()
+            if questions:
+                cls.cache_questions_list(survey_id, questions)
+            return questions
+
+        return cache.coalesce(
+            cls.QUESTIONS_BY_SURVEY.key(survey_id), load,
+            lookup=lambda: cls.get_questions_for_survey(survey_id),
+        )
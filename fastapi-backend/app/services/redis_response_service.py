@@ -1,31 +1,87 @@
-import json
 from typing import Any, Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from ..core.redis_client import redis_client
+from ..core import json_codec
+from ..core.response_cache import response_cache
+
+# ZADD only into an index that was fully built from the database; appending
+# to a missing index would create a partial one that reads as complete
+_INDEX_ADD_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
 
 class RedisResponseService:
+    """
+    Cache layer for survey responses. Keeps:
+      - single response blob by id
+      - per-survey response index: a sorted set of response_ids scored by
+        started_at, built once from the database and then patched in
+        place on create/update/delete, so a submission costs O(log N)
+        instead of re-listing and re-caching the whole survey
+      - response counts
+      - idempotency keys: hashed client key -> response_id, so a retried
+        submission is answered from cache before any database work
+
+    A submission that commits while the index is being rebuilt may be
+    missing from it until RESP_LIST_TTL expires.
+    """
+
     RESP_TTL = 900
     RESP_LIST_TTL = 300
     COUNT_TTL = 120
+    IDEMPOTENCY_TTL = 86400
 
     RESP_KEY = "response:{response_id}"
-    SURVEY_LIST_KEY = "responses:survey:{survey_id}"
+    SURVEY_INDEX_KEY = "responses:index:{survey_id}"
     COUNT_KEY = "responses:count:{survey_id}"
+    IDEMPOTENCY_KEY = "responses:idem:{survey_id}:{key}"
+
+    _index_add = None
 
     @classmethod
     def _ser(cls, obj: Any) -> str:
-        return json.dumps(obj, default=str)
+        return json_codec.dumps(obj)
 
 
     @classmethod
     def _deser(cls, s: str) -> Dict[str, Any]:
-        return json.loads(s)
+        return json_codec.loads(s)
+
+    @staticmethod
+    def _rid(resp: Any) -> Optional[str]:
+        return getattr(resp, "response_id", None) or (isinstance(resp, dict) and resp.get("response_id")) or None
+
+    @staticmethod
+    def _score(resp: Any) -> float:
+        """started_at as a UTC epoch (naive timestamps are UTC)"""
+        started = getattr(resp, "started_at", None) or (isinstance(resp, dict) and resp.get("started_at"))
+        if isinstance(started, str):
+            try:
+                started = datetime.fromisoformat(started.replace("Z", "+00:00"))
+            except ValueError:
+                started = None
+        if not isinstance(started, datetime):
+            return 0.0
+        if started.tzinfo is None:
+            started = started.replace(tzinfo=timezone.utc)
+        return started.timestamp()
+
+    @classmethod
+    def _index_add_script(cls):
+        if cls._index_add is None:
+            cls._index_add = redis_client.client.register_script(_INDEX_ADD_LUA)
+        return cls._index_add
 
     @classmethod
     def cache_response(cls, resp: Any) -> bool:
         try:
-            if not redis_client.ping(): return False
-            rid = getattr(resp, "response_id", None) or resp.get("response_id")
+            if not redis_client.available(): return False
+            rid = cls._rid(resp)
             key = cls.RESP_KEY.format(response_id=rid)
             redis_client.client.setex(key, cls.RESP_TTL, cls._ser(resp))
             return True
@@ -35,67 +91,146 @@ class RedisResponseService:
     @classmethod
     def get_response(cls, response_id: str) -> Optional[Dict[str, Any]]:
         try:
-            if not redis_client.ping(): return None
+            if not redis_client.available(): return None
             key = cls.RESP_KEY.format(response_id=response_id)
             blob = redis_client.client.get(key)
             return cls._deser(blob) if blob else None
         except Exception:
             return None
 
+    # ---------------------------- response index ---------------------------
+
     @classmethod
     def cache_list(cls, survey_id: str, responses: List[Any]) -> bool:
+        """(Re)build the survey's response index from a full database listing"""
         try:
-            if not redis_client.ping(): return False
-            for r in responses: cls.cache_response(r)
-            ids = [getattr(r, "response_id", None) or (isinstance(r, dict) and r.get("response_id")) for r in responses]
-            key = cls.SURVEY_LIST_KEY.format(survey_id=survey_id)
-            redis_client.client.setex(key, cls.RESP_LIST_TTL, json.dumps(ids))
+            if not redis_client.available(): return False
+            key = cls.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+            scores: Dict[str, float] = {}
+            pipe = redis_client.client.pipeline()
+            pipe.delete(key)
+            for r in responses:
+                rid = cls._rid(r)
+                if not rid:
+                    continue
+                pipe.setex(cls.RESP_KEY.format(response_id=rid), cls.RESP_TTL, cls._ser(r))
+                scores[rid] = cls._score(r)
+            if scores:
+                # expires before any of its blobs (RESP_TTL > RESP_LIST_TTL)
+                pipe.zadd(key, scores)
+                pipe.expire(key, cls.RESP_LIST_TTL)
+            pipe.delete(*response_cache.keys(key))
+            pipe.execute()
             return True
         except Exception:
             return False
 
     @classmethod
     def get_list(cls, survey_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Responses newest first, or None when the index is missing or incomplete"""
         try:
-            if not redis_client.ping(): return None
-            key = cls.SURVEY_LIST_KEY.format(survey_id=survey_id)
-            blob = redis_client.client.get(key)
-            if not blob: return None
-            ids = json.loads(blob)
-            out = []
-            for rid in ids:
-                r = cls.get_response(rid)
-                if r: out.append(r)
-            return out or None
+            if not redis_client.available(): return None
+            key = cls.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+            ids = redis_client.client.zrevrange(key, 0, -1)
+            if not ids: return None
+            blobs = redis_client.get_many(
+                [cls.RESP_KEY.format(response_id=rid.decode()) for rid in ids], cls._deser
+            )
+            if any(blob is None for blob in blobs):
+                return None  # a blob was evicted or deleted: rebuild from the DB
+            return blobs
         except Exception:
             return None
 
+    @classmethod
+    def index_response(cls, survey_id: str, resp: Any) -> bool:
+        """
+        Cache a created or updated response and patch it into the survey
+        index (when one is built). Constant work per call regardless of
+        how many responses the survey has.
+        """
+        try:
+            if not redis_client.available(): return False
+            rid = cls._rid(resp)
+            key = cls.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+            pipe = redis_client.client.pipeline()
+            pipe.setex(cls.RESP_KEY.format(response_id=rid), cls.RESP_TTL, cls._ser(resp))
+            cls._index_add_script()(keys=[key], args=[cls._score(resp), rid], client=pipe)
+            pipe.delete(cls.COUNT_KEY.format(survey_id=survey_id))
+            pipe.delete(*response_cache.keys(key))
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def unindex_response(cls, survey_id: str, response_id: str) -> None:
+        """Drop a deleted response from its blob, the survey index and counts"""
+        try:
+            if not redis_client.available(): return
+            key = cls.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+            pipe = redis_client.client.pipeline()
+            pipe.zrem(key, response_id)
+            pipe.delete(cls.RESP_KEY.format(response_id=response_id))
+            pipe.delete(cls.COUNT_KEY.format(survey_id=survey_id))
+            pipe.delete(*response_cache.keys(key))
+            pipe.execute()
+        except Exception:
+            pass
+
+    # -------------------------------- counts -------------------------------
+
     @classmethod
     def cache_count(cls, survey_id: str, count: int) -> None:
         try:
-            if not redis_client.ping(): return
+            if not redis_client.available(): return
             key = cls.COUNT_KEY.format(survey_id=survey_id)
-            redis_client.client.setex(key, cls.COUNT_TTL, json.dumps({"count": count}))
+            redis_client.client.setex(key, cls.COUNT_TTL, json_codec.dumps({"count": count}))
         except Exception:
             pass
 
     @classmethod
     def get_count(cls, survey_id: str) -> Optional[int]:
         try:
-            if not redis_client.ping(): return None
+            if not redis_client.available(): return None
+            # a built index is never empty and always current
+            indexed = redis_client.client.zcard(cls.SURVEY_INDEX_KEY.format(survey_id=survey_id))
+            if indexed:
+                return indexed
             key = cls.COUNT_KEY.format(survey_id=survey_id)
             blob = redis_client.client.get(key)
-            return (json.loads(blob).get("count") if blob else None)
+            return (json_codec.loads(blob).get("count") if blob else None)
         except Exception:
             return None
 
     @classmethod
     def invalidate(cls, response_id: str, survey_id: Optional[str] = None) -> None:
         try:
-            if not redis_client.ping(): return
+            if not redis_client.available(): return
             redis_client.client.delete(cls.RESP_KEY.format(response_id=response_id))
             if survey_id:
-                redis_client.client.delete(cls.SURVEY_LIST_KEY.format(survey_id=survey_id))
+                index_key = cls.SURVEY_INDEX_KEY.format(survey_id=survey_id)
+                redis_client.client.delete(index_key, *response_cache.keys(index_key))
                 redis_client.client.delete(cls.COUNT_KEY.format(survey_id=survey_id))
         except Exception:
             pass
+
+    # ---------------------------- idempotency ---------------------------
+
+    @classmethod
+    def claim_idempotent(cls, survey_id: str, key: str, response_id: str) -> Optional[str]:
+        """
+        Claim an idempotency key for response_id (SET NX, one round trip).
+        Returns the response_id of an earlier submission under the same
+        key, or None when this one is first or Redis is unavailable.
+        """
+        try:
+            if not redis_client.available(): return None
+            redis_key = cls.IDEMPOTENCY_KEY.format(survey_id=survey_id, key=key)
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.set(redis_key, response_id, ex=cls.IDEMPOTENCY_TTL, nx=True)
+            pipe.get(redis_key)
+            claimed, owner = pipe.execute()
+            return None if claimed or not owner else owner.decode()
+        except Exception:
+            return None
@@ -0,0 +1,147 @@
+import time
+from typing import Any, Dict, Optional
+from ..core import json_codec
+from ..core.redis_client import redis_client
+
+# Apply increments only to a hash that was fully loaded from the rollup
+# table; incrementing a missing hash would create a partial one
+_HINCR_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBYFLOAT', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+
+class RedisResultsService:
+    """
+    Hot copy of a survey's result aggregates: one hash per survey whose
+    fields are "<question_id>|<counter>" mirroring SurveyResultRollup rows.
+    Loaded from Postgres on a miss and patched in place after every
+    committed response change, so reads are one HGETALL.
+
+    Also keeps a per-survey data revision, bumped on every response write,
+    that keys derived results such as cross-tabs. A missing revision is
+    re-seeded from the clock, so it never goes back to a value that old
+    cache entries were stored under.
+    """
+
+    RESULTS_TTL = 600
+    CROSSTAB_TTL = 600
+    RESULTS_KEY = "results:{survey_id}"
+    REVISION_KEY = "results:{survey_id}:rev"
+    CROSSTAB_KEY = "results:{survey_id}:crosstab:{version}:{revision}:{params}"
+    SEPARATOR = "|"
+
+    _hincr = None
+
+    @classmethod
+    def _hincr_script(cls):
+        if cls._hincr is None:
+            cls._hincr = redis_client.client.register_script(_HINCR_IF_EXISTS_LUA)
+        return cls._hincr
+
+    @classmethod
+    def field(cls, question_id: str, counter: str) -> str:
+        return f"{question_id}{cls.SEPARATOR}{counter}"
+
+    @classmethod
+    def get(cls, survey_id: str) -> Optional[Dict[str, float]]:
+        """{"<question_id>|<counter>": value}, or None when not cached"""
+        try:
+            if not redis_client.available(): return None
+            raw = redis_client.client.hgetall(cls.RESULTS_KEY.format(survey_id=survey_id))
+            if not raw: return None
+            return {k.decode(): float(v) for k, v in raw.items()}
+        except Exception:
+            return None
+
+    @classmethod
+    def load(cls, survey_id: str, values: Dict[str, float]) -> bool:
+        """Replace the cached hash with a full copy of the rollup"""
+        try:
+            if not redis_client.available(): return False
+            key = cls.RESULTS_KEY.format(survey_id=survey_id)
+            pipe = redis_client.client.pipeline()
+            pipe.delete(key)
+            if values:
+                pipe.hset(key, mapping=values)
+                pipe.expire(key, cls.RESULTS_TTL)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def apply(cls, survey_id: str, delta: Dict[str, float]) -> bool:
+        """HINCRBYFLOAT every field of delta, only if the hash is loaded"""
+        if not delta:
+            return True
+        try:
+            if not redis_client.available(): return False
+            args = []
+            for field, value in delta.items():
+                args.extend((field, repr(float(value))))
+            return bool(cls._hincr_script()(keys=[cls.RESULTS_KEY.format(survey_id=survey_id)], args=args))
+        except Exception:
+            return False
+
+    @classmethod
+    def invalidate(cls, survey_id: str) -> None:
+        try:
+            if not redis_client.available(): return
+            redis_client.client.delete(cls.RESULTS_KEY.format(survey_id=survey_id))
+        except Exception:
+            pass
+
+    # ------------------------------ revision -----------------------------
+
+    @classmethod
+    def bump_revision(cls, survey_id: str) -> None:
+        try:
+            if not redis_client.available(): return
+            key = cls.REVISION_KEY.format(survey_id=survey_id)
+            pipe = redis_client.client.pipeline()
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.incr(key)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @classmethod
+    def revision(cls, survey_id: str) -> Optional[int]:
+        try:
+            if not redis_client.available(): return None
+            key = cls.REVISION_KEY.format(survey_id=survey_id)
+            pipe = redis_client.client.pipeline()
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.get(key)
+            return int(pipe.execute()[1])
+        except Exception:
+            return None
+
+    # ------------------------------ cross-tabs ---------------------------
+
+    @classmethod
+    def get_crosstab(cls, survey_id: str, version: Any, revision: int, params: str) -> Optional[Dict[str, Any]]:
+        try:
+            if not redis_client.available(): return None
+            blob = redis_client.client.get(cls.CROSSTAB_KEY.format(
+                survey_id=survey_id, version=version, revision=revision, params=params))
+            return json_codec.loads(blob) if blob else None
+        except Exception:
+            return None
+
+    @classmethod
+    def cache_crosstab(cls, survey_id: str, version: Any, revision: int, params: str, result: Dict[str, Any]) -> None:
+        try:
+            if not redis_client.available(): return
+            redis_client.client.setex(
+                cls.CROSSTAB_KEY.format(survey_id=survey_id, version=version, revision=revision, params=params),
+                cls.CROSSTAB_TTL, json_codec.dumps(result),
+            )
+        except Exception:
+            pass
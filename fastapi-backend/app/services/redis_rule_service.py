@@ -1,112 +1,54 @@
-import json
 from typing import Any, Dict, List, Optional
-from datetime import datetime
 
-from ..core.redis_client import redis_client
+from ..core.cache import cache
 
 class RedisRuleService:
     RULE_TTL = 3600
     RULE_LIST_TTL = 600
 
-    RULE_KEY = "rule:{survey_id}:{rule_id}"
-    SURVEY_RULES_KEY = "rules:survey:{survey_id}"
+    RULE = cache.namespace("rule:{survey_id}:{rule_id}", ttl=RULE_TTL, local_ttl=30, tags=("survey:{survey_id}",))
+    SURVEY_RULES = cache.namespace("rules:survey:{survey_id}", ttl=RULE_LIST_TTL, local_ttl=10,
+                                   tags=("survey:{survey_id}",))
 
-    @classmethod
-    def _ser(cls, obj: Any) -> str:
-        def default(o):
-            if isinstance(o, datetime):
-                return o.isoformat()
-            if hasattr(o, "__dict__"):
-                d = {k: v for k, v in o.__dict__.items() if not k.startswith("_")}
-                for k, v in d.items():
-                    if isinstance(v, datetime):
-                        d[k] = v.isoformat()
-                return json.dumps(d, default=default)
-            return json.dumps(o, default=default)
-        if hasattr(obj, "model_dump"):
-            return json.dumps(obj.model_dump(), default=default)
-        return default(obj)
+    RULE_KEY = RULE.template
+    SURVEY_RULES_KEY = SURVEY_RULES.template
 
-    @classmethod
-    def _deser(cls, s: str) -> Dict[str, Any]:
-        return json.loads(s)
+    @staticmethod
+    def _rid(rule: Any) -> Optional[str]:
+        return getattr(rule, "rule_id", None) or (isinstance(rule, dict) and rule.get("rule_id")) or None
 
     @classmethod
     def cache_rule(cls, survey_id: str, rule: Any) -> bool:
-        try:
-            if not redis_client.ping(): return False
-            rid = getattr(rule, "rule_id", None) or rule.get("rule_id")
-            key = cls.RULE_KEY.format(survey_id=survey_id, rule_id=rid)
-            redis_client.client.setex(key, cls.RULE_TTL, cls._ser(rule))
-            return True
-        except Exception:
-            return False
+        return cls.RULE.set(survey_id, cls._rid(rule), value=rule)
 
     @classmethod
     def get_rule(cls, survey_id: str, rule_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            if not redis_client.ping(): return None
-            key = cls.RULE_KEY.format(survey_id=survey_id, rule_id=rule_id)
-            blob = redis_client.client.get(key)
-            return cls._deser(blob) if blob else None
-        except Exception:
-            return None
+        return cls.RULE.get(survey_id, rule_id)
 
     @classmethod
     def cache_rules_list(cls, survey_id: str, rules: List[Any]) -> bool:
-        try:
-            if not redis_client.ping(): return False
-            # cache items
-            for r in rules:
-                cls.cache_rule(survey_id, r)
-            # store id list
-            ids = [
-                getattr(r, "rule_id", None) or (isinstance(r, dict) and r.get("rule_id"))
-                for r in rules
-            ]
-            key = cls.SURVEY_RULES_KEY.format(survey_id=survey_id)
-            redis_client.client.setex(key, cls.RULE_LIST_TTL, json.dumps(ids))
-            return True
-        except Exception:
-            return False
+        # cache items, then the id list
+        for r in rules:
+            cls.cache_rule(survey_id, r)
+        return cls.SURVEY_RULES.set(survey_id, value=[cls._rid(r) for r in rules])
 
     @classmethod
     def get_rules_for_survey(cls, survey_id: str) -> Optional[List[Dict[str, Any]]]:
-        try:
-            if not redis_client.ping(): return None
-            key = cls.SURVEY_RULES_KEY.format(survey_id=survey_id)
-            ids_blob = redis_client.client.get(key)
-            if not ids_blob: return None
-            ids = json.loads(ids_blob)
-            out = []
-            for rid in ids:
-                r = cls.get_rule(survey_id, rid)
-                if r: out.append(r)
-            return out or None
-        except Exception:
-            return None
+        ids = cls.SURVEY_RULES.get(survey_id)
+        if not ids: return None
+        out = [r for r in cls.RULE.get_many([(survey_id, rid) for rid in ids]) if r]
+        return out or None
 
     @classmethod
     def invalidate_rule(cls, survey_id: str, rule_id: str) -> None:
-        try:
-            if not redis_client.ping(): return
-            key = cls.RULE_KEY.format(survey_id=survey_id, rule_id=rule_id)
-            redis_client.client.delete(key)
-        except Exception:
-            pass
+        cls.RULE.delete(survey_id, rule_id)
 
     @classmethod
     def remove_from_list(cls, survey_id: str, rule_id: str) -> None:
-        try:
-            if not redis_client.ping(): return
-            key = cls.SURVEY_RULES_KEY.format(survey_id=survey_id)
-            blob = redis_client.client.get(key)
-            if not blob: return
-            ids = json.loads(blob)
-            ids = [i for i in ids if i != rule_id]
-            if ids:
-                redis_client.client.setex(key, cls.RULE_LIST_TTL, json.dumps(ids))
-            else:
-                redis_client.client.delete(key)
-        except Exception:
-            pass
+        ids = cls.SURVEY_RULES.get(survey_id, fresh=True)
+        if not ids: return
+        ids = [i for i in ids if i != rule_id]
+        if ids:
+            cls.SURVEY_RULES.set(survey_id, value=ids)
+        else:
+            cls.SURVEY_RULES.delete(survey_id)
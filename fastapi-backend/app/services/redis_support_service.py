@@ -1,16 +1,16 @@
 # app/services/redis_support_service.py - Complete implementation with calendar support
 
-import json
 from typing import Any, List, Optional, Dict
 from ..core.redis_client import redis_client
+from ..core import json_codec
 
 def _ser(obj: Any) -> str:
     """Serialize object to JSON string"""
-    return json.dumps(obj, default=str)
+    return json_codec.dumps(obj)
 
 def _deser(blob: str) -> Any:
     """Deserialize JSON string to object"""
-    return json.loads(blob)
+    return json_codec.loads(blob)
 
 class RedisSupportService:
     # TTLs in seconds
@@ -39,7 +39,7 @@ class RedisSupportService:
     def _set(cls, key: str, obj: Any, ttl: int = None) -> None:
         """Set a value in Redis with optional TTL"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             blob = _ser(obj)
             if ttl:
@@ -53,7 +53,7 @@ class RedisSupportService:
     def _get(cls, key: str) -> Optional[Any]:
         """Get a value from Redis"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             blob = redis_client.client.get(key)
             if not blob:
@@ -69,7 +69,7 @@ class RedisSupportService:
     def _delete(cls, *keys: str) -> None:
         """Delete one or more keys from Redis"""
         try:
-            if not redis_client.ping() or not keys:
+            if not redis_client.available() or not keys:
                 return
             redis_client.client.delete(*keys)
         except Exception as e:
@@ -278,22 +278,17 @@ class RedisSupportService:
     def invalidate_all_support_caches(cls, org_id: str) -> None:
         """Nuclear option: invalidate all support-related caches for an organization"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             
-            # Get all keys matching support patterns for this org
-            patterns = [
-                f"support:groups:org:{org_id}",
-                f"support:teams:org:{org_id}",
-                f"support:teams:org:{org_id}:*",
-                f"support:routing:org:{org_id}",
-            ]
-            
-            for pattern in patterns:
-                keys = redis_client.client.keys(pattern)
-                if keys:
-                    redis_client.client.delete(*keys)
-                    
+            # Exact keys: "support:teams:org:<org_id>:*" only ever matched
+            # the org's with-calendar teams list
+            redis_client.client.unlink(
+                cls.GROUPS_BY_ORG_KEY.format(org_id=org_id),
+                cls.TEAMS_BY_ORG_KEY.format(org_id=org_id),
+                cls.TEAMS_WITH_CALENDAR_KEY.format(key=f"org:{org_id}"),
+                cls.POLICIES_BY_ORG_KEY.format(org_id=org_id),
+            )
         except Exception as e:
             print(f"Error invalidating all support caches for org {org_id}: {e}")
 
@@ -302,7 +297,7 @@ class RedisSupportService:
     def get_cache_stats(cls) -> Dict[str, Any]:
         """Get Redis cache statistics"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return {"status": "unavailable"}
             
             info = redis_client.client.info()
@@ -340,17 +335,17 @@ class RedisSupportService:
     def clear_expired_keys(cls) -> int:
         """Manually clear expired keys (useful for testing)"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return 0
             
             # This is a simple implementation - in production you might want more sophisticated cleanup
-            support_keys = redis_client.client.keys("support:*")
             expired_count = 0
             
-            for key in support_keys:
-                ttl = redis_client.client.ttl(key)
-                if ttl == -2:  # Key doesn't exist
-                    expired_count += 1
+            for keys in redis_client.scan_batches("support:*"):
+                pipe = redis_client.client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.ttl(key)
+                expired_count += sum(1 for ttl in pipe.execute() if ttl == -2)  # Key doesn't exist
                     
             return expired_count
             
@@ -1,250 +1,132 @@
 # app/services/redis_survey_service.py
-import json
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from ..core.redis_client import redis_client
+from ..core.cache import cache
+from ..core import json_codec
+
+
+def _deserialize(s: bytes) -> Dict[str, Any]:
+    data = json_codec.loads(s)
+    for k in ("created_at", "updated_at"):
+        if k in data and data[k]:
+            try:
+                data[k] = datetime.fromisoformat(str(data[k]).replace("Z", "+00:00"))
+            except Exception:
+                pass
+    return data
+
 
 class RedisSurveyService:
     SURVEY_TTL = 3600           # 1 hour
     SURVEY_LIST_TTL = 1800      # 30 min
     RESPONSES_TTL = 600         # 10 min (counts)
-    
-    SURVEY_KEY = "survey:{survey_id}"
-    PROJECT_SURVEYS_KEY = "surveys:project:{project_id}"
-    RESPONSES_COUNT_KEY = "survey:{survey_id}:responses_count"
-    RESPONSES_LIST_KEY = "survey:{survey_id}:responses"
 
-    @classmethod
-    def _serialize(cls, obj: Any) -> str:
-      def default(o):
-          if isinstance(o, datetime):
-              return o.isoformat()
-          raise TypeError(f"Not JSON serializable: {type(o)}")
-      if hasattr(obj, "model_dump"):
-          return json.dumps(obj.model_dump(), default=default)
-      if hasattr(obj, "__dict__"):
-          data = {k:v for k,v in obj.__dict__.items() if not k.startswith("_")}
-          for k,v in data.items():
-              if isinstance(v, datetime):
-                  data[k] = v.isoformat()
-          return json.dumps(data, default=default)
-      return json.dumps(obj, default=default)
+    # Every survey-scoped key (survey, counters, questions, rules) carries
+    # this tag, so purge_survey() drops them all without a keyspace walk
+    SURVEY_TAG = "survey:{survey_id}"
 
-    @classmethod
-    def _deserialize(cls, s: str) -> Dict[str, Any]:
-      data = json.loads(s)
-      for k in ("created_at", "updated_at"):
-          if k in data and data[k]:
-              try:
-                  data[k] = datetime.fromisoformat(str(data[k]).replace("Z","+00:00"))
-              except Exception:
-                  pass
-      return data
-# app/services/redis_survey_service.py
+    SURVEY = cache.namespace("survey:{survey_id}", ttl=SURVEY_TTL, local_ttl=30, deserialize=_deserialize,
+                             tags=(SURVEY_TAG,))
+    PROJECT_SURVEYS = cache.namespace("surveys:project:{project_id}", ttl=SURVEY_LIST_TTL, local_ttl=10)
+    RESPONSES_COUNT = cache.namespace("survey:{survey_id}:responses_count", ttl=RESPONSES_TTL, tags=(SURVEY_TAG,))
+    RESPONSES_LIST = cache.namespace("survey:{survey_id}:responses", ttl=RESPONSES_TTL, tags=(SURVEY_TAG,))
+
+    SURVEY_KEY = SURVEY.template
+    PROJECT_SURVEYS_KEY = PROJECT_SURVEYS.template
+    RESPONSES_COUNT_KEY = RESPONSES_COUNT.template
+    RESPONSES_LIST_KEY = RESPONSES_LIST.template
+
+    @staticmethod
+    def _sid(survey: Any) -> Optional[str]:
+        return getattr(survey, "survey_id", None) or (isinstance(survey, dict) and survey.get("survey_id")) or None
 
     @classmethod
     def set_project_surveys_exact(cls, project_id: str, surveys: List[Any]) -> bool:
         """Replace the entire project list with exactly these surveys (no merge)."""
-        try:
-            if not redis_client.ping():
-                return False
-            # cache individuals
-            ids: list[str] = []
-            for s in surveys:
-                cls.cache_survey(s)
-                sid = getattr(s, "survey_id", None) or (isinstance(s, dict) and s.get("survey_id"))
-                if sid:
-                    ids.append(sid)
-            list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-            redis_client.client.setex(list_key, cls.SURVEY_LIST_TTL, json.dumps(ids))
-            return True
-        except Exception as e:
-            print(f"[RedisSurveyService] set_project_surveys_exact failed: {e}")
-            return False
+        ids = []
+        for s in surveys:
+            cls.cache_survey(s)
+            sid = cls._sid(s)
+            if sid:
+                ids.append(sid)
+        return cls.PROJECT_SURVEYS.set(project_id, value=ids)
 
     @classmethod
     def cache_survey(cls, survey: Any) -> bool:
-      try:
-          if not redis_client.ping():
-              return False
-          sid = getattr(survey, "survey_id", None) or survey.get("survey_id")
-          key = cls.SURVEY_KEY.format(survey_id=sid)
-          redis_client.client.setex(key, cls.SURVEY_TTL, cls._serialize(survey))
-          return True
-      except Exception as e:
-          print(f"[RedisSurveyService] cache_survey failed: {e}")
-          return False
+        return cls.SURVEY.set(cls._sid(survey), value=survey)
 
     @classmethod
     def get_survey(cls, survey_id: str) -> Optional[Dict[str, Any]]:
-      try:
-          if not redis_client.ping():
-              return None
-          key = cls.SURVEY_KEY.format(survey_id=survey_id)
-          val = redis_client.client.get(key)
-          return cls._deserialize(val) if val else None
-      except Exception as e:
-          print(f"[RedisSurveyService] get_survey failed: {e}")
-          return None
-
+        return cls.SURVEY.get(survey_id)
 
     @classmethod
     def cache_project_surveys(cls, project_id: str, surveys: List[Any]) -> bool:
         """Cache a list of surveys for a project (MERGE with existing)."""
-        try:
-            if not redis_client.ping():
-                return False
-
-            # Cache individuals
-            for s in surveys:
-                cls.cache_survey(s)
-
-            # Merge IDs
-            incoming_ids = []
-            for s in surveys:
-                incoming_ids.append(getattr(s, 'survey_id', None) or s.get('survey_id'))
-
-            current_ids = cls._get_project_ids(project_id)
-            id_set = {sid for sid in current_ids if sid} | {sid for sid in incoming_ids if sid}
-            cls._set_project_ids(project_id, sorted(id_set))  # sort optional
-
-            return True
-        except Exception as e:
-            print(f"[RedisSurveyService] cache_project_surveys failed: {e}")
-            return False
+        for s in surveys:
+            cls.cache_survey(s)
+        current_ids = cls._get_project_ids(project_id)
+        id_set = {sid for sid in current_ids if sid} | {cls._sid(s) for s in surveys if cls._sid(s)}
+        return cls.PROJECT_SURVEYS.set(project_id, value=sorted(id_set))
+
     @classmethod
     def remove_from_project_list(cls, project_id: str, survey_id: str) -> None:
-        try:
-            ids = cls._get_project_ids(project_id)
-            if not ids:
-                return
-            new_ids = [sid for sid in ids if sid != survey_id]
-            if new_ids:
-                cls._set_project_ids(project_id, new_ids)
-            else:
-                # delete the list key entirely when empty
-                if redis_client.ping():
-                    list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-                    redis_client.client.delete(list_key)
-        except Exception as e:
-            print(f"[RedisSurveyService] remove_from_project_list failed: {e}")
+        ids = cls._get_project_ids(project_id)
+        if not ids:
+            return
+        new_ids = [sid for sid in ids if sid != survey_id]
+        if new_ids:
+            cls.PROJECT_SURVEYS.set(project_id, value=new_ids)
+        else:
+            # delete the list key entirely when empty
+            cls.PROJECT_SURVEYS.delete(project_id)
+
     @classmethod
     def invalidate_survey(cls, survey_id: str) -> bool:
-        try:
-            if not redis_client.ping():
-                return False
-            key = cls.SURVEY_KEY.format(survey_id=survey_id)
-            # remove survey object + counters
-            redis_client.client.delete(key)
-            redis_client.client.delete(cls.RESPONSES_COUNT_KEY.format(survey_id=survey_id))
-            redis_client.client.delete(cls.RESPONSES_LIST_KEY.format(survey_id=survey_id))
-            return True
-        except Exception as e:
-            print(f"[RedisSurveyService] invalidate_survey failed: {e}")
-            return False
+        # survey object + counters
+        cache.delete_keys(cls.SURVEY.key(survey_id), cls.RESPONSES_COUNT.key(survey_id),
+                          cls.RESPONSES_LIST.key(survey_id))
+        return True
 
-# app/services/redis_survey_service.py
+    @classmethod
+    def purge_survey(cls, survey_id: str) -> int:
+        """Drop every cached key of a deleted survey"""
+        return cache.invalidate_tags(cls.SURVEY_TAG.format(survey_id=survey_id))
 
     @classmethod
     def invalidate_project_surveys(cls, project_id: str) -> None:
-        try:
-            if not redis_client.ping():
-                return
-            list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-            redis_client.client.delete(list_key)
-        except Exception as e:
-            print(f"[RedisSurveyService] invalidate_project_surveys failed: {e}")
-
+        cls.PROJECT_SURVEYS.delete(project_id)
 
     @classmethod
     def get_project_surveys(cls, project_id: str) -> Optional[List[Dict[str, Any]]]:
-      try:
-          if not redis_client.ping():
-              return None
-          list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-          ids_blob = redis_client.client.get(list_key)
-          if not ids_blob:
-              return None
-          ids = json.loads(ids_blob)
-          out = []
-          for sid in ids:
-              s = cls.get_survey(sid)
-              if s:
-                  out.append(s)
-          return out or None
-      except Exception as e:
-          print(f"[RedisSurveyService] get_project_surveys failed: {e}")
-          return None
+        ids = cls.PROJECT_SURVEYS.get(project_id)
+        if not ids:
+            return None
+        out = [s for s in cls.SURVEY.get_many([(sid,) for sid in ids]) if s]
+        return out or None
 
     # Responses (optional stubs; wire to real table if you have one)
     @classmethod
     def cache_responses_count(cls, survey_id: str, count: int) -> bool:
-      try:
-          if not redis_client.ping():
-              return False
-          key = cls.RESPONSES_COUNT_KEY.format(survey_id=survey_id)
-          redis_client.client.setex(key, cls.RESPONSES_TTL, json.dumps({"count": count}))
-          return True
-      except Exception as e:
-          print(f"[RedisSurveyService] cache_responses_count failed: {e}")
-          return False
+        return cls.RESPONSES_COUNT.set(survey_id, value={"count": count})
 
     @classmethod
     def get_responses_count(cls, survey_id: str) -> Optional[int]:
-      try:
-          if not redis_client.ping():
-              return None
-          key = cls.RESPONSES_COUNT_KEY.format(survey_id=survey_id)
-          blob = redis_client.client.get(key)
-          if not blob:
-              return None
-          return json.loads(blob).get("count", 0)
-      except Exception as e:
-          print(f"[RedisSurveyService] get_responses_count failed: {e}")
-          return None
+        blob = cls.RESPONSES_COUNT.get(survey_id)
+        return blob.get("count", 0) if blob else None
 
     @classmethod
     def cache_responses(cls, survey_id: str, responses: List[Dict[str, Any]]) -> bool:
-      try:
-          if not redis_client.ping():
-              return False
-          key = cls.RESPONSES_LIST_KEY.format(survey_id=survey_id)
-          redis_client.client.setex(key, cls.RESPONSES_TTL, json.dumps(responses))
-          return True
-      except Exception as e:
-          print(f"[RedisSurveyService] cache_responses failed: {e}")
-          return False
+        return cls.RESPONSES_LIST.set(survey_id, value=responses)
 
     @classmethod
     def get_responses(cls, survey_id: str) -> Optional[List[Dict[str, Any]]]:
-      try:
-          if not redis_client.ping():
-              return None
-          key = cls.RESPONSES_LIST_KEY.format(survey_id=survey_id)
-          blob = redis_client.client.get(key)
-          return json.loads(blob) if blob else None
-      except Exception as e:
-          print(f"[RedisSurveyService] get_responses failed: {e}")
-          return None
-# app/services/redis_survey_service.py
+        return cls.RESPONSES_LIST.get(survey_id)
 
     @classmethod
     def _get_project_ids(cls, project_id: str) -> list[str]:
-        if not redis_client.ping():
-            return []
-        list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-        blob = redis_client.client.get(list_key)
-        if not blob:
-            return []
-        try:
-            return json.loads(blob)
-        except Exception:
-            return []
+        return cls.PROJECT_SURVEYS.get(project_id, fresh=True) or []
 
     @classmethod
     def _set_project_ids(cls, project_id: str, ids: list[str]) -> None:
-        if not redis_client.ping():
-            return
-        list_key = cls.PROJECT_SURVEYS_KEY.format(project_id=project_id)
-        redis_client.client.setex(list_key, cls.SURVEY_LIST_TTL, json.dumps(ids))
+        cls.PROJECT_SURVEYS.set(project_id, value=ids)
@@ -1,99 +1,49 @@
-import json
-from typing import Any, Dict, List, Optional
-from ..core.redis_client import redis_client
-
-
-def _ser(obj: Any) -> str:
-    return json.dumps(obj, default=str)
-
-
-def _deser(blob: str) -> Any:
-    return json.loads(blob)
+from typing import Callable, Dict, List, Optional
+from ..core.cache import cache
 
 
 class RedisThemeService:
     # TTLs
     LIST_TTL = 300       # 5m list by org/active
+    LIST_STALE_TTL = 60  # then served stale for up to 1m while one caller reloads
     ITEM_TTL = 600       # 10m single theme
 
-    # Keys
-    THEME_KEY           = "theme:{theme_id}"
-    THEME_LIST_BY_ORG   = "theme:org:{org_id}:active:{active}"
-
-    @classmethod
-    def _ok(cls) -> bool:
-        try:
-            return bool(redis_client.ping())
-        except Exception:
-            return False
+    THEME = cache.namespace("theme:{theme_id}", ttl=ITEM_TTL, local_ttl=60)
+    THEME_LIST = cache.namespace("theme:org:{org_id}:active:{active}", ttl=LIST_TTL, local_ttl=30,
+                                 stale_ttl=LIST_STALE_TTL, tags=("theme:org:{org_id}",))
 
-    @classmethod
-    def _set(cls, key: str, obj: Any, ttl: int | None = None) -> None:
-        if not cls._ok(): 
-            return
-        blob = _ser(obj)
-        try:
-            if ttl:
-                redis_client.client.setex(key, ttl, blob)
-            else:
-                redis_client.client.set(key, blob)
-        except Exception as e:
-            print(f"[RedisThemeService] set error {key}: {e}")
-
-    @classmethod
-    def _get(cls, key: str) -> Optional[Any]:
-        if not cls._ok():
-            return None
-        try:
-            blob = redis_client.client.get(key)
-            if not blob:
-                return None
-            if isinstance(blob, bytes):
-                blob = blob.decode("utf-8")
-            return _deser(blob)
-        except Exception as e:
-            print(f"[RedisThemeService] get error {key}: {e}")
-            return None
-
-    @classmethod
-    def _del(cls, *keys: str) -> None:
-        if not cls._ok():
-            return
-        try:
-            redis_client.client.delete(*keys)
-        except Exception as e:
-            print(f"[RedisThemeService] delete error {keys}: {e}")
+    # Keys
+    THEME_KEY           = THEME.template
+    THEME_LIST_BY_ORG   = THEME_LIST.template
 
     # ---------- cache helpers ----------
     @classmethod
     def cache_theme(cls, theme_id: str, data: Dict) -> None:
-        cls._set(cls.THEME_KEY.format(theme_id=theme_id), data, cls.ITEM_TTL)
+        cls.THEME.set(theme_id, value=data)
 
     @classmethod
     def get_theme(cls, theme_id: str) -> Optional[Dict]:
-        return cls._get(cls.THEME_KEY.format(theme_id=theme_id))
+        return cls.THEME.get(theme_id)
 
     @classmethod
     def cache_list_by_org(cls, org_id: str, active: Optional[bool], rows: List[Dict]) -> None:
-        cls._set(
-            cls.THEME_LIST_BY_ORG.format(org_id=org_id, active=str(active)),
-            rows,
-            cls.LIST_TTL,
-        )
+        cls.THEME_LIST.set(org_id, str(active), value=rows)
 
     @classmethod
     def get_list_by_org(cls, org_id: str, active: Optional[bool]) -> Optional[List[Dict]]:
-        return cls._get(cls.THEME_LIST_BY_ORG.format(org_id=org_id, active=str(active)))
+        return cls.THEME_LIST.get(org_id, str(active))
+
+    @classmethod
+    def load_list_by_org(cls, org_id: str, active: Optional[bool], loader: Callable[[], List[Dict]]) -> List[Dict]:
+        """Cached list, else loader() once across concurrent misses"""
+        return cls.THEME_LIST.get_or_load(org_id, str(active), loader=loader)
 
     # ---------- invalidation ----------
     @classmethod
     def invalidate_theme(cls, theme_id: str, org_id: Optional[str] = None) -> None:
         # Delete single theme entry
-        cls._del(cls.THEME_KEY.format(theme_id=theme_id))
+        cls.THEME.delete(theme_id)
 
-        # If org provided → delete org list (for active True, False, None)
+        # If org provided → delete org lists (for active True, False, None)
         if org_id:
-            for active in ("True", "False", "None"):
-                cls._del(
-                    cls.THEME_LIST_BY_ORG.format(org_id=org_id, active=active)
-                )
+            cache.invalidate_tags(f"theme:org:{org_id}")
@@ -1,15 +1,17 @@
 # app/services/redis_ticket_service.py
-import json
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from ..core.redis_client import redis_client
+from ..core import json_codec
+from ..core.response_cache import response_cache
 
 
 class RedisTicketService:
     """
     Cache layer for tickets. Keeps:
       - single ticket by id
-      - simple org-level list (recent page you fetched)
+      - simple org-level list (recent page you fetched), plus its serialized
+        response body and ETag (see app.core.response_cache)
       - counts (overall + per-status)
       - team-based and agent-based lists (single team/agent per ticket)
     """
@@ -40,20 +42,7 @@ class RedisTicketService:
     @classmethod
     def _ser(cls, obj: Any) -> str:
         """Serialize SQLAlchemy/Pydantic/Datetime safely to JSON string."""
-        def default(o):
-            if isinstance(o, datetime):
-                return o.isoformat()
-            if hasattr(o, "model_dump"):
-                return o.model_dump()
-            if hasattr(o, "__dict__"):
-                # remove SQLAlchemy state if present
-                d = {k: v for k, v in o.__dict__.items() if not k.startswith("_")}
-                for k, v in list(d.items()):
-                    if isinstance(v, datetime):
-                        d[k] = v.isoformat()
-                return d
-            return o
-        return json.dumps(obj, default=default)
+        return json_codec.dumps(obj)
 
     @classmethod
     def _deser(cls, s: bytes | str) -> Dict[str, Any]:
@@ -61,14 +50,14 @@ class RedisTicketService:
             return {}
         if isinstance(s, bytes):
             s = s.decode("utf-8")
-        return json.loads(s)
+        return json_codec.loads(s)
 
     # ---------------------------- single ticket ----------------------------
 
     @classmethod
     def cache_ticket(cls, ticket: Any) -> bool:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             tid = getattr(ticket, "ticket_id", None) or (isinstance(ticket, dict) and ticket.get("ticket_id"))
             if not tid:
@@ -82,7 +71,7 @@ class RedisTicketService:
     @classmethod
     def get_ticket(cls, ticket_id: str) -> Optional[Dict[str, Any]]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.TICKET_KEY.format(ticket_id=ticket_id)
             blob = redis_client.client.get(key)
@@ -90,13 +79,19 @@ class RedisTicketService:
         except Exception:
             return None
 
+    @classmethod
+    def _get_tickets(cls, ids: List[str]) -> List[Dict[str, Any]]:
+        """Ticket blobs for ids in one batched read (missing ones skipped)"""
+        keys = [cls.TICKET_KEY.format(ticket_id=tid) for tid in ids]
+        return [t for t in redis_client.get_many(keys, cls._deser) if t]
+
     # ------------------------------ list cache -----------------------------
 
     @classmethod
     def cache_org_list(cls, org_id: str, tickets: List[Any]) -> bool:
         """Caches a simple org list by storing ticket_ids and each ticket blob."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             ids: List[str] = []
             for t in tickets:
@@ -105,7 +100,7 @@ class RedisTicketService:
                 if tid:
                     ids.append(tid)
             key = cls.ORG_LIST_KEY.format(org_id=org_id)
-            redis_client.client.setex(key, cls.LIST_TTL, json.dumps(ids))
+            redis_client.client.setex(key, cls.LIST_TTL, json_codec.dumps(ids))
             return True
         except Exception:
             return False
@@ -113,18 +108,14 @@ class RedisTicketService:
     @classmethod
     def get_org_list(cls, org_id: str) -> Optional[List[Dict[str, Any]]]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.ORG_LIST_KEY.format(org_id=org_id)
             blob = redis_client.client.get(key)
             if not blob:
                 return None
-            ids: List[str] = json.loads(blob)
-            out: List[Dict[str, Any]] = []
-            for tid in ids:
-                t = cls.get_ticket(tid)
-                if t:
-                    out.append(t)
+            ids: List[str] = json_codec.loads(blob)
+            out = cls._get_tickets(ids)
             return out or None
         except Exception:
             return None
@@ -135,7 +126,7 @@ class RedisTicketService:
     def cache_team_list(cls, org_id: str, team_id: str, tickets: List[Any]) -> bool:
         """Caches tickets for a specific team."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             ids: List[str] = []
             for t in tickets:
@@ -144,7 +135,7 @@ class RedisTicketService:
                 if tid:
                     ids.append(tid)
             key = cls.TEAM_LIST_KEY.format(org_id=org_id, team_id=team_id)
-            redis_client.client.setex(key, cls.LIST_TTL, json.dumps(ids))
+            redis_client.client.setex(key, cls.LIST_TTL, json_codec.dumps(ids))
             return True
         except Exception:
             return False
@@ -152,18 +143,14 @@ class RedisTicketService:
     @classmethod
     def get_team_list(cls, org_id: str, team_id: str) -> Optional[List[Dict[str, Any]]]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.TEAM_LIST_KEY.format(org_id=org_id, team_id=team_id)
             blob = redis_client.client.get(key)
             if not blob:
                 return None
-            ids: List[str] = json.loads(blob)
-            out: List[Dict[str, Any]] = []
-            for tid in ids:
-                t = cls.get_ticket(tid)
-                if t:
-                    out.append(t)
+            ids: List[str] = json_codec.loads(blob)
+            out = cls._get_tickets(ids)
             return out or None
         except Exception:
             return None
@@ -174,7 +161,7 @@ class RedisTicketService:
     def cache_agent_list(cls, org_id: str, agent_id: str, tickets: List[Any]) -> bool:
         """Caches tickets for a specific agent."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             ids: List[str] = []
             for t in tickets:
@@ -183,7 +170,7 @@ class RedisTicketService:
                 if tid:
                     ids.append(tid)
             key = cls.AGENT_LIST_KEY.format(org_id=org_id, agent_id=agent_id)
-            redis_client.client.setex(key, cls.LIST_TTL, json.dumps(ids))
+            redis_client.client.setex(key, cls.LIST_TTL, json_codec.dumps(ids))
             return True
         except Exception:
             return False
@@ -191,18 +178,14 @@ class RedisTicketService:
     @classmethod
     def get_agent_list(cls, org_id: str, agent_id: str) -> Optional[List[Dict[str, Any]]]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.AGENT_LIST_KEY.format(org_id=org_id, agent_id=agent_id)
             blob = redis_client.client.get(key)
             if not blob:
                 return None
-            ids: List[str] = json.loads(blob)
-            out: List[Dict[str, Any]] = []
-            for tid in ids:
-                t = cls.get_ticket(tid)
-                if t:
-                    out.append(t)
+            ids: List[str] = json_codec.loads(blob)
+            out = cls._get_tickets(ids)
             return out or None
         except Exception:
             return None
@@ -212,84 +195,84 @@ class RedisTicketService:
     @classmethod
     def cache_count_org(cls, org_id: str, count: int) -> None:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COUNT_ORG_KEY.format(org_id=org_id)
-            redis_client.client.setex(key, cls.COUNT_TTL, json.dumps({"count": count}))
+            redis_client.client.setex(key, cls.COUNT_TTL, json_codec.dumps({"count": count}))
         except Exception:
             pass
 
     @classmethod
     def get_count_org(cls, org_id: str) -> Optional[int]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.COUNT_ORG_KEY.format(org_id=org_id)
             blob = redis_client.client.get(key)
-            return (json.loads(blob).get("count") if blob else None)
+            return (json_codec.loads(blob).get("count") if blob else None)
         except Exception:
             return None
 
     @classmethod
     def cache_count_org_status(cls, org_id: str, status: str, count: int) -> None:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COUNT_ORG_STATUS_KEY.format(org_id=org_id, status=status)
-            redis_client.client.setex(key, cls.COUNT_TTL, json.dumps({"count": count}))
+            redis_client.client.setex(key, cls.COUNT_TTL, json_codec.dumps({"count": count}))
         except Exception:
             pass
 
     @classmethod
     def get_count_org_status(cls, org_id: str, status: str) -> Optional[int]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.COUNT_ORG_STATUS_KEY.format(org_id=org_id, status=status)
             blob = redis_client.client.get(key)
-            return (json.loads(blob).get("count") if blob else None)
+            return (json_codec.loads(blob).get("count") if blob else None)
         except Exception:
             return None
 
     @classmethod
     def cache_count_team(cls, org_id: str, team_id: str, count: int) -> None:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COUNT_TEAM_KEY.format(org_id=org_id, team_id=team_id)
-            redis_client.client.setex(key, cls.COUNT_TTL, json.dumps({"count": count}))
+            redis_client.client.setex(key, cls.COUNT_TTL, json_codec.dumps({"count": count}))
         except Exception:
             pass
 
     @classmethod
     def get_count_team(cls, org_id: str, team_id: str) -> Optional[int]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.COUNT_TEAM_KEY.format(org_id=org_id, team_id=team_id)
             blob = redis_client.client.get(key)
-            return (json.loads(blob).get("count") if blob else None)
+            return (json_codec.loads(blob).get("count") if blob else None)
         except Exception:
             return None
 
     @classmethod
     def cache_count_agent(cls, org_id: str, agent_id: str, count: int) -> None:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COUNT_AGENT_KEY.format(org_id=org_id, agent_id=agent_id)
-            redis_client.client.setex(key, cls.COUNT_TTL, json.dumps({"count": count}))
+            redis_client.client.setex(key, cls.COUNT_TTL, json_codec.dumps({"count": count}))
         except Exception:
             pass
 
     @classmethod
     def get_count_agent(cls, org_id: str, agent_id: str) -> Optional[int]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.COUNT_AGENT_KEY.format(org_id=org_id, agent_id=agent_id)
             blob = redis_client.client.get(key)
-            return (json.loads(blob).get("count") if blob else None)
+            return (json_codec.loads(blob).get("count") if blob else None)
         except Exception:
             return None
 
@@ -298,7 +281,7 @@ class RedisTicketService:
     @classmethod
     def invalidate_ticket(cls, ticket_id: str) -> None:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             redis_client.client.delete(cls.TICKET_KEY.format(ticket_id=ticket_id))
         except Exception:
@@ -308,10 +291,11 @@ class RedisTicketService:
     def invalidate_org_lists_and_counts(cls, org_id: str) -> None:
         """Call after create/update/delete where org-level list or counts could change."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             pipe = redis_client.client.pipeline()
             pipe.delete(cls.ORG_LIST_KEY.format(org_id=org_id))
+            pipe.delete(*response_cache.keys(cls.ORG_LIST_KEY.format(org_id=org_id)))
             pipe.delete(cls.COUNT_ORG_KEY.format(org_id=org_id))
             # nuke per-status counters (common statuses)
             for st in ["new", "open", "pending", "on_hold", "resolved", "closed", "canceled"]:
@@ -324,7 +308,7 @@ class RedisTicketService:
     def invalidate_team_caches(cls, org_id: str, team_id: str) -> None:
         """Invalidate team-specific caches."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             pipe = redis_client.client.pipeline()
             pipe.delete(cls.TEAM_LIST_KEY.format(org_id=org_id, team_id=team_id))
@@ -337,7 +321,7 @@ class RedisTicketService:
     def invalidate_agent_caches(cls, org_id: str, agent_id: str) -> None:
         """Invalidate agent-specific caches."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             pipe = redis_client.client.pipeline()
             pipe.delete(cls.AGENT_LIST_KEY.format(org_id=org_id, agent_id=agent_id))
@@ -352,7 +336,7 @@ class RedisTicketService:
                                          assignee_id: Optional[str] = None) -> None:
         """Invalidate all relevant assignment caches when a ticket is updated."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             pipe = redis_client.client.pipeline()
             
@@ -384,20 +368,20 @@ class RedisTicketService:
             return []
         if isinstance(blob, bytes):
             blob = blob.decode("utf-8")
-        return json.loads(blob)
+        return json_codec.loads(blob)
 
     # ------------------------- comments cache (new) -------------------------
 
     @classmethod
     def cache_comments(cls, ticket_id: str, comments: list[dict]) -> bool:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             key = cls.COMMENTS_KEY.format(ticket_id=ticket_id)
             # optional safety cap
             if len(comments) > cls.MAX_COMMENTS_CACHED:
                 comments = comments[-cls.MAX_COMMENTS_CACHED:]
-            redis_client.client.setex(key, cls.COMMENTS_TTL, json.dumps(comments))
+            redis_client.client.setex(key, cls.COMMENTS_TTL, json_codec.dumps(comments))
             return True
         except Exception:
             return False
@@ -405,7 +389,7 @@ class RedisTicketService:
     @classmethod
     def get_comments(cls, ticket_id: str) -> Optional[list[dict]]:
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             key = cls.COMMENTS_KEY.format(ticket_id=ticket_id)
             blob = redis_client.client.get(key)
@@ -417,7 +401,7 @@ class RedisTicketService:
     def append_comment(cls, ticket_id: str, comment: dict) -> None:
         """Append to cached list (or seed it) and refresh TTL."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COMMENTS_KEY.format(ticket_id=ticket_id)
             pipe = redis_client.client.pipeline()
@@ -426,7 +410,7 @@ class RedisTicketService:
             lst.append(comment)
             if len(lst) > cls.MAX_COMMENTS_CACHED:
                 lst = lst[-cls.MAX_COMMENTS_CACHED:]
-            pipe.setex(key, cls.COMMENTS_TTL, json.dumps(lst))
+            pipe.setex(key, cls.COMMENTS_TTL, json_codec.dumps(lst))
             pipe.execute()
         except Exception:
             pass
@@ -435,7 +419,7 @@ class RedisTicketService:
     def remove_comment(cls, ticket_id: str, comment_id: str) -> None:
         """Remove a comment from cache; if not found, noop."""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return
             key = cls.COMMENTS_KEY.format(ticket_id=ticket_id)
             cur = redis_client.client.get(key)
@@ -444,6 +428,6 @@ class RedisTicketService:
             lst = cls._deserialize_list(cur)
             new_lst = [c for c in lst if (c.get("comment_id") or c.get("commentId")) != comment_id]
             # keep TTL fresh
-            redis_client.client.setex(key, cls.COMMENTS_TTL, json.dumps(new_lst))
+            redis_client.client.setex(key, cls.COMMENTS_TTL, json_codec.dumps(new_lst))
         except Exception:
             pass
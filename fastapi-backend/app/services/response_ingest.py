@@ -0,0 +1,356 @@
+# app/services/response_ingest.py
+"""
+Write-behind ingestion of new survey responses (RESPONSE_WRITE_BEHIND=true).
+
+POST /responses/ validates the submission, appends it to a Redis stream
+and answers 202 as soon as XADD returns; it no longer waits for a
+Postgres commit. A flusher thread per worker reads the stream through a
+consumer group and group-commits whatever has accumulated, up to
+RESPONSE_INGEST_BATCH_SIZE submissions, in ONE transaction:
+
+  INSERT responses ... ON CONFLICT DO NOTHING RETURNING
+  INSERT answers   ... ON CONFLICT (response_id, question_id) DO UPDATE
+  INSERT rollup    ... value = value + delta   (one statement per survey)
+
+An idle flusher blocks on XREADGROUP for at most
+RESPONSE_INGEST_MAX_LATENCY_MS, so under low traffic a submission is
+committed within that bound; under load batches fill while the previous
+one commits, and commit latency is paid per batch, not per submission.
+
+Entries are acknowledged (XACK + XDEL) only after their batch commits, so
+a crash replays them: the flusher first drains its own pending entries
+and periodically claims entries another worker left pending for longer
+than RESPONSE_INGEST_CLAIM_IDLE_MS. Replays are harmless because a
+response that already exists is skipped. If a batch fails it is retried
+one submission at a time, and submissions that still fail (e.g. an
+unknown survey_id) go to the dead-letter stream with the error.
+
+Durability is Redis's: run it with appendonly so acknowledged submissions
+survive a restart. When Redis is down, submissions fall back to the
+synchronous write path. A queued response is readable by id from the
+response cache right away, and from Postgres once flushed.
+"""
+import os
+import socket
+import threading
+import time
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.core.redis_client import redis_client
+from app.db import SessionLocal
+from app.models.responses import Response
+from app.services import survey_results
+from app.services.answer_writer import build_answer_rows, upsert_answer_rows
+from app.services.redis_response_service import RedisResponseService
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "responses:ingest"
+DEAD_LETTER_KEY = "responses:ingest:dead"
+GROUP = "response-writers"
+FIELD = b"r"
+
+_TIMESTAMPS = ("started_at", "updated_at", "completed_at")
+
+
+class ResponseIngestQueue:
+    """
+    Redis-stream write-behind queue for response submissions and the
+    background flusher that group-commits it. Disabled unless
+    RESPONSE_WRITE_BEHIND=true.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("RESPONSE_WRITE_BEHIND", "false").lower() == "true"
+        self.batch_size = int(os.getenv("RESPONSE_INGEST_BATCH_SIZE", "200"))
+        self.max_latency_ms = int(os.getenv("RESPONSE_INGEST_MAX_LATENCY_MS", "200"))
+        self.claim_idle_ms = int(os.getenv("RESPONSE_INGEST_CLAIM_IDLE_MS", "60000"))
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._group_ready = False
+
+        self.enqueued = 0
+        self.fallbacks = 0
+        self.flushed = 0
+        self.batches = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+
+    # ------------------------------ enqueue ----------------------------
+
+    def enqueue(self, response: Dict[str, Any]) -> Optional[str]:
+        """
+        Durably queue a normalized response (answers validated by the
+        caller). Returns the stream entry id, or None when Redis is
+        unavailable and the caller must write synchronously.
+        """
+        try:
+            if not redis_client.available():
+                self.fallbacks += 1
+                return None
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.xadd(STREAM_KEY, {FIELD: json_codec.dumpb(response)})
+            # read-your-write by id until the flusher has committed it
+            pipe.setex(RedisResponseService.RESP_KEY.format(response_id=response["response_id"]),
+                       RedisResponseService.RESP_TTL, json_codec.dumps(response))
+            entry_id = pipe.execute()[0]
+            self.enqueued += 1
+            return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+        except Exception as e:
+            logger.warning(f"[ResponseIngest] enqueue failed, writing synchronously: {e}")
+            self.fallbacks += 1
+            return None
+
+    # ----------------------------- lifecycle ---------------------------
+
+    def start(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="ResponseIngestFlusher")
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the batch in flight; queued entries stay for the next start"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            redis_client.client.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _run_loop(self) -> None:
+        logger.info(f"[ResponseIngest] flusher {self.consumer} started "
+                    f"(batch={self.batch_size}, max_latency={self.max_latency_ms}ms)")
+        backlog = True  # own pending entries first: left over from a crash
+        last_claim = 0.0
+        while not self._stop.is_set():
+            try:
+                if not redis_client.available():
+                    self._stop.wait(1.0)
+                    continue
+                self._ensure_group()
+
+                if time.monotonic() - last_claim > self.claim_idle_ms / 1000:
+                    last_claim = time.monotonic()
+                    self._claim_stale()
+
+                entries = self._read(pending=backlog)
+                if backlog and not entries:
+                    backlog = False
+                    continue
+                if entries:
+                    self.flush(entries)
+            except Exception as e:
+                self._group_ready = False
+                backlog = True  # entries of a failed flush are still pending on us
+                logger.error(f"[ResponseIngest] flusher error: {e}")
+                self._stop.wait(1.0)
+        logger.info(f"[ResponseIngest] flusher {self.consumer} stopped")
+
+    def _read(self, pending: bool) -> List[Tuple[Any, Dict[bytes, bytes]]]:
+        streams = redis_client.client.xreadgroup(
+            GROUP, self.consumer, {STREAM_KEY: "0" if pending else ">"},
+            count=self.batch_size, block=None if pending else self.max_latency_ms,
+        )
+        entries = streams[0][1] if streams else []
+        if pending:
+            self.replayed += len(entries)
+        return entries
+
+    def _claim_stale(self) -> None:
+        """Take over entries pending on consumers that died"""
+        try:
+            claimed = redis_client.client.xautoclaim(
+                STREAM_KEY, GROUP, self.consumer, min_idle_time=self.claim_idle_ms,
+                start_id="0-0", count=self.batch_size,
+            )
+            if claimed[1]:
+                self.replayed += len(claimed[1])
+                self.flush(claimed[1])
+        except Exception as e:
+            logger.warning(f"[ResponseIngest] claiming stale entries failed: {e}")
+
+    # ------------------------------- flush -----------------------------
+
+    def flush(self, entries: List[Tuple[Any, Dict[bytes, bytes]]]) -> int:
+        """
+        Group-commit a batch of stream entries; returns responses written.
+        Entries are acknowledged once committed or dead-lettered. On a
+        database outage (OperationalError) the rest stay pending and the
+        error propagates, so the loop backs off and replays them.
+        """
+        started = time.perf_counter()
+        done: List[Any] = []
+        payloads: List[Tuple[Any, Dict[str, Any]]] = []
+        for entry_id, fields in entries:
+            try:
+                payloads.append((entry_id, json_codec.loads(fields[FIELD])))
+            except Exception as e:
+                self._dead_letter(entry_id, (fields or {}).get(FIELD, b""), e)
+                done.append(entry_id)
+
+        written: List[Dict[str, Any]] = []
+        deltas: Dict[str, Dict[Tuple[str, str], float]] = defaultdict(lambda: defaultdict(float))
+        outage: Optional[Exception] = None
+        db = SessionLocal()
+        try:
+            try:
+                batch_written, batch_deltas = self._write(db, [p for _, p in payloads])
+                db.commit()
+                self._collect(written, deltas, batch_written, batch_deltas)
+                done.extend(entry_id for entry_id, _ in payloads)
+            except OperationalError:
+                db.rollback()
+                raise
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"[ResponseIngest] batch of {len(payloads)} failed, retrying one by one: {e}")
+                for entry_id, payload in payloads:
+                    try:
+                        one_written, one_deltas = self._write(db, [payload])
+                        db.commit()
+                        self._collect(written, deltas, one_written, one_deltas)
+                    except OperationalError as oe:
+                        db.rollback()
+                        outage = oe
+                        break
+                    except Exception as one_error:
+                        db.rollback()
+                        self._dead_letter(entry_id, json_codec.dumpb(payload), one_error)
+                    done.append(entry_id)
+        finally:
+            db.close()
+
+        if done:
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.xack(STREAM_KEY, GROUP, *done)
+            pipe.xdel(STREAM_KEY, *done)
+            pipe.execute()
+
+        for survey_id, delta in deltas.items():
+            survey_results.publish(survey_id, {k: v for k, v in delta.items() if v})
+        for response in written:
+            RedisResponseService.index_response(response["survey_id"], response)
+
+        self.flushed += len(written)
+        self.batches += 1
+        self.last_batch_size = len(entries)
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        if outage is not None:
+            raise outage
+        return len(written)
+
+    @staticmethod
+    def _collect(written, deltas, new_written, new_deltas) -> None:
+        written.extend(new_written)
+        for survey_id, delta in new_deltas.items():
+            for key, v in delta.items():
+                deltas[survey_id][key] += v
+
+    def _write(self, db: Session, payloads: List[Dict[str, Any]]):
+        """Insert new responses, their answers and rollup deltas (caller commits)"""
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for p in payloads:
+            by_id.setdefault(p["response_id"], p)  # a replayed duplicate in one batch
+        if not by_id:
+            return [], {}
+
+        rows = []
+        for p in by_id.values():
+            row = {c: p.get(c) for c in ("response_id", "org_id", "survey_id", "respondent_id",
+                                         "source_id", "status", "meta_data", "idempotency_key")}
+            for c in _TIMESTAMPS:
+                row[c] = datetime.fromisoformat(p[c]) if p.get(c) else None
+            row["answers_blob"] = p.get("answers") or []
+            rows.append(row)
+
+        # entries replayed after a crash, and retried submissions (same
+        # idempotency key), already exist: skip them entirely
+        stmt = (
+            pg_insert(Response).values(rows)
+            .on_conflict_do_nothing()
+            .returning(Response.response_id)
+        )
+        inserted = set(db.execute(stmt).scalars())
+        written = [by_id[rid] for rid in by_id if rid in inserted]
+
+        answer_rows = []
+        for p in written:
+            answer_rows.extend(build_answer_rows(p["survey_id"], p["response_id"], p.get("answers"), p["org_id"]))
+        upsert_answer_rows(db, answer_rows)
+
+        by_survey: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for p in written:
+            by_survey[p["survey_id"]].append(p)
+        deltas: Dict[str, survey_results.Delta] = {}
+        for survey_id, items in by_survey.items():
+            types = survey_results.question_types(db, survey_id)
+            total: survey_results.Delta = defaultdict(float)
+            for p in items:
+                for key, v in survey_results.compute_delta(types, [], p.get("answers"), None,
+                                                           p.get("status"), started=1).items():
+                    total[key] += v
+            delta = {k: v for k, v in total.items() if v}
+            survey_results.write_delta(db, survey_id, delta)
+            deltas[survey_id] = delta
+        return written, deltas
+
+    def _dead_letter(self, entry_id: Any, blob: bytes, error: Exception) -> None:
+        logger.error(f"[ResponseIngest] dead-lettering entry {entry_id}: {error}")
+        self.dead_lettered += 1
+        try:
+            redis_client.client.xadd(DEAD_LETTER_KEY, {FIELD: blob, b"error": str(error)[:1000],
+                                                        b"entry_id": str(entry_id)})
+        except Exception as e:
+            logger.error(f"[ResponseIngest] dead-letter write failed for {entry_id}: {e}")
+
+    # ------------------------------- stats -----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        out = {
+            "enabled": self.enabled,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "batch_size": self.batch_size,
+            "max_latency_ms": self.max_latency_ms,
+            "enqueued": self.enqueued,
+            "fallbacks": self.fallbacks,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": self.last_flush_ms,
+        }
+        if self.enabled:
+            try:
+                out["backlog"] = redis_client.client.xlen(STREAM_KEY)
+            except Exception:
+                out["backlog"] = None
+        return out
+
+
+response_ingest = ResponseIngestQueue()
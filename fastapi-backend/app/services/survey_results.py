@@ -0,0 +1,327 @@
+# app/services/survey_results.py
+"""
+Survey results engine: per-question aggregates kept current on every write.
+
+Every answer contributes additive counters to its question:
+  n                  responses that answered it
+  opt:<option>       choice questions: responses that picked the option
+  num_n, sum, sumsq  numeric/rating questions: count and first two moments
+  hist:<bucket>      numeric/rating questions: histogram on integer buckets
+and every response to the survey funnel (question_id FUNNEL_ID):
+  started, completed
+
+A response write computes the delta between the old and new answers
+(unchanged answers cost nothing) and, in the same transaction, upserts it
+into SurveyResultRollup with value = value + delta, so the rollup is
+always consistent with the responses table. After commit the delta is
+applied to the Redis hash (RedisResultsService), which results reads
+serve from; a miss reloads the hash from the rollup. Reads therefore cost
+O(questions + options), independent of the number of responses. A reload
+that races a write can count that write twice in Redis until the hash
+expires (RedisResultsService.RESULTS_TTL); the rollup itself is exact.
+
+rebuild() recomputes a survey from answers_blob with NumPy reductions, for
+backfills and after question type changes. Writes that race a rebuild can
+be lost from it; run it when the survey is quiet or re-run it.
+"""
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.models.questions import Question
+from app.models.responses import Response
+from app.models.survey import Survey
+from app.models.survey_results import SurveyResultRollup
+from app.services.answer_columnar_export import NUMERIC_TYPES, SKIPPED_TYPES, _to_number
+from app.services.redis_question_service import RedisQuestionService
+from app.services.redis_results_service import RedisResultsService
+
+FUNNEL_ID = "__funnel__"
+CHOICE_TYPES = {
+    "multiple_choice", "dropdown", "picture_choice", "yes_no", "legal", "checkbox",
+    "segmentation_selector", "weighted_multi",
+}
+REBUILD_BATCH_SIZE = 2000
+
+Delta = Dict[Tuple[str, str], float]
+
+
+def answer_kind(question_type: Optional[str]) -> str:
+    if question_type in NUMERIC_TYPES:
+        return "numeric"
+    if question_type in CHOICE_TYPES:
+        return "choice"
+    return "other"
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _options(value: Any) -> List[str]:
+    """Distinct option labels picked in one answer"""
+    items = value if isinstance(value, (list, tuple)) else [value]
+    out = []
+    for item in items:
+        if _is_empty(item):
+            continue
+        label = item if isinstance(item, str) else json_codec.dumps(item)
+        if label not in out:
+            out.append(label)
+    return out
+
+
+def _bucket(x: float) -> str:
+    return str(math.floor(x))
+
+
+def contributions(kind: str, value: Any) -> Dict[str, float]:
+    """Counters one answer adds to its question"""
+    if _is_empty(value):
+        return {}
+    out = {"n": 1.0}
+    if kind == "choice":
+        for option in _options(value):
+            out[f"opt:{option}"] = 1.0
+    elif kind == "numeric":
+        x = _to_number(value)
+        if x is not None and math.isfinite(x):
+            out.update({"num_n": 1.0, "sum": x, "sumsq": x * x, f"hist:{_bucket(x)}": 1.0})
+    return out
+
+
+def answers_by_question(answers: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """{questionId: answer} from an answers_blob-shaped list (last one wins)"""
+    return {a.get("questionId"): a.get("answer") for a in answers or [] if a and a.get("questionId")}
+
+
+def compute_delta(types: Dict[str, str], old_answers, new_answers,
+                  old_status: Optional[str], new_status: Optional[str], started: int = 0) -> Delta:
+    old, new = answers_by_question(old_answers), answers_by_question(new_answers)
+    delta: Delta = defaultdict(float)
+    for qid in old.keys() | new.keys():
+        if old.get(qid) == new.get(qid):
+            continue
+        kind = answer_kind(types.get(qid))
+        for counter, v in contributions(kind, old.get(qid)).items():
+            delta[(qid, counter)] -= v
+        for counter, v in contributions(kind, new.get(qid)).items():
+            delta[(qid, counter)] += v
+
+    completed = int(new_status == "completed") - int(old_status == "completed")
+    if completed:
+        delta[(FUNNEL_ID, "completed")] += completed
+    if started:
+        delta[(FUNNEL_ID, "started")] += started
+    return {k: v for k, v in delta.items() if v}
+
+
+def load_questions(db: Session, survey_id: str) -> List[Dict[str, Any]]:
+    """Question dicts of a survey, from cache or loaded once across concurrent misses"""
+    return RedisQuestionService.load_questions_for_survey(survey_id, lambda: [
+        q.to_dict() for q in
+        db.query(Question).filter(Question.survey_id == survey_id)
+        .order_by(Question.created_at, Question.question_id).all()
+    ])
+
+
+def question_types(db: Session, survey_id: str) -> Dict[str, str]:
+    return {q.get("question_id"): q.get("type") for q in load_questions(db, survey_id)}
+
+
+# ------------------------------- writes --------------------------------
+
+def record_change(db: Session, survey_id: str, old_answers, new_answers,
+                  old_status: Optional[str], new_status: Optional[str], started: int = 0) -> Delta:
+    """
+    Add the aggregate delta of one response change to the rollup inside
+    the caller's transaction. Pass the result to publish() after commit.
+    """
+    delta = compute_delta(question_types(db, survey_id), old_answers, new_answers,
+                          old_status, new_status, started)
+    write_delta(db, survey_id, delta)
+    return delta
+
+
+def write_delta(db: Session, survey_id: str, delta: Delta) -> None:
+    """Upsert value = value + delta into the rollup (caller commits)"""
+    if not delta:
+        return
+
+    # fixed key order, so concurrent writers lock rollup rows in the same order
+    values = [
+        {"survey_id": survey_id, "question_id": qid, "field": counter, "value": v}
+        for (qid, counter), v in sorted(delta.items())
+    ]
+    stmt = pg_insert(SurveyResultRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SurveyResultRollup.survey_id, SurveyResultRollup.question_id, SurveyResultRollup.field],
+        set_={"value": SurveyResultRollup.value + stmt.excluded.value, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+
+def publish(survey_id: str, delta: Delta) -> None:
+    """
+    Apply a committed delta to the cached hash (dropped if the patch fails)
+    and bump the survey's data revision. Call after every response write,
+    also when the delta is empty (e.g. a meta_data change moves segments).
+    """
+    RedisResultsService.bump_revision(survey_id)
+    if not delta:
+        return
+    fields = {RedisResultsService.field(qid, counter): v for (qid, counter), v in delta.items()}
+    if not RedisResultsService.apply(survey_id, fields):
+        RedisResultsService.invalidate(survey_id)
+
+
+# -------------------------------- reads --------------------------------
+
+def _load_counters(db: Session, survey_id: str) -> Dict[str, float]:
+    values = RedisResultsService.get(survey_id)
+    if values is None:
+        rows = db.execute(
+            select(SurveyResultRollup.question_id, SurveyResultRollup.field, SurveyResultRollup.value)
+            .where(SurveyResultRollup.survey_id == survey_id)
+        )
+        values = {RedisResultsService.field(qid, counter): v for qid, counter, v in rows}
+        RedisResultsService.load(survey_id, values)
+    return values
+
+
+def _survey_questions(db: Session, survey_id: str) -> List[Dict[str, Any]]:
+    """Questions in survey order (question_order first, then creation order)"""
+    questions = load_questions(db, survey_id)
+    order = db.query(Survey.question_order).filter(Survey.survey_id == survey_id).scalar() or []
+    position = {qid: i for i, qid in enumerate(order)}
+    return sorted(
+        (q for q in questions if q.get("type") not in SKIPPED_TYPES),
+        key=lambda q: position.get(q.get("question_id"), len(position)),
+    )
+
+
+def summarize(survey_id: str, questions: List[Dict[str, Any]], values: Dict[str, float]) -> Dict[str, Any]:
+    counters: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for key, v in values.items():
+        qid, _, counter = key.partition(RedisResultsService.SEPARATOR)
+        counters[qid][counter] = v
+
+    funnel = counters.get(FUNNEL_ID, {})
+    started = int(round(funnel.get("started", 0)))
+    completed = int(round(funnel.get("completed", 0)))
+
+    out_questions = []
+    for q in questions:
+        qid = q.get("question_id")
+        c = counters.get(qid, {})
+        kind = answer_kind(q.get("type"))
+        entry: Dict[str, Any] = {
+            "question_id": qid,
+            "label": q.get("label"),
+            "type": q.get("type"),
+            "answered": int(round(c.get("n", 0))),
+        }
+        if kind == "choice":
+            options = {k[4:]: int(round(v)) for k, v in c.items() if k.startswith("opt:") and round(v) > 0}
+            entry["options"] = dict(sorted(options.items(), key=lambda kv: kv[1], reverse=True))
+        elif kind == "numeric":
+            n = c.get("num_n", 0)
+            mean = c.get("sum", 0) / n if n else None
+            variance = max(0.0, c.get("sumsq", 0) / n - mean * mean) if n else None
+            histogram = {k[5:]: int(round(v)) for k, v in c.items() if k.startswith("hist:") and round(v) > 0}
+            entry["numeric"] = {
+                "count": int(round(n)),
+                "mean": mean,
+                "stddev": math.sqrt(variance) if variance is not None else None,
+                "histogram": dict(sorted(histogram.items(), key=lambda kv: int(kv[0]))),
+            }
+        out_questions.append(entry)
+
+    return {
+        "survey_id": survey_id,
+        "funnel": {
+            "started": started,
+            "completed": completed,
+            "completion_rate": completed / started if started else None,
+            "steps": [{"question_id": q["question_id"], "answered": q["answered"]} for q in out_questions],
+        },
+        "questions": out_questions,
+    }
+
+
+def get_results(db: Session, survey_id: str) -> Dict[str, Any]:
+    return summarize(survey_id, _survey_questions(db, survey_id), _load_counters(db, survey_id))
+
+
+# ------------------------------- rebuild -------------------------------
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Results rebuild unavailable: {e}")
+    return np
+
+
+def rebuild(db: Session, survey_id: str) -> Dict[str, int]:
+    """Recompute the survey's rollup from answers_blob and reset the cache"""
+    np = _require_numpy()
+    kinds = {qid: answer_kind(t) for qid, t in
+             db.execute(select(Question.question_id, Question.type).where(Question.survey_id == survey_id))}
+
+    started = completed = 0
+    answers: Dict[str, List[Any]] = defaultdict(list)
+    result = db.execute(
+        select(Response.answers_blob, Response.status)
+        .where(Response.survey_id == survey_id)
+        .execution_options(stream_results=True, yield_per=REBUILD_BATCH_SIZE)
+    )
+    for blob, status in result:
+        started += 1
+        completed += status == "completed"
+        for qid, value in answers_by_question(blob).items():
+            if not _is_empty(value):
+                answers[qid].append(value)
+
+    rows: Dict[Tuple[str, str], float] = {
+        (FUNNEL_ID, "started"): float(started),
+        (FUNNEL_ID, "completed"): float(completed),
+    }
+    for qid, values in answers.items():
+        rows[(qid, "n")] = float(len(values))
+        kind = kinds.get(qid, "other")
+        if kind == "choice":
+            picked = np.array([o for v in values for o in _options(v)], dtype=str)
+            if picked.size:
+                labels, counts = np.unique(picked, return_counts=True)
+                rows.update({(qid, f"opt:{label}"): float(c) for label, c in zip(labels.tolist(), counts.tolist())})
+        elif kind == "numeric":
+            x = np.fromiter((_nan_if_none(_to_number(v)) for v in values), dtype=np.float64, count=len(values))
+            x = x[np.isfinite(x)]
+            if x.size:
+                rows[(qid, "num_n")] = float(x.size)
+                rows[(qid, "sum")] = float(x.sum())
+                rows[(qid, "sumsq")] = float(np.dot(x, x))
+                buckets, counts = np.unique(np.floor(x).astype(np.int64), return_counts=True)
+                rows.update({(qid, f"hist:{b}"): float(c) for b, c in zip(buckets.tolist(), counts.tolist())})
+
+    db.execute(delete(SurveyResultRollup).where(SurveyResultRollup.survey_id == survey_id))
+    values = [
+        {"survey_id": survey_id, "question_id": qid, "field": counter, "value": v}
+        for (qid, counter), v in rows.items()
+    ]
+    for i in range(0, len(values), REBUILD_BATCH_SIZE):
+        db.execute(insert(SurveyResultRollup), values[i:i + REBUILD_BATCH_SIZE])
+    db.commit()
+    RedisResultsService.invalidate(survey_id)
+    return {"responses": started, "questions": len(answers), "counters": len(values)}
+
+
+def _nan_if_none(x: Optional[float]) -> float:
+    return float("nan") if x is None else x
@@ -0,0 +1,57 @@
+# app/utils/compression_utils.py
+import os
+import zlib
+from typing import Iterable, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+# Server preference order; only these are ever negotiated
+COMPRESSION_ALGORITHMS = [
+    a.strip().lower()
+    for a in os.getenv("ENCRYPTION_COMPRESSION", "zstd,gzip").split(",")
+    if a.strip()
+]
+COMPRESSION_MIN_SIZE = int(os.getenv("ENCRYPTION_COMPRESSION_MIN_SIZE", str(8 * 1024)))  # bytes
+GZIP_LEVEL = int(os.getenv("ENCRYPTION_GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("ENCRYPTION_ZSTD_LEVEL", "3"))
+
+
+def available_algorithms() -> list:
+    return [a for a in COMPRESSION_ALGORITHMS if a == "gzip" or (a == "zstd" and zstandard)]
+
+
+def negotiate(accepted: Iterable[str], size: Optional[int] = None) -> Optional[str]:
+    """
+    Pick the first server-preferred algorithm the client accepts, or None
+    when nothing matches or the body is known to be below the threshold.
+    `size` is None for streamed bodies without a content-length.
+    """
+    if size is not None and size < COMPRESSION_MIN_SIZE:
+        return None
+    accepted = {a.strip().lower() for a in accepted if a.strip()}
+    for algorithm in available_algorithms():
+        if algorithm in accepted:
+            return algorithm
+    return None
+
+
+class StreamCompressor:
+    """Incremental compressor with a zlib-style compress()/flush() interface"""
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        if algorithm == "gzip":
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+        elif algorithm == "zstd" and zstandard:
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            raise ValueError(f"Unsupported compression: {algorithm}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk) if chunk else b""
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
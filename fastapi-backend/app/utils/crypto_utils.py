@@ -1,22 +1,106 @@
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import base64
-import json
+import hashlib
 import os
+import threading
+import time
+
+from app.core import json_codec
+
+GCM_TAG_SIZE = 16
 
 
 def load_private_key(path="keys/fastapi_private.pem"):
     with open(path, "rb") as f:
         return serialization.load_pem_private_key(f.read(), password=None)
 
-def decrypt_request(body, private_key):
-    encrypted_key = base64.b64decode(body["encrypted_key"])
-    ciphertext = base64.b64decode(body["ciphertext"])
-    iv = base64.b64decode(body["iv"])
-    tag = base64.b64decode(body["tag"])
 
-    # 1️⃣ Decrypt AES key
+@lru_cache(maxsize=None)
+def get_private_key():
+    """Process-wide backend private key (loaded once per worker process)"""
+    return load_private_key()
+
+class UnwrappedKeyCache:
+    """
+    Bounded LRU + TTL cache from the SHA-256 of an RSA-wrapped key to the
+    unwrapped AES key. Browsers reuse one encrypted_key for a whole session,
+    so the RSA-OAEP decrypt only has to run once per session.
+    Set KEY_CACHE_MAX_ENTRIES=0 to disable.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 900):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(encrypted_key: bytes) -> bytes:
+        return hashlib.sha256(encrypted_key).digest()
+
+    def get(self, fp: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                self.misses += 1
+                return None
+            aes_key, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[fp]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fp)
+            self.hits += 1
+            return aes_key
+
+    def put(self, fp: bytes, aes_key: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[fp] = (aes_key, time.monotonic() + self.ttl)
+            self._entries.move_to_end(fp)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total * 100, 2) if total else 0.0,
+        }
+
+
+aes_key_cache = UnwrappedKeyCache(
+    max_entries=int(os.getenv("KEY_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.getenv("KEY_CACHE_TTL", "900")),
+)
+
+
+def unwrap_aes_key(encrypted_key: bytes, private_key) -> bytes:
+    """RSA-OAEP decrypt of a wrapped AES key, memoized in aes_key_cache"""
+    fp = UnwrappedKeyCache.fingerprint(encrypted_key)
+    aes_key = aes_key_cache.get(fp)
+    if aes_key is not None:
+        return aes_key
+
     aes_key = private_key.decrypt(
         encrypted_key,
         padding.OAEP(
@@ -25,6 +109,18 @@ def decrypt_request(body, private_key):
             label=None
         )
     )
+    aes_key_cache.put(fp, aes_key)
+    return aes_key
+
+
+def decrypt_request(body, private_key):
+    encrypted_key = base64.b64decode(body["encrypted_key"])
+    ciphertext = base64.b64decode(body["ciphertext"])
+    iv = base64.b64decode(body["iv"])
+    tag = base64.b64decode(body["tag"])
+
+    # 1️⃣ Decrypt AES key (cached per encrypted_key)
+    aes_key = unwrap_aes_key(encrypted_key, private_key)
 
     # 2️⃣ Decrypt payload with AES-GCM
     decryptor = Cipher(
@@ -33,7 +129,27 @@ def decrypt_request(body, private_key):
     ).decryptor()
     decrypted_bytes = decryptor.update(ciphertext) + decryptor.finalize()
 
-    return json.loads(decrypted_bytes.decode("utf-8"))
+    return json_codec.loads(decrypted_bytes)
+
+
+def decrypt_envelope_body(body: bytes) -> Optional[bytes]:
+    """
+    Decrypt a raw {encrypted_key, ciphertext, iv, tag} JSON request body.
+
+    Returns the plaintext bytes as sent by the client, or None when the body
+    is JSON but not an envelope. Raises json_codec.JSONDecodeError for non-JSON.
+    Self-contained (bytes in, bytes out) so it can run in a worker process.
+    """
+    data = json_codec.loads(body)
+    if not isinstance(data, dict) or "encrypted_key" not in data:
+        return None
+
+    aes_key = unwrap_aes_key(base64.b64decode(data["encrypted_key"]), get_private_key())
+    decryptor = Cipher(
+        algorithms.AES(aes_key),
+        modes.GCM(base64.b64decode(data["iv"]), base64.b64decode(data["tag"]))
+    ).decryptor()
+    return decryptor.update(base64.b64decode(data["ciphertext"])) + decryptor.finalize()
 
 
 def encrypt_aes_gcm(data: dict, aes_key: bytes):
@@ -43,10 +159,76 @@ def encrypt_aes_gcm(data: dict, aes_key: bytes):
     iv = os.urandom(12)
     cipher = Cipher(algorithms.AES(aes_key), modes.GCM(iv))
     encryptor = cipher.encryptor()
-    plaintext = json.dumps(data).encode("utf-8")
+    plaintext = json_codec.dumpb(data)
     ciphertext = encryptor.update(plaintext) + encryptor.finalize()
     return {
         "ciphertext": base64.b64encode(ciphertext).decode(),
         "iv": base64.b64encode(iv).decode(),
         "tag": base64.b64encode(encryptor.tag).decode(),
-    }
\ No newline at end of file
+    }
+
+
+class AESGCMStreamEncryptor:
+    """
+    Incremental AES-256-GCM over a byte stream. Emits base64 ciphertext as
+    chunks arrive (held back to 3-byte boundaries so the pieces concatenate
+    into one valid base64 string); the tag is only known after finalize().
+    """
+
+    def __init__(self, aes_key: bytes):
+        self.iv = os.urandom(12)
+        self._encryptor = Cipher(algorithms.AES(aes_key), modes.GCM(self.iv)).encryptor()
+        self._pending = b""
+
+    def update(self, chunk: bytes) -> bytes:
+        data = self._pending + self._encryptor.update(chunk)
+        cut = len(data) - len(data) % 3
+        self._pending = data[cut:]
+        return base64.b64encode(data[:cut])
+
+    def finalize(self) -> Tuple[bytes, bytes]:
+        """Returns (remaining base64 ciphertext, raw tag)"""
+        data = self._pending + self._encryptor.finalize()
+        self._pending = b""
+        return base64.b64encode(data), self._encryptor.tag
+
+
+class AESGCMFrameEncryptor:
+    """
+    Framed AES-256-GCM: plaintext is cut into frame_size frames, each sealed
+    on its own so the client can verify and decrypt frame by frame.
+    Nonce = 8-byte random prefix || 4-byte frame counter; the AAD binds the
+    counter and final flag so frames cannot be reordered or truncated.
+    """
+
+    def __init__(self, aes_key: bytes, frame_size: int = 64 * 1024):
+        self._aead = AESGCM(aes_key)
+        self.nonce_prefix = os.urandom(8)
+        self.frame_size = frame_size
+        self._buf = bytearray()
+        self._seq = 0
+
+    def _seal(self, plaintext: bytes, final: bool) -> dict:
+        seq = self._seq
+        self._seq += 1
+        nonce = self.nonce_prefix + seq.to_bytes(4, "big")
+        sealed = self._aead.encrypt(nonce, plaintext, f"{seq}:{int(final)}".encode())
+        return {
+            "seq": seq,
+            "final": final,
+            "ciphertext": base64.b64encode(sealed[:-GCM_TAG_SIZE]).decode(),
+            "tag": base64.b64encode(sealed[-GCM_TAG_SIZE:]).decode(),
+        }
+
+    def update(self, chunk: bytes) -> List[dict]:
+        self._buf += chunk
+        frames = []
+        while len(self._buf) >= self.frame_size:
+            frames.append(self._seal(bytes(self._buf[:self.frame_size]), final=False))
+            del self._buf[:self.frame_size]
+        return frames
+
+    def finalize(self) -> dict:
+        frame = self._seal(bytes(self._buf), final=True)
+        self._buf.clear()
+        return frame
@@ -1,10 +1,10 @@
 # app/utils/redis_utils.py
-import json
 import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
 from ..core.redis_client import redis_client
+from ..core import json_codec
 
 
 class RedisHealthCheck:
@@ -23,7 +23,7 @@ class RedisHealthCheck:
     def get_redis_info() -> Dict[str, Any]:
         """Get detailed Redis information"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return {"status": "disconnected", "error": "Redis not responding"}
             
             info = redis_client.client.info()
@@ -50,17 +50,22 @@ class RedisHealthCheck:
     def get_cache_statistics(pattern: str = "project:*") -> Dict[str, Any]:
         """Get cache statistics for project-related keys"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return {"error": "Redis not available"}
             
-            keys = redis_client.client.keys(pattern)
-            total_keys = len(keys)
+            # Count with incremental SCAN (bounded, see RedisClient.scan_batches)
+            truncated_before = redis_client.scans_truncated
+            total_keys = 0
+            sample: List[bytes] = []
+            for keys in redis_client.scan_batches(pattern):
+                total_keys += len(keys)
+                sample.extend(keys[:10 - len(sample)])
             
             # Sample some keys to get size estimates
-            sample_size = min(10, total_keys)
+            sample_size = len(sample)
             total_size = 0
             
-            for key in keys[:sample_size]:
+            for key in sample:
                 try:
                     size = redis_client.client.memory_usage(key)
                     if size:
@@ -78,6 +83,7 @@ class RedisHealthCheck:
                 "estimated_total_size_human": f"{estimated_total_size / 1024:.2f} KB",
                 "average_key_size_bytes": int(avg_key_size),
                 "sample_size": sample_size,
+                "complete": redis_client.scans_truncated == truncated_before,
                 "timestamp": datetime.now().isoformat()
             }
         except Exception as e:
@@ -94,14 +100,14 @@ class RedisProjectAnalytics:
     async def update_project_analytics(cls, org_id: str, project_data: Dict[str, Any]) -> bool:
         """Update project analytics in Redis"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return False
             
             key = cls.ANALYTICS_KEY.format(org_id=org_id)
             
             # Get existing analytics or create new
             existing_data = redis_client.client.get(key)
-            analytics = json.loads(existing_data) if existing_data else {
+            analytics = json_codec.loads(existing_data) if existing_data else {
                 "org_id": org_id,
                 "total_projects": 0,
                 "active_projects": 0,
@@ -146,7 +152,7 @@ class RedisProjectAnalytics:
             analytics['last_updated'] = datetime.now().isoformat()
             
             # Cache updated analytics
-            redis_client.client.setex(key, cls.ANALYTICS_TTL, json.dumps(analytics))
+            redis_client.client.setex(key, cls.ANALYTICS_TTL, json_codec.dumps(analytics))
             
             return True
             
@@ -158,14 +164,14 @@ class RedisProjectAnalytics:
     async def get_project_analytics(cls, org_id: str) -> Optional[Dict[str, Any]]:
         """Get project analytics from Redis"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return None
             
             key = cls.ANALYTICS_KEY.format(org_id=org_id)
             cached_data = redis_client.client.get(key)
             
             if cached_data:
-                return json.loads(cached_data)
+                return json_codec.loads(cached_data)
             
             return None
             
@@ -181,7 +187,7 @@ class RedisBatchOperations:
     async def batch_cache_projects(projects_data: List[Dict[str, Any]]) -> Dict[str, bool]:
         """Cache multiple projects in a single pipeline operation"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return {}
             
             pipe = redis_client.client.pipeline()
@@ -194,13 +200,7 @@ class RedisBatchOperations:
                 if org_id and project_id:
                     key = f"project:{org_id}:{project_id}"
                     
-                    # Serialize project data
-                    def serialize_datetime(obj):
-                        if isinstance(obj, datetime):
-                            return obj.isoformat()
-                        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-                    
-                    serialized_data = json.dumps(project, default=serialize_datetime)
+                    serialized_data = json_codec.dumps(project)
                     pipe.setex(key, 3600, serialized_data)  # 1 hour TTL
                     results[project_id] = True
                 else:
@@ -220,7 +220,7 @@ class RedisBatchOperations:
     async def batch_invalidate_projects(org_id: str, project_ids: List[str]) -> bool:
         """Invalidate multiple project caches in a single operation"""
         try:
-            if not redis_client.ping() or not project_ids:
+            if not redis_client.available() or not project_ids:
                 return False
             
             pipe = redis_client.client.pipeline()
@@ -253,10 +253,10 @@ class RedisKeyManager:
     def get_all_project_keys(pattern: str = "project:*") -> List[str]:
         """Get all project-related Redis keys"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return []
             
-            return [key.decode() if isinstance(key, bytes) else key for key in redis_client.client.keys(pattern)]
+            return [key.decode() if isinstance(key, bytes) else key for key in redis_client.scan_keys(pattern)]
             
         except Exception as e:
             print(f"[RedisKeyManager] Failed to get keys: {e}")
@@ -266,16 +266,21 @@ class RedisKeyManager:
     def cleanup_expired_keys(dry_run: bool = True) -> Dict[str, Any]:
         """Clean up expired or orphaned keys"""
         try:
-            if not redis_client.ping():
+            if not redis_client.available():
                 return {"error": "Redis not available"}
             
             project_keys = RedisKeyManager.get_all_project_keys()
             expired_keys = []
             
-            for key in project_keys:
-                ttl = redis_client.client.ttl(key)
-                if ttl == -1:  # No expiration set
-                    expired_keys.append(key)
+            # TTLs in one pipeline per SCAN-sized chunk, not one round trip per key
+            for i in range(0, len(project_keys), redis_client.scan_count):
+                chunk = project_keys[i:i + redis_client.scan_count]
+                pipe = redis_client.client.pipeline(transaction=False)
+                for key in chunk:
+                    pipe.ttl(key)
+                for key, ttl in zip(chunk, pipe.execute()):
+                    if ttl == -1:  # No expiration set
+                        expired_keys.append(key)
             
             if not dry_run and expired_keys:
                 # Set TTL for keys without expiration
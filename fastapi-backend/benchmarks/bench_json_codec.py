@@ -0,0 +1,121 @@
+"""
+JSON codec micro-benchmark: stdlib json vs orjson on realistic payloads.
+
+Payloads mirror what the hot paths actually serialize: ticket rows as cached
+by RedisTicketService (enums, datetimes, JSONB custom_fields/meta) and survey
+responses as returned by the responses routes (answers_blob lists). Both
+backends go through app.core.json_codec with the same `default` handler.
+
+Run from fastapi-backend/:
+    python -m benchmarks.bench_json_codec --rows 200 --repeat 200
+"""
+import argparse
+import datetime as dt
+import enum
+import time
+import uuid
+
+from app.core import json_codec
+
+
+class TicketStatus(str, enum.Enum):
+    NEW = "new"
+    OPEN = "open"
+    PENDING = "pending"
+    RESOLVED = "resolved"
+
+
+class TicketPriority(str, enum.Enum):
+    LOW = "low"
+    NORMAL = "normal"
+    HIGH = "high"
+    URGENT = "urgent"
+
+
+def make_ticket(i):
+    now = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(minutes=i)
+    return {
+        "ticket_id": f"tkt_{uuid.uuid4().hex[:12]}",
+        "org_id": "org_bench",
+        "project_id": "proj_bench",
+        "requester_id": f"user_{i % 50}",
+        "assignee_id": f"agent_{i % 7}",
+        "group_id": "grp_support",
+        "subject": f"Cannot export survey results #{i}",
+        "description": "Export to CSV times out for surveys with more than 10k responses. " * 3,
+        "status": list(TicketStatus)[i % 4],
+        "priority": list(TicketPriority)[i % 4],
+        "tags": ["export", "csv", "timeout"],
+        "custom_fields": {"plan": "enterprise", "seats": 250, "region": "eu-west", "escalated": i % 5 == 0},
+        "meta": {"source": "email", "thread": [f"msg_{j}" for j in range(5)], "locale": "de-DE"},
+        "first_response_due_at": now + dt.timedelta(hours=4),
+        "resolution_due_at": now + dt.timedelta(days=2),
+        "created_at": now,
+        "updated_at": now + dt.timedelta(minutes=30),
+    }
+
+
+def make_response(i, questions=25):
+    started = dt.datetime(2025, 1, 1, 9, 0) + dt.timedelta(seconds=i * 17)
+    answers = []
+    for q in range(questions):
+        kind = q % 4
+        if kind == 0:
+            answer = q % 5 + 1
+        elif kind == 1:
+            answer = ["opt_a", "opt_c"]
+        elif kind == 2:
+            answer = "Die Umfrage war übersichtlich, aber etwas lang."
+        else:
+            answer = {"row_1": "agree", "row_2": "neutral", "row_3": "disagree"}
+        answers.append({"questionId": f"q_{q}", "projectId": "proj_bench", "answer": answer})
+    return {
+        "response_id": f"resp_{uuid.uuid4().hex[:12]}",
+        "org_id": "org_bench",
+        "survey_id": "survey_bench",
+        "respondent_id": f"r_{i}",
+        "status": "completed",
+        "meta_data": {"ua": "Mozilla/5.0", "ip_country": "DE", "duration_s": 312},
+        "started_at": started,
+        "completed_at": started + dt.timedelta(minutes=5),
+        "answers": answers,
+    }
+
+
+def bench(fn, arg, repeat):
+    fn(arg)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200, help="records per payload")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = {
+        "tickets": [make_ticket(i) for i in range(args.rows)],
+        "responses": [make_response(i) for i in range(args.rows)],
+    }
+    backends = json_codec.BACKENDS
+    print(f"active backend: {json_codec.JSON_CODEC}   available: {', '.join(backends)}")
+
+    for name, payload in payloads.items():
+        encoded = backends["stdlib"][1](payload)
+        print(f"\n{name}: {args.rows} rows, {len(encoded) / 1024:.1f} KiB")
+        results = {}
+        for backend, (_, dumpb, loads) in backends.items():
+            blob = dumpb(payload)
+            results[backend] = (bench(dumpb, payload, args.repeat), bench(loads, blob, args.repeat))
+            enc, dec = results[backend]
+            print(f"  {backend:<7} dumps {enc * 1000:8.3f} ms   loads {dec * 1000:8.3f} ms")
+        if "orjson" in results:
+            (se, sd), (oe, od) = results["stdlib"], results["orjson"]
+            print(f"  speedup dumps {se / oe:.1f}x   loads {sd / od:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
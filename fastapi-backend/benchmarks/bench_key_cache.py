@@ -0,0 +1,106 @@
+"""
+DecryptMiddleware throughput with and without the unwrapped AES key cache.
+
+Drives the real DecryptMiddleware in-process with a trivial downstream app,
+simulating browser sessions that reuse one encrypted_key for many requests.
+
+Run from fastapi-backend/:
+    python -m benchmarks.bench_key_cache --requests 2000 --sessions 10
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import os
+import time
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.middleware.decrypt_middleware import DecryptMiddleware
+from app.utils.crypto_utils import aes_key_cache
+
+
+def load_public_key(path="keys/fastapi_public.pem"):
+    with open(path, "rb") as f:
+        return serialization.load_pem_public_key(f.read())
+
+
+def make_session(public_key):
+    aes_key = os.urandom(32)
+    encrypted_key = public_key.encrypt(
+        aes_key,
+        padding.OAEP(mgf=padding.MGF1(hashes.SHA256()), algorithm=hashes.SHA256(), label=None),
+    )
+    return aes_key, base64.b64encode(encrypted_key).decode()
+
+
+def make_body(aes_key, encrypted_key_b64, payload):
+    iv = os.urandom(12)
+    sealed = AESGCM(aes_key).encrypt(iv, json.dumps(payload).encode(), None)
+    return json.dumps({
+        "key_id": "bench",
+        "encrypted_key": encrypted_key_b64,
+        "ciphertext": base64.b64encode(sealed[:-16]).decode(),
+        "iv": base64.b64encode(iv).decode(),
+        "tag": base64.b64encode(sealed[-16:]).decode(),
+    }).encode()
+
+
+async def downstream(scope, receive, send):
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": message["body"]})
+
+
+async def run(app, bodies):
+    async def one(body):
+        scope = {"type": "http", "method": "POST", "path": "/bench",
+                 "headers": [(b"content-type", b"application/json")]}
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            pass
+
+        await app(scope, receive, send)
+
+    start = time.perf_counter()
+    for body in bodies:
+        await one(body)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=10, help="distinct encrypted_keys")
+    args = parser.parse_args()
+
+    public_key = load_public_key()
+    sessions = [make_session(public_key) for _ in range(args.sessions)]
+    payload = {"survey_id": "survey_bench", "answers": [{"questionId": f"q{i}", "answer": i} for i in range(20)]}
+    bodies = [make_body(*sessions[i % len(sessions)], payload) for i in range(args.requests)]
+    app = DecryptMiddleware(downstream)
+
+    print(f"{args.requests} requests across {args.sessions} sessions")
+    results = {}
+    for label, max_entries in (("no cache", 0), ("cache", 1024)):
+        aes_key_cache.clear()
+        aes_key_cache.max_entries = max_entries
+        with contextlib.redirect_stdout(io.StringIO()):  # middleware logs every request
+            elapsed = asyncio.run(run(app, bodies))
+        results[label] = args.requests / elapsed
+        print(f"  {label:<9} {results[label]:>10.1f} req/s   {elapsed * 1000 / args.requests:.3f} ms/req"
+              f"   {aes_key_cache.stats()}")
+
+    print(f"  speedup   {results['cache'] / results['no cache']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
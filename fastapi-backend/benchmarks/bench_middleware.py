@@ -0,0 +1,243 @@
+"""
+Request pipeline benchmark: the production middleware stack, end to end.
+
+Builds a FastAPI app with the same middleware as app.main (CORS,
+DecryptMiddleware, request_context_middleware, EncryptGetMiddleware via
+app.middleware.stack.install_middleware) around two trivial routes, and
+drives it in-process over raw ASGI. Session keys come from the real key
+server app (key-server/key_server.py) mounted on an in-memory transport, so
+nothing touches the network. Payloads are generated from a fixed seed.
+
+For every payload size and encryption setting it reports throughput and
+p50/p95/p99 latency of
+  GET   response of the given size (EncryptGetMiddleware path)
+  POST  request body of the given size (DecryptMiddleware path; an
+        encrypted envelope when encryption is on)
+
+Run from fastapi-backend/:
+    python -m benchmarks.bench_middleware
+    python -m benchmarks.bench_middleware --sizes 1KB,100KB --concurrency 8 --json out.json
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import statistics
+import time
+
+import httpx
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from fastapi import FastAPI, Request
+from starlette.responses import Response
+
+from app.core import json_codec
+from app.core.json_codec import CodecJSONResponse
+from app.core.key_pool import session_key_pool
+from app.middleware.stack import install_middleware
+from app.utils.crypto_utils import aes_key_cache
+
+KEY_SERVER_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "key-server", "key_server.py")
+UNITS = {"KB": 1024, "MB": 1024 * 1024}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def format_size(n):
+    return f"{n // UNITS['MB']}MB" if n >= UNITS["MB"] else f"{n // UNITS['KB']}KB"
+
+
+def make_payload(size, seed=0):
+    """Response-shaped JSON list of roughly `size` bytes"""
+    rng = random.Random(seed)
+    words = ["survey", "answer", "option", "rating", "comment", "export", "ticket", "panel"]
+    rows, total = [], 2
+    while total < size:
+        row = {
+            "response_id": f"resp_{rng.getrandbits(48):012x}",
+            "survey_id": "survey_bench",
+            "status": rng.choice(["started", "completed"]),
+            "started_at": f"2025-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+            "answers": [{"questionId": f"q_{q}", "answer": rng.choice(words)} for q in range(5)],
+        }
+        rows.append(row)
+        total += len(json_codec.dumpb(row)) + 1
+    return json_codec.dumpb(rows)
+
+
+def build_app(enable_encryption, get_bodies):
+    app = FastAPI(default_response_class=CodecJSONResponse)
+
+    @app.get("/bench/{size}")
+    async def get_payload(size: int):
+        return Response(content=get_bodies[size], media_type="application/json")
+
+    @app.post("/bench/echo")
+    async def echo(request: Request):
+        return {"received": len(await request.body())}
+
+    install_middleware(app, enable_encryption=enable_encryption, fallback_on_error=False)
+    return app
+
+
+def load_key_server():
+    spec = importlib.util.spec_from_file_location("bench_key_server", KEY_SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def start_key_pool():
+    key_server = load_key_server()
+    session_key_pool.key_server_url = "http://key-server"
+    session_key_pool._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=key_server.app))
+    await session_key_pool.start()
+    return await session_key_pool.current()
+
+
+def encrypt_request(session_key, plaintext):
+    iv = os.urandom(12)
+    sealed = AESGCM(session_key.aes_key).encrypt(iv, plaintext, None)
+    return json_codec.dumpb({
+        "key_id": session_key.key_id,
+        "encrypted_key": session_key.encrypted_key,
+        "ciphertext": base64.b64encode(sealed[:-16]).decode(),
+        "iv": base64.b64encode(iv).decode(),
+        "tag": base64.b64encode(sealed[-16:]).decode(),
+    })
+
+
+async def call(app, method, path, body=b""):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "headers": [
+            (b"host", b"bench"),
+            (b"origin", b"http://localhost:3000"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    received = False
+    status = None
+    size = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect while the response is sent
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    if status != 200:
+        raise RuntimeError(f"{method} {path} returned {status}")
+    return size
+
+
+async def measure(app, method, path, body, requests, concurrency):
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            await call(app, method, path, body)
+            latencies.append(time.perf_counter() - start)
+
+    await call(app, method, path, body)  # warm-up
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(elapsed, latencies, size):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "mb_per_s": round(len(latencies) * size / elapsed / UNITS["MB"], 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def run(args):
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    get_bodies = {size: make_payload(size, seed=args.seed) for size in sizes}
+    session_key = await start_key_pool()
+
+    results = []
+    print(f"{'path':<5} {'size':>6} {'enc':>4} {'reqs':>6} {'req/s':>9} {'MB/s':>8}"
+          f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for size in sizes:
+        # keep the bytes moved per case roughly constant
+        requests = max(args.min_requests, min(args.requests, args.budget_mb * UNITS["MB"] // size))
+        plain_post = get_bodies[size]
+        encrypted_post = encrypt_request(session_key, plain_post)
+        for encryption in (False, True):
+            app = build_app(encryption, get_bodies)
+            cases = [
+                ("GET", f"/bench/{size}", b""),
+                ("POST", "/bench/echo", encrypted_post if encryption else plain_post),
+            ]
+            for method, path, body in cases:
+                aes_key_cache.clear()
+                with contextlib.redirect_stdout(io.StringIO()):  # middleware logs every request
+                    elapsed, latencies = await measure(app, method, path, body, requests, args.concurrency)
+                row = {"path": method, "size": size, "encryption": encryption,
+                       **summarize(elapsed, latencies, size)}
+                results.append(row)
+                print(f"{method:<5} {format_size(size):>6} {'on' if encryption else 'off':>4}"
+                      f" {row['requests']:>6} {row['req_per_s']:>9} {row['mb_per_s']:>8}"
+                      f" {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+    await session_key_pool.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1KB,10KB,100KB,1MB,10MB")
+    parser.add_argument("--requests", type=int, default=2000, help="max requests per case")
+    parser.add_argument("--min-requests", type=int, default=20)
+    parser.add_argument("--budget-mb", type=int, default=200, help="approx. MB moved per case")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(json_codec.dumps({"args": vars(args), "results": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -36,30 +36,112 @@
 
 
 # key_server.py
-from fastapi import FastAPI
-import os, base64
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+from collections import OrderedDict
+from typing import Optional, Tuple
+import os, base64, threading, time, uuid
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
 
 app = FastAPI()
 
-# in-memory store: key_id -> AES key
-KEY_STORE = {}
+KEY_STORE_TTL = float(os.getenv("KEY_STORE_TTL", "3600"))                           # seconds
+KEY_STORE_MAX_KEYS = int(os.getenv("KEY_STORE_MAX_KEYS", "200000"))
+KEY_STORE_MAX_BYTES = int(os.getenv("KEY_STORE_MAX_BYTES", str(128 * 1024 * 1024)))
+KEY_BATCH_MAX = int(os.getenv("KEY_BATCH_MAX", "100"))
 
 # Load backend public key (for encrypting AES key)
 with open("keys/fastapi_public.pem", "rb") as f:
     public_key = serialization.load_pem_public_key(f.read())
 
-@app.get("/get-key/{key_id}")
-def get_key(key_id: str):
-    if key_id not in KEY_STORE:
-        # generate AES key
-        aes_key = os.urandom(32)  # 256-bit key
-        KEY_STORE[key_id] = aes_key
 
-    aes_key = KEY_STORE[key_id]
+class KeyStore:
+    """
+    key_id -> (AES key, wrapped key) with a sliding TTL and an LRU bound on
+    both entry count and approximate memory. Every access moves the entry to
+    the tail and extends its expiry, so the head is always the next entry to
+    expire or evict. The wrapped key is stored with the AES key so repeat
+    lookups of a key_id skip the RSA encrypt.
+    """
+
+    # dict slot + tuple + bytes/str object headers, measured on CPython 3.11
+    ENTRY_OVERHEAD = 300
+
+    def __init__(self, ttl: float, max_keys: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @classmethod
+    def _size(cls, key_id: str, aes_key: bytes, encrypted_key: str) -> int:
+        return len(key_id) + len(aes_key) + len(encrypted_key) + cls.ENTRY_OVERHEAD
+
+    def _drop(self, key_id: str) -> None:
+        aes_key, encrypted_key, _ = self._entries.pop(key_id)
+        self._bytes -= self._size(key_id, aes_key, encrypted_key)
+
+    def _purge(self, now: float) -> None:
+        while self._entries:
+            key_id, (_, _, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._drop(key_id)
+            self.expired += 1
+        while self._entries and (len(self._entries) > self.max_keys or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+            self.evicted += 1
+
+    def get(self, key_id: str) -> Optional[Tuple[bytes, str]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_id)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                self._drop(key_id)
+                self.expired += 1
+                return None
+            self._entries[key_id] = (entry[0], entry[1], now + self.ttl)
+            self._entries.move_to_end(key_id)
+            return entry[0], entry[1]
+
+    def put(self, key_id: str, aes_key: bytes, encrypted_key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key_id in self._entries:
+                self._drop(key_id)
+            self._entries[key_id] = (aes_key, encrypted_key, now + self.ttl)
+            self._bytes += self._size(key_id, aes_key, encrypted_key)
+            self.issued += 1
+            self._purge(now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge(time.monotonic())
+            return {
+                "keys": len(self._entries),
+                "approx_bytes": self._bytes,
+                "max_keys": self.max_keys,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "issued": self.issued,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+# in-memory store: key_id -> AES key
+KEY_STORE = KeyStore(KEY_STORE_TTL, KEY_STORE_MAX_KEYS, KEY_STORE_MAX_BYTES)
 
+
+def wrap_key(aes_key: bytes) -> str:
     # Encrypt AES key with backend's public key
     encrypted_key = public_key.encrypt(
         aes_key,
@@ -67,8 +149,46 @@ def get_key(key_id: str):
                      algorithm=hashes.SHA256(),
                      label=None)
     )
+    return base64.b64encode(encrypted_key).decode()
+
+
+def issue_key(key_id: str) -> dict:
+    entry = KEY_STORE.get(key_id)
+    if entry is None:
+        # generate AES key
+        aes_key = os.urandom(32)  # 256-bit key
+        entry = (aes_key, wrap_key(aes_key))
+        KEY_STORE.put(key_id, *entry)
 
+    aes_key, encrypted_key = entry
     return {
-        "encrypted_key": base64.b64encode(encrypted_key).decode(),
+        "encrypted_key": encrypted_key,
         "aes_key_b64": base64.b64encode(aes_key).decode()
     }
+
+
+@app.get("/get-key/{key_id}")
+def get_key(key_id: str):
+    return issue_key(key_id)
+
+
+class KeyBatchRequest(BaseModel):
+    count: int = Field(..., ge=1)
+    prefix: str = Field("sess_", max_length=32)
+
+
+@app.post("/get-keys")
+def get_keys(req: KeyBatchRequest):
+    """Issue `count` fresh keys in one call (used by the backend key pool)"""
+    if req.count > KEY_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"count must be <= {KEY_BATCH_MAX}")
+    keys = []
+    for _ in range(req.count):
+        key_id = f"{req.prefix}{uuid.uuid4().hex}"
+        keys.append({"key_id": key_id, **issue_key(key_id)})
+    return {"keys": keys}
+
+
+@app.get("/health")
+def health():
+    return {"status": "healthy", "key_store": KEY_STORE.stats()}